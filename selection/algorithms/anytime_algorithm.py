@@ -1,12 +1,21 @@
+import contextlib
+import ctypes
 import itertools
 import logging
 import math
+import multiprocessing
 import time
+from concurrent.futures import ProcessPoolExecutor
 
 from selection.candidate_generation import (
     candidates_per_query,
     syntactically_relevant_indexes,
 )
+from selection.cost_evaluation_process_pool import (
+    add_cost_evaluation_statistics,
+    cost_evaluation_statistics,
+    statistics_difference,
+)
 from selection.index import Index, index_merge
 from selection.selection_algorithm import DEFAULT_PARAMETER_VALUES, SelectionAlgorithm
 from selection.utils import get_utilized_indexes, indexes_by_table, mb_to_b
@@ -16,13 +25,90 @@ from selection.utils import get_utilized_indexes, indexes_by_table, mb_to_b
 # max_runtime_minutes: The algorithm is stopped either if all seeds are evaluated or
 #                      when max_runtime_minutes is exceeded. Whatever happens first.
 #                      In case of the latter, the current best solution is returned.
+#                      The limit is also checked during the greedy enumeration of
+#                      a seed, after every deadline_check_interval candidates,
+#                      which are costed in one batch. If deadline_check_interval
+#                      is None, it is only checked after every step.
+# min_cost_improvement: The greedy enumeration only adds an index if the cost of the
+#                       resulting configuration times min_cost_improvement is lower
+#                       than the current cost. The default accepts any improvement.
+# parallel_seeds: Number of processes that explore seeds concurrently. Every process
+#                 has its own database connection and cost evaluation. Requires
+#                 what-if cost estimation because the processes share the database.
+# seed_abortion: Aborts the greedy enumeration of a seed as soon as it cannot beat the
+#                best configuration of the completed seeds, assuming that the benefits
+#                of later steps do not exceed the benefit of the last step. The best
+#                configuration is shared by all processes. Since benefits do not
+#                necessarily diminish, this is a heuristic that can change the result.
+# seed_pruning: Skips seeds whose lower bound cannot beat the best configuration of
+#               the completed seeds. The lower bound is the cost with the seed and all
+#               candidates that fit next to it, see _seed_lower_bounds(). As long as
+#               additional indexes do not increase the estimated cost of a query,
+#               pruning does not change the result.
 DEFAULT_PARAMETERS = {
     "budget_MB": DEFAULT_PARAMETER_VALUES["budget_MB"],
     "max_index_width": DEFAULT_PARAMETER_VALUES["max_index_width"],
     "max_runtime_minutes": 10,
+    "deadline_check_interval": 32,
+    "min_cost_improvement": 1,
+    "parallel_seeds": 1,
+    "seed_abortion": False,
+    "seed_pruning": False,
 }
 
 
+# State of a seed exploring process, see _init_seed_worker()
+_algorithm = None
+_workload = None
+_candidates = None
+_deadline = None
+
+
+# `costs`: {(query position, relevant indexes): cost} and `index_sizes`:
+# {index: estimated size} of the main process, see AnytimeAlgorithm._worker_caches()
+def _init_seed_worker(
+    connector_class,
+    database_name,
+    parameters,
+    workload,
+    candidates,
+    deadline,
+    incumbent,
+    costs,
+    index_sizes,
+):
+    global _algorithm, _workload, _candidates, _deadline
+    _algorithm = AnytimeAlgorithm(
+        connector_class(database_name), parameters, drop_indexes=False
+    )
+    _algorithm._share_incumbent(incumbent)
+    cost_evaluation = _algorithm.cost_evaluation
+    for (query_position, relevant_indexes), cost in costs.items():
+        cost_evaluation.cache[(workload.queries[query_position], relevant_indexes)] = cost
+    cost_evaluation.index_size_cache.update(index_sizes)
+    _workload = workload
+    _candidates = candidates
+    _deadline = deadline
+
+
+# Returns the result of _explore_seed() or None if the seed was not explored because
+# the deadline passed or it was pruned, the number of pruned seeds, and the process'
+# statistics for the seed
+def _explore_seed(seed, lower_bound):
+    cost_evaluation = _algorithm.cost_evaluation
+    statistics_before = cost_evaluation_statistics(cost_evaluation)
+    pruned_seeds = _algorithm.pruned_seeds
+    result = None
+    if time.time() <= _deadline or _algorithm.incumbent.value == math.inf:
+        result = _algorithm._explore_seed(
+            _workload, seed, _candidates, _deadline, lower_bound
+        )
+    statistics = statistics_difference(
+        statistics_before, cost_evaluation_statistics(cost_evaluation)
+    )
+    return result, _algorithm.pruned_seeds - pruned_seeds, statistics
+
+
 # This algorithm is related to the DTA Anytime algorithm employed in SQL server.
 # Details of the current version of the original algorithm are not published yet.
 # See the documentation for a general description:
@@ -31,15 +117,32 @@ DEFAULT_PARAMETERS = {
 # Please note, that this implementation does not reflect the behavior and performance
 # of the original algorithm, which might be continuously enhanced and optimized.
 class AnytimeAlgorithm(SelectionAlgorithm):
-    def __init__(self, database_connector, parameters=None):
+    def __init__(self, database_connector, parameters=None, drop_indexes=True):
         if parameters is None:
             parameters = {}
         SelectionAlgorithm.__init__(
-            self, database_connector, parameters, DEFAULT_PARAMETERS
+            self, database_connector, parameters, DEFAULT_PARAMETERS, drop_indexes
         )
         self.disk_constraint = mb_to_b(self.parameters["budget_MB"])
         self.max_index_width = self.parameters["max_index_width"]
         self.max_runtime_minutes = self.parameters["max_runtime_minutes"]
+        self.deadline_check_interval = self.parameters["deadline_check_interval"]
+        self.min_cost_improvement = self.parameters["min_cost_improvement"]
+        self.parallel_seeds = self.parameters["parallel_seeds"]
+        assert (
+            self.parallel_seeds == 1 or self.cost_evaluation.cost_estimation == "whatif"
+        ), "Seeds can only be explored in parallel with what-if cost estimation"
+        self.seed_abortion = self.parameters["seed_abortion"]
+        self.seed_pruning = self.parameters["seed_pruning"]
+        # Cost of the best configuration of all completed seeds. It is only shared
+        # with other processes if seeds are explored in parallel, see
+        # _share_incumbent().
+        self.incumbent = ctypes.c_double(math.inf)
+        self._incumbent_lock = contextlib.nullcontext()
+        self.explored_seeds = 0
+        self.aborted_seeds = 0
+        self.pruned_seeds = 0
+        self._seed_aborted = False
 
     def _calculate_best_indexes(self, workload):
         logging.info("Calculating best indexes Anytime")
@@ -50,6 +153,10 @@ class AnytimeAlgorithm(SelectionAlgorithm):
             self.parameters["max_index_width"],
             candidate_generator=syntactically_relevant_indexes,
         )
+        candidates = [
+            self._prune_candidates_by_budget(query_candidates, self.disk_constraint)
+            for query_candidates in candidates
+        ]
 
         # Obtain best (utilized) indexes per query
         candidates, _ = get_utilized_indexes(workload, candidates, self.cost_evaluation)
@@ -76,20 +183,48 @@ class AnytimeAlgorithm(SelectionAlgorithm):
         candidates = filtered_candidates
 
         start_time = time.time()
+        deadline = start_time + self.max_runtime_minutes * 60
+        lower_bounds = None
+        if self.seed_pruning:
+            lower_bounds = self._seed_lower_bounds(workload, seeds, candidates, deadline)
         best_configuration = (None, None)
-        for i, seed in enumerate(seeds):
-            logging.info(f"Seed {i + 1} from {len(seeds)}")
-            candidates_copy = candidates.copy()
-            candidates_copy -= seed
-            current_costs = self._simulate_and_evaluate_cost(workload, seed)
-            indexes, costs = self.enumerate_greedy(
-                workload, seed, current_costs, candidates_copy, math.inf
+        if self.parallel_seeds > 1:
+            results = self._explore_seeds_in_parallel(
+                workload, seeds, candidates, deadline, lower_bounds
             )
-            if best_configuration[0] is None or costs < best_configuration[1]:
+        else:
+            results = self._explore_seeds(
+                workload, seeds, candidates, deadline, lower_bounds
+            )
+        for indexes, costs, aborted in results:
+            self.explored_seeds += 1
+            if aborted:
+                self.aborted_seeds += 1
+            elif best_configuration[0] is None or costs < best_configuration[1]:
                 best_configuration = (indexes, costs)
+        logging.info(
+            f"Explored {self.explored_seeds} of {len(seeds)} seeds, "
+            f"aborted {self.aborted_seeds}, pruned {self.pruned_seeds}"
+        )
+
+        indexes = best_configuration[0]
+        return list(indexes)
 
-            current_time = time.time()
-            consumed_time = current_time - start_time
+    # Explores the seeds one after another until the runtime is exceeded. Returns the
+    # results of the explored seeds, see _explore_seed(). `lower_bounds` holds the
+    # lower bound of every seed if seeds are pruned.
+    def _explore_seeds(self, workload, seeds, candidates, deadline, lower_bounds=None):
+        if lower_bounds is None:
+            lower_bounds = [None] * len(seeds)
+        start_time = deadline - self.max_runtime_minutes * 60
+        results = []
+        for i, (seed, lower_bound) in enumerate(zip(seeds, lower_bounds)):
+            logging.info(f"Seed {i + 1} from {len(seeds)}")
+            result = self._explore_seed(workload, seed, candidates, deadline, lower_bound)
+            if result is not None:
+                results.append(result)
+
+            consumed_time = time.time() - start_time
             if consumed_time > self.max_runtime_minutes * 60:
                 logging.info(
                     f"Stopping after {i + 1} seeds because of timing constraints."
@@ -97,11 +232,142 @@ class AnytimeAlgorithm(SelectionAlgorithm):
                 break
             else:
                 logging.debug(
-                    f"Current best: {best_configuration[1]} after {consumed_time}s."
+                    f"Current best: {self.incumbent.value} after {consumed_time}s."
                 )
+        return results
 
-        indexes = best_configuration[0]
-        return list(indexes)
+    # Seeds are explored by a pool of processes in the order of `seeds`. Seeds that
+    # were not started before the deadline are skipped. The results of the remaining
+    # seeds are returned in the order of `seeds`.
+    def _explore_seeds_in_parallel(
+        self, workload, seeds, candidates, deadline, lower_bounds=None
+    ):
+        if lower_bounds is None:
+            lower_bounds = [None] * len(seeds)
+        logging.info(f"Exploring {len(seeds)} seeds with {self.parallel_seeds} processes")
+        parameters = dict(self.parameters, parallel_seeds=1, cost_estimation_workers=1)
+        db_connector = self.database_connector
+        self._share_incumbent(
+            multiprocessing.get_context("spawn").Value("d", self.incumbent.value)
+        )
+        # Forked workers would share the parent's database connection
+        executor = ProcessPoolExecutor(
+            max_workers=self.parallel_seeds,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_seed_worker,
+            initargs=(
+                type(db_connector),
+                db_connector.db_name,
+                parameters,
+                workload,
+                candidates,
+                deadline,
+                self.incumbent,
+                *self._worker_caches(workload),
+            ),
+        )
+        try:
+            futures = [
+                executor.submit(_explore_seed, seed, lower_bound)
+                for seed, lower_bound in zip(seeds, lower_bounds)
+            ]
+            results = []
+            for future in futures:
+                result, pruned_seeds, statistics = future.result()
+                self.pruned_seeds += pruned_seeds
+                add_cost_evaluation_statistics(self.cost_evaluation, statistics)
+                if result is not None:
+                    results.append(result)
+        finally:
+            executor.shutdown(wait=True)
+        return results
+
+    # Returns the greedily enumerated configuration for `seed`, its cost, and whether
+    # the enumeration was aborted, see seed_abortion. Costs of completed seeds update
+    # the incumbent. Returns None if the seed's lower bound exceeds the incumbent.
+    def _explore_seed(self, workload, seed, candidates, deadline, lower_bound=None):
+        # Ties with the incumbent are explored because an earlier seed wins ties
+        if lower_bound is not None and lower_bound > self.incumbent.value:
+            logging.debug(f"Pruning seed {seed}, lower bound {lower_bound}")
+            self.pruned_seeds += 1
+            return None
+        seed = set(seed)
+        candidates_copy = candidates - seed
+        current_costs = self._simulate_and_evaluate_cost(workload, seed)
+        self._seed_aborted = False
+        indexes, costs = self.enumerate_greedy(
+            workload, seed, current_costs, candidates_copy, math.inf, deadline
+        )
+        if not self._seed_aborted:
+            with self._incumbent_lock:
+                if costs < self.incumbent.value:
+                    self.incumbent.value = costs
+        return indexes, costs, self._seed_aborted
+
+    # Costs and index sizes that were already requested, e.g., for the seeds' lower
+    # bounds, are passed to the workers. Queries are referenced by their positions
+    # because they are compared by identity.
+    def _worker_caches(self, workload):
+        query_positions = {
+            query: position for position, query in enumerate(workload.queries)
+        }
+        costs = {
+            (query_positions[query], frozenset(relevant_indexes)): cost
+            for (query, relevant_indexes), cost in self.cost_evaluation.cache.items()
+            if query in query_positions
+        }
+        return costs, dict(self.cost_evaluation.index_size_cache)
+
+    # `incumbent` is a multiprocessing.Value that is shared with other processes
+    def _share_incumbent(self, incumbent):
+        self.incumbent = incumbent
+        self._incumbent_lock = incumbent.get_lock()
+
+    # Every configuration that the greedy enumeration can reach from a seed consists
+    # of the seed and candidates that fit next to it within the budget. Hence, the
+    # cost with the seed and all of these candidates is a lower bound, unless an
+    # additional index increases the estimated cost of a query. The bounds are
+    # requested in chunks of deadline_check_interval seeds, or at once if it is None.
+    # Seeds whose bounds were not requested before the deadline get None.
+    def _seed_lower_bounds(self, workload, seeds, candidates, deadline):
+        configurations = []
+        for seed in seeds:
+            seed_size = sum(index.estimated_size for index in seed)
+            fitting_candidates = {
+                candidate
+                for candidate in candidates
+                if candidate.estimated_size + seed_size <= self.disk_constraint
+            }
+            configurations.append(seed | fitting_candidates)
+
+        chunk_size = self.deadline_check_interval or len(configurations)
+        lower_bounds = []
+        for chunk_start in range(0, len(configurations), chunk_size):
+            if time.time() > deadline:
+                logging.info(
+                    f"Computed lower bounds of {len(lower_bounds)} seeds before "
+                    "the deadline"
+                )
+                break
+            chunk_end = chunk_start + chunk_size
+            chunk = configurations[chunk_start:chunk_end]
+            for query_costs in self.cost_evaluation.calculate_query_costs_batch(
+                [workload] * len(chunk), chunk, store_size=True
+            ):
+                lower_bounds.append(self.cost_evaluation.total_cost(query_costs))
+        return lower_bounds + [None] * (len(seeds) - len(lower_bounds))
+
+    # Under the assumption of diminishing benefits, the remaining steps can lower the
+    # cost by at most `last_benefit` each
+    def _cannot_beat_incumbent(self, current_costs, last_benefit, remaining_steps):
+        if not self.seed_abortion:
+            return False
+        lower_bound = current_costs - last_benefit * remaining_steps
+        if lower_bound < self.incumbent.value:
+            return False
+        logging.debug(f"Aborting seed, lower bound {lower_bound}")
+        self._seed_aborted = True
+        return True
 
     def _add_merged_indexes(self, indexes):
         index_table_dict = indexes_by_table(indexes)
@@ -111,11 +377,21 @@ class AnytimeAlgorithm(SelectionAlgorithm):
                 if len(merged_index.columns) > self.max_index_width:
                     new_columns = merged_index.columns[: self.max_index_width]
                     merged_index = Index(new_columns)
-                if merged_index not in indexes:
-                    self.cost_evaluation.estimate_size(merged_index)
-                    indexes.add(merged_index)
+                if merged_index in indexes:
+                    continue
+                # Merged indexes that exceed the budget are removed afterward anyway
+                if not self._prune_candidates_by_budget(
+                    [merged_index], self.disk_constraint
+                ):
+                    continue
+                self.cost_evaluation.estimate_size(merged_index)
+                indexes.add(merged_index)
 
     # based on AutoAdminAlgorithm
+    # If `deadline` (seconds since the epoch) is passed, it is checked after every
+    # step or chunk of evaluated candidates, see deadline_check_interval. When it is
+    # exceeded, the best index found so far is added if it improves the cost and the
+    # enumeration stops.
     def enumerate_greedy(
         self,
         workload,
@@ -123,46 +399,135 @@ class AnytimeAlgorithm(SelectionAlgorithm):
         current_costs,
         candidate_indexes,
         number_indexes,
+        deadline=None,
     ):
         assert (
             current_indexes & candidate_indexes == set()
         ), "Intersection of current and candidate indexes must be empty"
-        if len(current_indexes) >= number_indexes:
-            return current_indexes, current_costs
+        if self.lazy_greedy is not None:
+            return self._enumerate_greedy_lazily(
+                workload,
+                current_indexes,
+                current_costs,
+                candidate_indexes,
+                number_indexes,
+                deadline,
+            )
 
-        # (index, cost)
-        best_index = (None, None)
+        timed_out = False
+        while len(current_indexes) < number_indexes and not timed_out:
+            # (index, cost)
+            best_index = (None, None)
 
-        logging.debug(f"Searching in {len(candidate_indexes)} indexes")
+            logging.debug(f"Searching in {len(candidate_indexes)} indexes")
 
-        for index in candidate_indexes:
-            if (
-                sum(idx.estimated_size for idx in current_indexes | {index})
-                > self.disk_constraint
-            ):
-                # index configuration is too large
-                continue
-            cost = self._simulate_and_evaluate_cost(workload, current_indexes | {index})
+            evaluated_indexes = []
+            for index in candidate_indexes:
+                if (
+                    sum(idx.estimated_size for idx in current_indexes | {index})
+                    > self.disk_constraint
+                ):
+                    # index configuration is too large
+                    continue
+                evaluated_indexes.append(index)
+
+            chunk_size = len(evaluated_indexes)
+            if deadline is not None and self.deadline_check_interval is not None:
+                chunk_size = self.deadline_check_interval
+            for chunk_start in range(0, len(evaluated_indexes), max(chunk_size, 1)):
+                chunk_end = chunk_start + chunk_size
+                chunk = evaluated_indexes[chunk_start:chunk_end]
+                costs = self._simulate_and_evaluate_cost_batch(
+                    workload, [current_indexes | {index} for index in chunk]
+                )
+                for index, cost in zip(chunk, costs):
+                    if not best_index[0] or cost < best_index[1]:
+                        best_index = (index, cost)
+                if deadline is not None and time.time() > deadline:
+                    logging.info("Stopping the greedy enumeration at the deadline.")
+                    timed_out = True
+                    break
+            if not best_index[0] or not self._improves(best_index[1], current_costs):
+                break
 
-            if not best_index[0] or cost < best_index[1]:
-                best_index = (index, cost)
-        if best_index[0] and best_index[1] < current_costs:
             current_indexes.add(best_index[0])
             candidate_indexes.remove(best_index[0])
+            last_benefit = current_costs - best_index[1]
             current_costs = best_index[1]
 
             logging.debug(f"Additional best index found: {best_index}")
+            remaining_steps = min(
+                len(evaluated_indexes) - 1, number_indexes - len(current_indexes)
+            )
+            if self._cannot_beat_incumbent(current_costs, last_benefit, remaining_steps):
+                break
+        return current_indexes, current_costs
 
-            return self.enumerate_greedy(
-                workload,
-                current_indexes,
-                current_costs,
-                candidate_indexes,
-                number_indexes,
+    # based on AutoAdminAlgorithm
+    # Like enumerate_greedy() but the candidates are evaluated lazily, see
+    # LazyGreedySelection. Configurations that exceed the budget are skipped. The
+    # deadline is checked before every step.
+    def _enumerate_greedy_lazily(
+        self,
+        workload,
+        current_indexes,
+        current_costs,
+        candidate_indexes,
+        number_indexes,
+        deadline=None,
+    ):
+        self.lazy_greedy.reset()
+        while len(current_indexes) < number_indexes:
+            if deadline is not None and time.time() > deadline:
+                logging.info("Stopping the greedy enumeration at the deadline.")
+                break
+            # {index: cost of current_indexes and index}
+            costs = {}
+
+            def evaluate(indexes):
+                index_costs = self._simulate_and_evaluate_cost_batch(
+                    workload, [current_indexes | {index} for index in indexes]
+                )
+                costs.update(zip(indexes, index_costs))
+                return [
+                    (current_costs - cost, self._improves(cost, current_costs))
+                    for cost in index_costs
+                ]
+
+            evaluated_indexes = [
+                index
+                for index in candidate_indexes
+                if sum(idx.estimated_size for idx in current_indexes | {index})
+                <= self.disk_constraint
+            ]
+            best_index = self.lazy_greedy.select(evaluated_indexes, evaluate)
+            if best_index is None:
+                break
+            current_indexes.add(best_index)
+            candidate_indexes.remove(best_index)
+            last_benefit = current_costs - costs[best_index]
+            current_costs = costs[best_index]
+
+            logging.debug(f"Additional best index found: {(best_index, current_costs)}")
+            remaining_steps = min(
+                len(evaluated_indexes) - 1, number_indexes - len(current_indexes)
             )
+            if self._cannot_beat_incumbent(current_costs, last_benefit, remaining_steps):
+                break
         return current_indexes, current_costs
 
+    # copied from AutoAdminAlgorithm
+    def _improves(self, cost, current_costs):
+        return cost * self.min_cost_improvement < current_costs
+
     # copied from AutoAdminAlgorithm
     def _simulate_and_evaluate_cost(self, workload, indexes):
         cost = self.cost_evaluation.calculate_cost(workload, indexes, store_size=True)
         return round(cost, 2)
+
+    # copied from AutoAdminAlgorithm
+    def _simulate_and_evaluate_cost_batch(self, workload, index_configurations):
+        costs = self.cost_evaluation.calculate_cost_batch(
+            workload, index_configurations, store_size=True
+        )
+        return [round(cost, 2) for cost in costs]
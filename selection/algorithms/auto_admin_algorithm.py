@@ -9,10 +9,14 @@ from selection.workload import Workload
 # max_indexes_naive: Number of indexes selected by a naive enumeration, see
 #                    enumerate_naive() for further details.
 # max_index_width: The number of columns an index can contain at maximum.
+# min_cost_improvement: The greedy enumeration only adds an index if the cost of the
+#                       resulting configuration times min_cost_improvement is lower
+#                       than the current cost. The default accepts any improvement.
 DEFAULT_PARAMETERS = {
     "max_indexes": DEFAULT_PARAMETER_VALUES["max_indexes"],
     "max_indexes_naive": 2,
     "max_index_width": DEFAULT_PARAMETER_VALUES["max_index_width"],
+    "min_cost_improvement": 1,
 }
 
 
@@ -33,6 +37,7 @@ class AutoAdminAlgorithm(SelectionAlgorithm):
             self.parameters["max_indexes_naive"], self.max_indexes
         )
         self.max_index_width = self.parameters["max_index_width"]
+        self.min_cost_improvement = self.parameters["min_cost_improvement"]
 
     def _calculate_best_indexes(self, workload):
         logging.info("Calculating best indexes AutoAdmin")
@@ -123,7 +128,11 @@ class AutoAdminAlgorithm(SelectionAlgorithm):
             for index_combination in itertools.combinations(
                 candidate_indexes, number_of_indexes
             ):
-                cost = self._simulate_and_evaluate_cost(workload, index_combination)
+                # Bitmask-based configurations make the cost cache lookups cheap
+                index_configuration = self.cost_evaluation.index_configuration(
+                    index_combination
+                )
+                cost = self._simulate_and_evaluate_cost(workload, index_configuration)
                 if not lowest_cost or cost < lowest_cost:
                     lowest_cost_indexes = index_combination
                     lowest_cost = cost
@@ -141,38 +150,87 @@ class AutoAdminAlgorithm(SelectionAlgorithm):
         assert (
             current_indexes & candidate_indexes == set()
         ), "Intersection of current and candidate indexes must be empty"
-        if len(current_indexes) >= number_indexes:
-            return current_indexes, current_costs
+        if self.lazy_greedy is not None:
+            return self._enumerate_greedy_lazily(
+                workload,
+                current_indexes,
+                current_costs,
+                candidate_indexes,
+                number_indexes,
+            )
 
-        # (index, cost)
-        best_index = (None, None)
+        while len(current_indexes) < number_indexes:
+            # (index, cost)
+            best_index = (None, None)
 
-        logging.debug(f"Searching in {len(candidate_indexes)} indexes")
+            logging.debug(f"Searching in {len(candidate_indexes)} indexes")
+
+            evaluated_indexes = list(candidate_indexes)
+            costs = self._simulate_and_evaluate_cost_batch(
+                workload, [current_indexes | {index} for index in evaluated_indexes]
+            )
+            for index, cost in zip(evaluated_indexes, costs):
+                if not best_index[0] or cost < best_index[1]:
+                    best_index = (index, cost)
+            if not best_index[0] or not self._improves(best_index[1], current_costs):
+                break
 
-        for index in candidate_indexes:
-            cost = self._simulate_and_evaluate_cost(workload, current_indexes | {index})
-            if not best_index[0] or cost < best_index[1]:
-                best_index = (index, cost)
-        if best_index[0] and best_index[1] < current_costs:
             current_indexes.add(best_index[0])
             candidate_indexes.remove(best_index[0])
             current_costs = best_index[1]
 
             logging.debug(f"Additional best index found: {best_index}")
+        return current_indexes, current_costs
 
-            return self.enumerate_greedy(
-                workload,
-                current_indexes,
-                current_costs,
-                candidate_indexes,
-                number_indexes,
-            )
+    # Like enumerate_greedy() but the candidates are evaluated lazily, see
+    # LazyGreedySelection
+    def _enumerate_greedy_lazily(
+        self,
+        workload,
+        current_indexes,
+        current_costs,
+        candidate_indexes,
+        number_indexes,
+    ):
+        self.lazy_greedy.reset()
+        while len(current_indexes) < number_indexes:
+            # {index: cost of current_indexes and index}
+            costs = {}
+
+            def evaluate(indexes):
+                index_costs = self._simulate_and_evaluate_cost_batch(
+                    workload, [current_indexes | {index} for index in indexes]
+                )
+                costs.update(zip(indexes, index_costs))
+                return [
+                    (current_costs - cost, self._improves(cost, current_costs))
+                    for cost in index_costs
+                ]
+
+            evaluated_indexes = list(candidate_indexes)
+            best_index = self.lazy_greedy.select(evaluated_indexes, evaluate)
+            if best_index is None:
+                break
+            current_indexes.add(best_index)
+            candidate_indexes.remove(best_index)
+            current_costs = costs[best_index]
+
+            logging.debug(f"Additional best index found: {(best_index, current_costs)}")
         return current_indexes, current_costs
 
+    def _improves(self, cost, current_costs):
+        return cost * self.min_cost_improvement < current_costs
+
     def _simulate_and_evaluate_cost(self, workload, indexes):
         cost = self.cost_evaluation.calculate_cost(workload, indexes, store_size=True)
         return round(cost, 2)
 
+    def _simulate_and_evaluate_cost_batch(self, workload, index_configurations):
+        costs = self.cost_evaluation.calculate_cost_batch(
+            workload, index_configurations, store_size=True
+        )
+        return [round(cost, 2) for cost in costs]
+
     def create_multicolumn_indexes(self, workload, indexes):
         multicolumn_candidates = set()
         for index in indexes:
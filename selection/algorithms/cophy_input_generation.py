@@ -84,9 +84,12 @@ class CoPhyInputGeneration(SelectionAlgorithm):
                     logging.info(f"  ... {i} / {number_of_index_combinations} done")
                 is_useful_combination = False
                 costs_per_query = {}
+                index_configuration = self.cost_evaluation.index_configuration(
+                    index_combination
+                )
                 for query in workload.queries:
                     query_cost = self.cost_evaluation.calculate_cost(
-                        Workload([query]), set(index_combination), store_size=True
+                        Workload([query]), index_configuration, store_size=True
                     )
                     # test if query_cost is lower than default cost
                     if query_cost < self.query_costs_without_indexes[query]:
@@ -146,9 +149,13 @@ class CoPhyInputGeneration(SelectionAlgorithm):
                 logging.info(f"  ... {i} / {number_of_index_combinations} done")
             is_useful_combination = False
             costs_per_query = {}
+            # Bitmask-based configurations make the cost cache lookups cheap
+            index_configuration = self.cost_evaluation.index_configuration(
+                index_combination
+            )
             for query in workload.queries:
                 query_cost = self.cost_evaluation.calculate_cost(
-                    Workload([query]), set(index_combination), store_size=True
+                    Workload([query]), index_configuration, store_size=True
                 )
                 # test if query_cost is lower than default cost
                 if query_cost < self.query_costs_without_indexes[query]:
@@ -8,6 +8,7 @@ from selection.candidate_generation import (
 )
 from selection.selection_algorithm import DEFAULT_PARAMETER_VALUES, SelectionAlgorithm
 from selection.utils import get_utilized_indexes, mb_to_b
+from selection.workload import Workload
 
 # budget_MB: The algorithm can utilize the specified storage budget in MB.
 # max_index_width: The number of columns an index can contain at maximum.
@@ -15,12 +16,17 @@ from selection.utils import get_utilized_indexes, mb_to_b
 #                         for further details
 # try_variations_max_removals: Maximum number of index candidates that are remover per
 #                              TryVariations step.
+# incremental_costing: Only the queries that are affected by the exchanged indexes of a
+#                      variation are costed in the TryVariations phase. The costs of
+#                      all other queries are kept from the current selection. Results
+#                      do not change.
 # The algorithm stops if the budget & the time for the TryVariations phase are exceeded.
 DEFAULT_PARAMETERS = {
     "budget_MB": DEFAULT_PARAMETER_VALUES["budget_MB"],
     "max_index_width": DEFAULT_PARAMETER_VALUES["max_index_width"],
     "try_variations_seconds": 10,
     "try_variations_max_removals": 4,
+    "incremental_costing": False,
 }
 
 
@@ -41,6 +47,9 @@ class DB2AdvisAlgorithm(SelectionAlgorithm):
         self.disk_constraint = mb_to_b(self.parameters["budget_MB"])
         self.try_variations_seconds = self.parameters["try_variations_seconds"]
         self.try_variations_max_removals = self.parameters["try_variations_max_removals"]
+        self.incremental_costing = self.parameters["incremental_costing"]
+        self.tried_variations = 0
+        self.distinct_variations = 0
 
     def _calculate_best_indexes(self, workload):
         logging.info("Calculating best indexes DB2Advis")
@@ -52,6 +61,10 @@ class DB2AdvisAlgorithm(SelectionAlgorithm):
             self.parameters["max_index_width"],
             candidate_generator=syntactically_relevant_indexes,
         )
+        candidates = [
+            self._prune_candidates_by_budget(query_candidates, self.disk_constraint)
+            for query_candidates in candidates
+        ]
         utilized_indexes, query_details = get_utilized_indexes(
             workload, candidates, self.cost_evaluation, True
         )
@@ -134,9 +147,21 @@ class DB2AdvisAlgorithm(SelectionAlgorithm):
         if self.try_variations_max_removals == 0:
             return selected_index_benefits
 
-        current_cost = self._evaluate_workload(selected_index_benefits, workload)
+        if self.incremental_costing:
+            self._index_queries_by_column(workload)
+            query_costs = self.cost_evaluation.calculate_query_costs(
+                workload,
+                [index_benefit.index for index_benefit in selected_index_benefits],
+            )
+            current_cost = self.cost_evaluation.total_cost(query_costs)
+        else:
+            current_cost = self._evaluate_workload(selected_index_benefits, workload)
         logging.debug(f"Initial cost \t{current_cost}")
         selected_index_benefits_set = set(selected_index_benefits)
+        # Random exchanges often result in variations that were already evaluated.
+        # Their costs are never lower than the current cost because the current
+        # selection is only replaced by cheaper variations. {variation: cost}
+        variation_costs = {frozenset(selected_index_benefits_set): current_cost}
 
         while start_time + self.try_variations_seconds > time.time():
             number_of_exchanges = (
@@ -165,15 +190,62 @@ class DB2AdvisAlgorithm(SelectionAlgorithm):
                 new_variaton.add(index_benefit)
                 new_variation_size += index_benefit.size()
 
-            cost_of_variation = self._evaluate_workload(new_variaton, workload)
+            self.tried_variations += 1
+            variation = frozenset(new_variaton)
+            if variation in variation_costs:
+                continue
+
+            if self.incremental_costing:
+                variation_query_costs = self._evaluate_variation(
+                    new_variaton, selected_index_benefits_set, query_costs, workload
+                )
+                cost_of_variation = self.cost_evaluation.total_cost(variation_query_costs)
+            else:
+                cost_of_variation = self._evaluate_workload(new_variaton, workload)
+            variation_costs[variation] = cost_of_variation
 
             if cost_of_variation < current_cost:
                 logging.debug(f"Lower cost found \t{current_cost}")
                 current_cost = cost_of_variation
                 selected_index_benefits_set = new_variaton
-
+                if self.incremental_costing:
+                    query_costs = variation_query_costs
+
+        # Only distinct variations are costed and, thus, determine the throughput
+        distinct_variations = len(variation_costs) - 1
+        self.distinct_variations += distinct_variations
+        duration = max(time.time() - start_time, 1e-9)
+        logging.info(
+            f"Tried {self.tried_variations} variations "
+            f"({distinct_variations} distinct), "
+            f"{distinct_variations / duration:.1f} evaluated variations per second"
+        )
         return selected_index_benefits_set
 
+    # Returns the query costs of `variation`. Only the queries affected by the indexes
+    # exchanged in comparison to `selection` are costed, see incremental_costing.
+    def _evaluate_variation(self, variation, selection, selection_query_costs, workload):
+        affected_queries = set()
+        for index_benefit in variation ^ selection:
+            for column in index_benefit.index.columns:
+                affected_queries.update(self._query_positions_by_column.get(column, []))
+        affected_queries = sorted(affected_queries)
+
+        costs = self.cost_evaluation.calculate_query_costs(
+            Workload([workload.queries[position] for position in affected_queries]),
+            [index_benefit.index for index_benefit in variation],
+        )
+        query_costs = list(selection_query_costs)
+        for position, cost in zip(affected_queries, costs):
+            query_costs[position] = cost
+        return query_costs
+
+    def _index_queries_by_column(self, workload):
+        self._query_positions_by_column = {}
+        for position, query in enumerate(workload.queries):
+            for column in set(query.columns):
+                self._query_positions_by_column.setdefault(column, []).append(position)
+
     def _evaluate_workload(self, index_benefits, workload):
         index_candidates = [index_benefit.index for index_benefit in index_benefits]
         return self.cost_evaluation.calculate_cost(workload, index_candidates)
@@ -1,9 +1,17 @@
 import logging
 
 from selection.selection_algorithm import DEFAULT_PARAMETER_VALUES, SelectionAlgorithm
+from selection.workload import Workload
 
 # max_indexes: The algorithm stops as soon as it has selected #max_indexes indexes
-DEFAULT_PARAMETERS = {"max_indexes": DEFAULT_PARAMETER_VALUES["max_indexes"]}
+# incremental_costing: The indexes used by every query's plan are tracked. Dropping an
+#                      index only re-costs the queries whose plans use it; dropping
+#                      an index that no plan uses does not change the cost. This
+#                      assumes that plans do not change if unused indexes are dropped.
+DEFAULT_PARAMETERS = {
+    "max_indexes": DEFAULT_PARAMETER_VALUES["max_indexes"],
+    "incremental_costing": False,
+}
 
 
 # This algorithm is a reimplementation of the Drop heuristic proposed by Whang in 1985.
@@ -27,22 +35,92 @@ class DropHeuristicAlgorithm(SelectionAlgorithm):
         # remaining_indexes is initialized as set of all potential indexes
         remaining_indexes = set(workload.potential_indexes())
 
+        if self.parameters["incremental_costing"]:
+            self._drop_indexes_incrementally(workload, remaining_indexes)
+            return remaining_indexes
+
         while len(remaining_indexes) > self.parameters["max_indexes"]:
             # Drop index that, when dropped, leads to lowest cost
             lowest_cost = None
             index_to_drop = None
-            for index in remaining_indexes:
-                cost = self.cost_evaluation.calculate_cost(
-                    workload, remaining_indexes - set([index])
-                )
+            droppable_indexes = list(remaining_indexes)
+            costs = self.cost_evaluation.calculate_cost_batch(
+                workload,
+                [remaining_indexes - set([index]) for index in droppable_indexes],
+            )
+            for index, cost in zip(droppable_indexes, costs):
                 if not lowest_cost or cost < lowest_cost:
                     lowest_cost, index_to_drop = cost, index
-            remaining_indexes.remove(index_to_drop)
-            logging.info(
-                (
-                    f"Dropping Index: {index_to_drop}. "
-                    f"{len(remaining_indexes)} indexes remaining."
-                )
-            )
+            self._drop_index(remaining_indexes, index_to_drop)
 
         return remaining_indexes
+
+    # Like the loop of _calculate_best_indexes() but with the per-query costs and used
+    # indexes of the current plans, see incremental_costing
+    def _drop_indexes_incrementally(self, workload, remaining_indexes):
+        queries = workload.queries
+        query_costs = []
+        # Per query: the indexes used by its plan with the remaining indexes
+        used_indexes = []
+        for query in queries:
+            utilized_indexes, cost = self._request_plan(query, remaining_indexes)
+            used_indexes.append(utilized_indexes)
+            query_costs.append(cost)
+
+        while len(remaining_indexes) > self.parameters["max_indexes"]:
+            # {index: positions of the queries whose plans use the index}
+            queries_by_index = {}
+            for position, indexes in enumerate(used_indexes):
+                for index in indexes:
+                    queries_by_index.setdefault(index, []).append(position)
+
+            droppable_indexes = list(remaining_indexes)
+            used_droppable_indexes = [
+                index for index in droppable_indexes if index in queries_by_index
+            ]
+            changed_query_costs = self.cost_evaluation.calculate_query_costs_batch(
+                [
+                    Workload([queries[position] for position in queries_by_index[index]])
+                    for index in used_droppable_indexes
+                ],
+                [remaining_indexes - set([index]) for index in used_droppable_indexes],
+            )
+            # {index: workload cost without the index} for indexes used by any plan
+            used_index_costs = {}
+            for index, changed_costs in zip(used_droppable_indexes, changed_query_costs):
+                costs = list(query_costs)
+                for position, cost in zip(queries_by_index[index], changed_costs):
+                    costs[position] = cost
+                used_index_costs[index] = self.cost_evaluation.total_cost(costs)
+
+            current_cost = self.cost_evaluation.total_cost(query_costs)
+            lowest_cost = None
+            index_to_drop = None
+            for index in droppable_indexes:
+                cost = used_index_costs.get(index, current_cost)
+                if not lowest_cost or cost < lowest_cost:
+                    lowest_cost, index_to_drop = cost, index
+            self._drop_index(remaining_indexes, index_to_drop)
+
+            # Only the plans that used the dropped index change
+            for position in queries_by_index.get(index_to_drop, []):
+                used_indexes[position], query_costs[position] = self._request_plan(
+                    queries[position], remaining_indexes
+                )
+
+    # Like the cost requests of the non-incremental path, plan requests do not
+    # estimate index sizes and are counted as cost requests
+    def _request_plan(self, query, remaining_indexes):
+        self.cost_evaluation.cost_requests += 1
+        return self.cost_evaluation.which_indexes_utilized_and_cost(
+            query, remaining_indexes, store_size=False
+        )
+
+    def _drop_index(self, remaining_indexes, index_to_drop):
+        remaining_indexes.remove(index_to_drop)
+        logging.info(
+            (
+                f"Dropping Index: {index_to_drop}. "
+                f"{len(remaining_indexes)} indexes remaining."
+            )
+        )
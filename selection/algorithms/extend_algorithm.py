@@ -1,19 +1,30 @@
 import logging
 
+from selection.cost_evaluation_process_pool import CostEvaluationProcessPool
 from selection.index import Index
 from selection.selection_algorithm import DEFAULT_PARAMETER_VALUES, SelectionAlgorithm
 from selection.utils import b_to_mb, mb_to_b
+from selection.workload import Workload
 
 # budget_MB: The algorithm can utilize the specified storage budget in MB.
 # max_index_width: The number of columns an index can contain at maximum.
 # min_cost_improvement: The value of the relative improvement that must be realized by a
 #                       new configuration to be selected.
+# incremental_costing: Only the queries that are affected by a combination's new index
+#                      are costed. The costs of all other queries are kept from the
+#                      current combination. Results do not change.
+# parallel_processes: The combinations of a round are costed by that many processes,
+#                     see CostEvaluationProcessPool. Results do not change. Requires
+#                     what-if cost estimation and cannot be combined with index state
+#                     scheduling or plan cost derivation.
 # The algorithm stops if either the budget is exceeded or no further beneficial
 # configurations can be found.
 DEFAULT_PARAMETERS = {
     "budget_MB": DEFAULT_PARAMETER_VALUES["budget_MB"],
     "max_index_width": DEFAULT_PARAMETER_VALUES["max_index_width"],
     "min_cost_improvement": 1.003,
+    "incremental_costing": False,
+    "parallel_processes": 1,
 }
 
 
@@ -33,11 +44,35 @@ class ExtendAlgorithm(SelectionAlgorithm):
         self.max_index_width = self.parameters["max_index_width"]
         self.workload = None
         self.min_cost_improvement = self.parameters["min_cost_improvement"]
+        self.incremental_costing = self.parameters["incremental_costing"]
+        self.parallel_processes = self.parameters["parallel_processes"]
+        self._process_pool = None
+        # Costs of the workload's queries for the current combination, only used for
+        # incremental costing
+        self.query_costs = None
+        # {column: positions of the queries that contain the column}
+        self._query_positions_by_column = {}
+        # {index: positions of the queries whose costs the index can affect}
+        self._affected_queries = {}
 
     def _calculate_best_indexes(self, workload):
         logging.info("Calculating best indexes Extend")
+        if self.parallel_processes > 1:
+            self._process_pool = CostEvaluationProcessPool(
+                self.cost_evaluation, workload, self.parallel_processes
+            )
+        try:
+            return self._calculate_best_indexes_extend(workload)
+        finally:
+            if self._process_pool is not None:
+                self._process_pool.close()
+                self._process_pool = None
+
+    def _calculate_best_indexes_extend(self, workload):
         self.workload = workload
-        single_attribute_index_candidates = self.workload.potential_indexes()
+        single_attribute_index_candidates = self._prune_candidates_by_budget(
+            self.workload.potential_indexes(), self.budget
+        )
         extension_attribute_candidates = single_attribute_index_candidates.copy()
 
         # Current index combination
@@ -46,30 +81,51 @@ class ExtendAlgorithm(SelectionAlgorithm):
         # Best index combination during evaluation step
         best = {"combination": [], "benefit_to_size_ratio": 0, "cost": None}
 
-        current_cost = self.cost_evaluation.calculate_cost(
-            self.workload, index_combination, store_size=True
-        )
+        if self.incremental_costing:
+            self._index_queries_by_column()
+            self.query_costs = self.cost_evaluation.calculate_query_costs(
+                self.workload, index_combination, store_size=True
+            )
+            current_cost = self.cost_evaluation.total_cost(self.query_costs)
+        else:
+            current_cost = self.cost_evaluation.calculate_cost(
+                self.workload, index_combination, store_size=True
+            )
         self.initial_cost = current_cost
+        if self.lazy_greedy is not None:
+            self.lazy_greedy.reset()
         # Breaking when no cost improvement
         while True:
             single_attribute_index_candidates = self._get_candidates_within_budget(
                 index_combination_size, single_attribute_index_candidates
             )
+            # (combination, size of the index replaced by the combination's last index)
+            combinations = []
             for candidate in single_attribute_index_candidates:
                 # Only single column index generation
                 if candidate not in index_combination:
-                    self._evaluate_combination(
-                        index_combination + [candidate], best, current_cost
-                    )
+                    combinations.append((index_combination + [candidate], 0))
 
             for attribute in extension_attribute_candidates:
                 # Multi column indexes are generated by attaching columns
                 # to existing indexes
-                self._attach_to_indexes(index_combination, attribute, best, current_cost)
+                combinations.extend(self._attach_to_indexes(index_combination, attribute))
+
+            if self.lazy_greedy is None:
+                best_query_cost_update = self._evaluate_combinations(
+                    combinations, best, current_cost
+                )
+            else:
+                best_query_cost_update = self._evaluate_combinations_lazily(
+                    combinations, best, current_cost
+                )
             if best["benefit_to_size_ratio"] <= 0:
                 break
 
             index_combination = best["combination"]
+            if self.incremental_costing:
+                for position, cost in best_query_cost_update.items():
+                    self.query_costs[position] = cost
             index_combination_size = sum(
                 index.estimated_size for index in index_combination
             )
@@ -85,7 +141,149 @@ class ExtendAlgorithm(SelectionAlgorithm):
 
         return index_combination
 
-    def _attach_to_indexes(self, index_combination, attribute, best, current_cost):
+    # All combinations of a round are costed at once. Returns the query cost update of
+    # the best combination, see _calculate_costs().
+    def _evaluate_combinations(self, combinations, best, current_cost):
+        costs, query_cost_updates = self._calculate_costs(
+            [combination for combination, _ in combinations]
+        )
+        best_query_cost_update = None
+        for (combination, old_index_size), cost, query_cost_update in zip(
+            combinations, costs, query_cost_updates
+        ):
+            self._evaluate_combination(
+                combination, best, current_cost, old_index_size, cost
+            )
+            if best["combination"] is combination:
+                best_query_cost_update = query_cost_update
+        return best_query_cost_update
+
+    # Like _evaluate_combinations() but only the combinations with the highest
+    # (stale) ratios are costed, see LazyGreedySelection. Combinations are identified
+    # by their new index because replaced indexes are prefixes of the new index.
+    def _evaluate_combinations_lazily(self, combinations, best, current_cost):
+        combinations_by_index = {
+            combination[-1]: (combination, old_index_size)
+            for combination, old_index_size in combinations
+        }
+        # {new index: (cost, ratio, query cost update)}
+        results = {}
+
+        def evaluate(new_indexes):
+            evaluated_combinations = [
+                combinations_by_index[index] for index in new_indexes
+            ]
+            costs, query_cost_updates = self._calculate_costs(
+                [combination for combination, _ in evaluated_combinations]
+            )
+            benefits = []
+            for new_index, (combination, old_index_size), cost, update in zip(
+                new_indexes, evaluated_combinations, costs, query_cost_updates
+            ):
+                if cost >= current_cost:
+                    benefits.append((0, False))
+                    continue
+                ratio = self._benefit_to_size_ratio(
+                    combination, current_cost, old_index_size, cost
+                )
+                results[new_index] = (cost, ratio, update)
+                # Combinations whose improvements are too small are kept with their
+                # ratios because they might suffice for lower current costs
+                improves = cost * self.min_cost_improvement < current_cost
+                total_size = sum(index.estimated_size for index in combination)
+                benefits.append((ratio, improves and total_size <= self.budget))
+            return benefits
+
+        new_index = self.lazy_greedy.select(list(combinations_by_index), evaluate)
+        if new_index is None:
+            return None
+        cost, ratio, query_cost_update = results[new_index]
+        best["combination"] = combinations_by_index[new_index][0]
+        best["benefit_to_size_ratio"] = ratio
+        best["cost"] = cost
+        return query_cost_update
+
+    # Returns the costs of the combinations and, for incremental costing, the changed
+    # query costs per combination: {query position: cost}
+    def _calculate_costs(self, combinations):
+        if not self.incremental_costing:
+            if self._process_pool is None:
+                costs = self.cost_evaluation.calculate_cost_batch(
+                    self.workload, combinations, store_size=True
+                )
+            else:
+                query_costs = self._process_pool.calculate_query_costs(
+                    [(combination, None) for combination in combinations],
+                    store_size=True,
+                )
+                costs = [self.cost_evaluation.total_cost(costs) for costs in query_costs]
+            return costs, [None] * len(combinations)
+
+        # The new index is always the last one. Replaced indexes are prefixes of it.
+        # Hence, the costs of all other queries remain unchanged.
+        affected_queries = [
+            self._queries_affected_by(combination[-1]) for combination in combinations
+        ]
+        costed_positions = [
+            position
+            for position, query_positions in enumerate(affected_queries)
+            if query_positions
+        ]
+        if self._process_pool is None:
+            query_costs = self.cost_evaluation.calculate_query_costs_batch(
+                [
+                    Workload(
+                        [
+                            self.workload.queries[query]
+                            for query in affected_queries[position]
+                        ]
+                    )
+                    for position in costed_positions
+                ],
+                [combinations[position] for position in costed_positions],
+                store_size=True,
+            )
+        else:
+            query_costs = self._process_pool.calculate_query_costs(
+                [
+                    (combinations[position], affected_queries[position])
+                    for position in costed_positions
+                ],
+                store_size=True,
+            )
+
+        query_cost_updates = [{} for _ in combinations]
+        for position, costs in zip(costed_positions, query_costs):
+            query_cost_updates[position] = dict(zip(affected_queries[position], costs))
+
+        # Summing up all query costs in order keeps the results identical to costing
+        # the whole workload
+        costs = []
+        for query_cost_update in query_cost_updates:
+            total_cost = 0
+            for position, cost in enumerate(self.query_costs):
+                total_cost += query_cost_update.get(position, cost)
+            costs.append(total_cost)
+        return costs, query_cost_updates
+
+    def _index_queries_by_column(self):
+        self._query_positions_by_column = {}
+        self._affected_queries = {}
+        for position, query in enumerate(self.workload.queries):
+            for column in set(query.columns):
+                self._query_positions_by_column.setdefault(column, []).append(position)
+
+    def _queries_affected_by(self, index):
+        if index not in self._affected_queries:
+            positions = set()
+            for column in index.columns:
+                positions.update(self._query_positions_by_column.get(column, []))
+            self._affected_queries[index] = sorted(positions)
+        return self._affected_queries[index]
+
+    # Yields the combinations that result from attaching `attribute` to the indexes of
+    # `index_combination` together with the size of the extended index
+    def _attach_to_indexes(self, index_combination, attribute):
         assert (
             attribute.is_single_column() is True
         ), "Attach to indexes called with multi column index"
@@ -97,16 +295,25 @@ class ExtendAlgorithm(SelectionAlgorithm):
                 new_index = Index(index.columns + attribute.columns)
                 if new_index in index_combination:
                     continue
+                # Extended indexes that do not fit into the budget are not simulated
+                if self.budget_pruning and not self._prune_candidates_by_budget(
+                    [new_index], self._remaining_budget(index_combination, position)
+                ):
+                    continue
                 new_combination = index_combination.copy()
                 # We don't replace, but del and append to keep track of the append order
                 del new_combination[position]
                 new_combination.append(new_index)
-                self._evaluate_combination(
-                    new_combination,
-                    best,
-                    current_cost,
-                    index_combination[position].estimated_size,
-                )
+                yield new_combination, index_combination[position].estimated_size
+
+    # Budget that is left for the index at `position` of `index_combination`
+    def _remaining_budget(self, index_combination, position):
+        other_indexes_size = sum(
+            index.estimated_size
+            for other_position, index in enumerate(index_combination)
+            if other_position != position
+        )
+        return self.budget - other_indexes_size
 
     def _get_candidates_within_budget(self, index_combination_size, candidates):
         new_candidates = []
@@ -118,19 +325,17 @@ class ExtendAlgorithm(SelectionAlgorithm):
         return new_candidates
 
     def _evaluate_combination(
-        self, index_combination, best, current_cost, old_index_size=0
+        self, index_combination, best, current_cost, old_index_size=0, cost=None
     ):
-        cost = self.cost_evaluation.calculate_cost(
-            self.workload, index_combination, store_size=True
-        )
+        if cost is None:
+            cost = self.cost_evaluation.calculate_cost(
+                self.workload, index_combination, store_size=True
+            )
         if (cost * self.min_cost_improvement) >= current_cost:
             return
-        benefit = current_cost - cost
-        new_index = index_combination[-1]
-        new_index_size_difference = new_index.estimated_size - old_index_size
-        assert new_index_size_difference != 0, "Index size difference should not be 0!"
-
-        ratio = benefit / new_index_size_difference
+        ratio = self._benefit_to_size_ratio(
+            index_combination, current_cost, old_index_size, cost
+        )
 
         total_size = sum(index.estimated_size for index in index_combination)
 
@@ -141,3 +346,15 @@ class ExtendAlgorithm(SelectionAlgorithm):
             best["combination"] = index_combination
             best["benefit_to_size_ratio"] = ratio
             best["cost"] = cost
+
+    # Benefit of the combination per byte added by its last index. Callers check
+    # whether the cost improvement suffices, see min_cost_improvement.
+    def _benefit_to_size_ratio(
+        self, index_combination, current_cost, old_index_size, cost
+    ):
+        benefit = current_cost - cost
+        new_index = index_combination[-1]
+        new_index_size_difference = new_index.estimated_size - old_index_size
+        assert new_index_size_difference != 0, "Index size difference should not be 0!"
+
+        return benefit / new_index_size_difference
@@ -54,6 +54,10 @@ class RelaxationAlgorithm(SelectionAlgorithm):
             self.parameters["max_index_width"],
             candidate_generator=syntactically_relevant_indexes,
         )
+        candidates = [
+            self._prune_candidates_by_budget(query_candidates, self.disk_constraint)
+            for query_candidates in candidates
+        ]
 
         # Obtain best (utilized) indexes per query
         candidates, _ = get_utilized_indexes(workload, candidates, self.cost_evaluation)
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+
+
+# Like WhatIfConnectionPool but the connections are asynchronous, see
+# AsyncPostgresConnection. All requests are pipelined by a single event loop instead
+# of one thread per connection. Hence, many more connections can be used, e.g., to
+# hide the latency of a remote database server.
+#
+# Every connection mirrors the index configuration of the request it is currently
+# serving. Results are returned in the order of the requests.
+class AsyncWhatIfConnectionPool:
+    def __init__(self, connection_class, database_name, number_of_connections):
+        logging.debug(
+            f"Init AsyncWhatIfConnectionPool with {number_of_connections} connections"
+        )
+        self._loop = asyncio.new_event_loop()
+        self._sessions = [
+            _AsyncWhatIfSession(connection_class(database_name))
+            for _ in range(number_of_connections)
+        ]
+        self._loop.run_until_complete(self._connect())
+
+    async def _connect(self):
+        await asyncio.gather(
+            *[session.connection.connect() for session in self._sessions]
+        )
+
+    def get_costs(self, requests):
+        return self._loop.run_until_complete(
+            self._serve(requests, _AsyncWhatIfSession.get_cost)
+        )
+
+    # Like get_costs() but returns the indexes of every request's configuration that
+    # are used by the query's plan and the plan's cost
+    def get_utilized_indexes(self, requests):
+        return self._loop.run_until_complete(
+            self._serve(requests, _AsyncWhatIfSession.get_utilized_indexes)
+        )
+
+    async def _serve(self, requests, session_method):
+        idle_sessions = asyncio.Queue()
+        for session in self._sessions:
+            idle_sessions.put_nowait(session)
+
+        async def serve(query, indexes):
+            session = await idle_sessions.get()
+            try:
+                return await session_method(session, query, indexes)
+            finally:
+                idle_sessions.put_nowait(session)
+
+        return await asyncio.gather(
+            *[serve(query, indexes) for query, indexes in requests]
+        )
+
+    # The statistics of the pool's connections are added to `db_connector` such that
+    # the reported numbers include the costing done by the pool.
+    def close(self, db_connector=None):
+        for session in self._sessions:
+            connection = session.connection
+            if db_connector is not None:
+                db_connector.simulated_indexes += connection.simulated_indexes
+                db_connector.cost_estimations += connection.cost_estimations
+                db_connector.cost_estimation_duration += (
+                    connection.cost_estimation_duration
+                )
+                db_connector.index_simulation_duration += (
+                    connection.index_simulation_duration
+                )
+            connection.close()
+        self._sessions = []
+        self._loop.close()
+
+
+class _AsyncWhatIfSession:
+    def __init__(self, connection):
+        self.connection = connection
+        # {index: hypopg_oid} and {index: hypopg_name}, see _WhatIfWorker
+        self.simulated_indexes = {}
+        self.hypopg_names = {}
+
+    async def get_cost(self, query, indexes):
+        await self._prepare_indexes(set(indexes))
+        return await self.connection.get_cost(query)
+
+    async def get_utilized_indexes(self, query, indexes):
+        await self._prepare_indexes(set(indexes))
+        plan = await self.connection.get_plan(query)
+        plan_str = str(plan)
+        utilized_indexes = {
+            index for index in indexes if self.hypopg_names[index] in plan_str
+        }
+        return utilized_indexes, plan["Total Cost"]
+
+    async def _prepare_indexes(self, indexes):
+        for index in set(self.simulated_indexes) - indexes:
+            await self.connection.drop_simulated_index(self.simulated_indexes.pop(index))
+            del self.hypopg_names[index]
+        for index in indexes - set(self.simulated_indexes):
+            result = await self.connection.simulate_index(index)
+            self.simulated_indexes[index] = result[0]
+            self.hypopg_names[index] = result[1]
@@ -23,6 +23,8 @@ class Benchmark:
         cost_requests,
         cache_hits,
         what_if=None,
+        sweep_cache_hits=0,
+        sweep_cache_misses=0,
     ):
         self.workload = workload
         self.db_connector = db_connector
@@ -37,6 +39,9 @@ class Benchmark:
         self.what_if = what_if
         self.cost_requests = cost_requests
         self.cache_hits = cache_hits
+        # Cache hits served by costs requested in previous runs of a parameter sweep
+        self.sweep_cache_hits = sweep_cache_hits
+        self.sweep_cache_misses = sweep_cache_misses
         self.cost_estimation_duration = self.db_connector.cost_estimation_duration
         self.index_simulation_duration = self.db_connector.index_simulation_duration
         self.simulated_indexes = self.db_connector.simulated_indexes
@@ -90,6 +95,8 @@ class Benchmark:
             "memory consumption",
             "cost requests",
             "cache hits",
+            "sweep cache hits",
+            "sweep cache misses",
         ]
         for query in self.workload.queries:
             if type(query.nr) == int:
@@ -130,6 +137,8 @@ class Benchmark:
             indexes_size,
             self.cost_requests,
             self.cache_hits,
+            self.sweep_cache_hits,
+            self.sweep_cache_misses,
         ]
         csv_entry.extend(results)
         csv_entry.append(sorted(self.indexes))
@@ -0,0 +1,116 @@
+import itertools
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+
+from selection.persistent_cost_cache import PersistentCostCache
+
+
+# A cost cache that can be used instead of the dictionary CostEvaluation.cache. It
+# holds at most `max_entries` costs with (query, relevant_indexes) keys.
+#
+# Eviction policies:
+# "lru": The least recently used entry is evicted.
+# "recompute_cost": Of the EVICTION_SAMPLE_SIZE least recently used entries, the one
+#   whose query was requested the fastest is evicted. Hence, costs of queries with
+#   expensive what-if calls are kept longer.
+#
+# With `spill_to_disk`, evicted costs are written to a temporary on-disk cache and
+# restored when they are accessed again.
+class BoundedCostCache:
+    EVICTION_POLICIES = ["lru", "recompute_cost"]
+    EVICTION_SAMPLE_SIZE = 16
+
+    def __init__(self, max_entries, eviction_policy="lru", spill_to_disk=False):
+        assert max_entries > 0, "The cache must be able to hold at least one entry"
+        assert (
+            eviction_policy in self.EVICTION_POLICIES
+        ), f"Unknown eviction policy: {eviction_policy}"
+        logging.debug(
+            f"Init bounded cost cache: {max_entries} entries, {eviction_policy} eviction"
+        )
+        self.max_entries = max_entries
+        self.eviction_policy = eviction_policy
+        # Least recently used entries first
+        self._entries = OrderedDict()
+        # {query: duration of the query's last cost request in seconds}
+        self.recompute_times = {}
+        self.evictions = 0
+        self.spill_hits = 0
+
+        self._spilled_entries = 0
+        self._spill_cache = None
+        self._spill_directory = None
+        if spill_to_disk:
+            self._spill_directory = tempfile.TemporaryDirectory()
+            path = os.path.join(self._spill_directory.name, "spilled_costs.sqlite")
+            self._spill_cache = PersistentCostCache(path, "spill", "")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __getitem__(self, key):
+        cost = self.get(key)
+        if cost is None:
+            raise KeyError(key)
+        return cost
+
+    def __setitem__(self, key, cost):
+        self._entries[key] = cost
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._evict()
+
+    # Only the entries that are held in memory
+    def items(self):
+        return self._entries.items()
+
+    def get(self, key, default=None):
+        cost = self._entries.get(key)
+        if cost is not None:
+            self._entries.move_to_end(key)
+            return cost
+
+        cost = self._restore(key)
+        return default if cost is None else cost
+
+    def record_recompute_time(self, query, duration):
+        self.recompute_times[query] = duration
+
+    def close(self):
+        if self._spill_cache is not None:
+            self._spill_cache.close()
+            self._spill_cache = None
+            self._spilled_entries = 0
+            self._spill_directory.cleanup()
+
+    def _evict(self):
+        if self.eviction_policy == "lru":
+            key = next(iter(self._entries))
+        else:
+            key = min(
+                itertools.islice(self._entries, self.EVICTION_SAMPLE_SIZE),
+                key=lambda key: self.recompute_times.get(key[0], 0),
+            )
+        cost = self._entries.pop(key)
+        self.evictions += 1
+
+        if self._spill_cache is not None:
+            query, relevant_indexes = key
+            self._spill_cache.put(query, relevant_indexes, cost)
+            self._spilled_entries += 1
+
+    def _restore(self, key):
+        if self._spilled_entries == 0:
+            return None
+
+        query, relevant_indexes = key
+        cost = self._spill_cache.get(query, relevant_indexes)
+        if cost is not None:
+            self.spill_hits += 1
+            self[key] = cost
+        return cost
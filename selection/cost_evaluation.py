@@ -1,6 +1,13 @@
 import logging
+import time
 
+from selection.async_what_if_connection_pool import AsyncWhatIfConnectionPool
+from selection.bounded_cost_cache import BoundedCostCache
+from selection.dbms.async_postgres_dbms import AsyncPostgresConnection
+from selection.index_configuration import IndexCandidateRegistry
+from selection.what_if_connection_pool import WhatIfConnectionPool
 from selection.what_if_index_creation import WhatIfIndexCreation
+from selection.workload import Workload
 
 
 class CostEvaluation:
@@ -15,14 +22,82 @@ class CostEvaluation:
         self.cache_hits = 0
         # Cache structure:
         # {(query_object, relevant_indexes): cost}
+        # The cache can be bounded, see limit_cache().
         self.cache = {}
+        # Optional PersistentCostCache that is consulted before the database system
+        # is asked for what-if costs. It is shared across runs, see README.md.
+        self.persistent_cache = None
+        self.persistent_cache_hits = 0
+        # Cost and index size caches that are shared with other CostEvaluation
+        # objects, e.g., by all runs of a parameter sweep, see use_shared_caches().
+        self.shared_cache = None
+        self.shared_cache_hits = 0
+        # Costs that were looked up in but not served by the shared cache
+        self.shared_cache_misses = 0
+        # Optional costs of queries without indexes that are shared with other
+        # CostEvaluation objects, e.g., by all algorithms of a run, see
+        # costs_without_indexes(). Structure: {query: cost}
+        self.no_index_costs = None
+        # Cache structure:
+        # {index: estimated_size}
+        self.index_size_cache = {}
+        # Optional IndexSizeOracle that provides the sizes of indexes that were never
+        # simulated by this object, e.g., sizes learned by previous runs
+        self.index_size_oracle = None
+        # Bit positions of all indexes whose costs are requested. The relevant indexes
+        # of a query are determined via the registry's relevance masks.
+        self.index_registry = IndexCandidateRegistry()
+        # Optional WhatIfConnectionPool to request what-if costs concurrently
+        self.connection_pool = None
+        # "strict": Exactly the requested indexes are simulated for cost requests.
+        # "relevance": Simulated indexes are kept as long as they are not relevant for
+        #   the query whose cost is requested. Only indexes relevant for the query but
+        #   not part of the requested configuration are dropped.
+        # "hiding": Like "relevance" but such indexes are hidden from the planner
+        #   (requires HypoPG >= 1.3.1) instead of being dropped.
+        self.index_state_scheduling = "strict"
+        self.hidden_indexes = set()
+        # Optional PlanCostDerivation to derive costs from the indexes used by plans
+        self.plan_cost_derivation = None
         self.completed = False
         # It is not necessary to drop hypothetical indexes during __init__().
         # These are only created per connection. Hence, non should be present.
 
-        self.relevant_indexes_cache = {}
+    # Asynchronous pools pipeline all requests in a single thread, see
+    # AsyncWhatIfConnectionPool. They are only available for PostgreSQL.
+    def use_connection_pool(self, number_of_connections, asynchronous=False):
+        if asynchronous:
+            assert (
+                self.db_connector.db_system == "postgres"
+            ), "Asynchronous cost estimation requires PostgreSQL"
+            self.connection_pool = AsyncWhatIfConnectionPool(
+                AsyncPostgresConnection, self.db_connector.db_name, number_of_connections
+            )
+            return
+
+        self.connection_pool = WhatIfConnectionPool(
+            type(self.db_connector), self.db_connector.db_name, number_of_connections
+        )
+
+    def _uses_connection_pool(self):
+        return self.connection_pool is not None and self.cost_estimation == "whatif"
+
+    def limit_cache(self, max_entries, eviction_policy="lru", spill_to_disk=False):
+        self.cache = BoundedCostCache(max_entries, eviction_policy, spill_to_disk)
+
+    def use_shared_caches(self, cache, index_size_cache):
+        self.shared_cache = cache
+        self.index_size_cache = index_size_cache
+
+    # Returns an IndexConfiguration for `indexes`. Passing configurations instead of
+    # sets to calculate_cost() avoids recomputing their bitmasks.
+    def index_configuration(self, indexes=()):
+        return self.index_registry.configuration(indexes)
 
     def estimate_size(self, index):
+        if index.estimated_size is None and self._known_size(index) is not None:
+            return
+
         # TODO: Refactor: It is currently too complicated to compute
         # We must search in current indexes to get an index object with .hypopg_oid
         result = None
@@ -34,11 +109,12 @@ class CostEvaluation:
             # Index does currently exist and size can be queried
             if not index.estimated_size:
                 index.estimated_size = self.what_if.estimate_index_size(result.hypopg_oid)
+                self._store_size(index, learned=True)
         else:
             self._simulate_or_create_index(index, store_size=True)
 
-    def which_indexes_utilized_and_cost(self, query, indexes):
-        self._prepare_cost_calculation(indexes, store_size=True)
+    def which_indexes_utilized_and_cost(self, query, indexes, store_size=True):
+        self._prepare_cost_calculation(indexes, store_size=store_size)
 
         plan = self.db_connector.get_plan(query)
         cost = plan["Total Cost"]
@@ -63,38 +139,354 @@ class CostEvaluation:
 
         return recommended_indexes, cost
 
+    # Like which_indexes_utilized_and_cost() for every query with its own indexes. With
+    # a connection pool, the queries are planned concurrently. Index sizes are stored
+    # in either case, unless `store_size` is False.
+    def which_indexes_utilized_and_cost_batch(
+        self, queries, indexes_per_query, store_size=True
+    ):
+        if not self._uses_connection_pool():
+            return [
+                self.which_indexes_utilized_and_cost(query, indexes, store_size)
+                for query, indexes in zip(queries, indexes_per_query)
+            ]
+
+        requests = list(zip(queries, indexes_per_query))
+        for _, indexes in requests:
+            self._prepare_index_sizes(indexes, store_size=store_size)
+        return self.connection_pool.get_utilized_indexes(requests)
+
+    # Returns the cost of every query without indexes. Costs that are not in
+    # `no_index_costs` are requested at once and added to it.
+    def costs_without_indexes(self, queries):
+        if self.no_index_costs is None:
+            return self.calculate_query_costs(Workload(queries), [])
+
+        missing_queries = list(
+            dict.fromkeys(query for query in queries if query not in self.no_index_costs)
+        )
+        if missing_queries:
+            costs = self.calculate_query_costs(Workload(missing_queries), [])
+            self.no_index_costs.update(zip(missing_queries, costs))
+        shared_costs = len(queries) - len(missing_queries)
+        self.cost_requests += shared_costs
+        self.cache_hits += shared_costs
+        return [self.no_index_costs[query] for query in queries]
+
     def calculate_cost(self, workload, indexes, store_size=False):
+        return self.total_cost(self.calculate_query_costs(workload, indexes, store_size))
+
+    # Like calculate_cost() but returns the cost of every query of the workload
+    # instead of their sum
+    def calculate_query_costs(self, workload, indexes, store_size=False):
         assert (
             self.completed is False
         ), "Cost Evaluation is completed and cannot be reused."
-        self._prepare_cost_calculation(indexes, store_size=store_size)
-        total_cost = 0
+        if self._schedules_index_states() or self._uses_connection_pool():
+            # Indexes are simulated per query in _request_cache() or by the
+            # connection pool's sessions
+            self._prepare_index_sizes(indexes, store_size)
+        else:
+            self._prepare_cost_calculation(indexes, store_size=store_size)
 
-        # TODO: Make query cost higher for queries which are running often
+        if self._uses_connection_pool():
+            return self._query_costs_in_parallel(workload, indexes)
+
+        configuration = self.index_configuration(indexes)
+        costs = []
         for query in workload.queries:
             self.cost_requests += 1
-            total_cost += self._request_cache(query, indexes)
+            costs.append(self._request_cache(query, indexes, configuration))
+        return costs
+
+    # Summing up in the order of the queries produces the same (floating point)
+    # result for all code paths
+    @staticmethod
+    def total_cost(costs):
+        # TODO: Make query cost higher for queries which are running often
+        total_cost = 0
+        for cost in costs:
+            total_cost += cost
         return total_cost
 
+    # Returns the workload cost for every index configuration in
+    # `index_configurations`. In contrast to calling calculate_cost() for each
+    # configuration, configurations whose costs are all cached do not alter the
+    # simulated indexes and the remaining ones are evaluated in an order in which
+    # subsequent configurations share most of their indexes. With a connection pool,
+    # the missing costs of all configurations are requested at once.
+    def calculate_cost_batch(self, workload, index_configurations, store_size=False):
+        return self._calculate_batch(
+            [workload] * len(index_configurations),
+            index_configurations,
+            store_size,
+            query_costs=False,
+        )
+
+    # Like calculate_cost_batch() but every configuration is evaluated for its own
+    # workload and the costs of the workloads' queries are returned, see
+    # calculate_query_costs()
+    def calculate_query_costs_batch(
+        self, workloads, index_configurations, store_size=False
+    ):
+        return self._calculate_batch(
+            workloads, index_configurations, store_size, query_costs=True
+        )
+
+    def _calculate_batch(self, workloads, index_configurations, store_size, query_costs):
+        assert (
+            self.completed is False
+        ), "Cost Evaluation is completed and cannot be reused."
+        # Requested costs which are not counted as cache hits when used the first time:
+        # {(query, relevant_indexes): cost}
+        prefetched = {}
+        if self._uses_connection_pool():
+            prefetched = self._prefetch_in_parallel(workloads, index_configurations)
+
+        costs = [None] * len(index_configurations)
+        uncached_positions = []
+        for position, (workload, indexes) in enumerate(
+            zip(workloads, index_configurations)
+        ):
+            if self._is_cached(workload, indexes, store_size):
+                costs[position] = self._cached_query_costs(workload, indexes, prefetched)
+                if not query_costs:
+                    costs[position] = self.total_cost(costs[position])
+            else:
+                uncached_positions.append(position)
+
+        uncached_positions.sort(
+            key=lambda position: sorted(index_configurations[position])
+        )
+        calculate = self.calculate_query_costs if query_costs else self.calculate_cost
+        for position in uncached_positions:
+            workload = workloads[position]
+            indexes = index_configurations[position]
+            # Keeps the calls identical to direct calls of calculate_cost()
+            if store_size:
+                costs[position] = calculate(workload, indexes, store_size=True)
+            else:
+                costs[position] = calculate(workload, indexes)
+        return costs
+
+    # Configurations are considered cached if the costs of all queries are in the
+    # (shared) cache and, if requested, the sizes of all indexes are known
+    def _is_cached(self, workload, indexes, store_size):
+        if store_size and any(self._known_size(index) is None for index in indexes):
+            return False
+
+        configuration = self.index_configuration(indexes)
+        for query in workload.queries:
+            key = (query, self._relevant_indexes_cached(query, configuration))
+            if key not in self.cache and (
+                self.shared_cache is None or key not in self.shared_cache
+            ):
+                return False
+        return True
+
+    def _cached_query_costs(self, workload, indexes, prefetched):
+        for index in indexes:
+            self._known_size(index)
+
+        costs = []
+        configuration = self.index_configuration(indexes)
+        for query in workload.queries:
+            self.cost_requests += 1
+            relevant_indexes = self._relevant_indexes_cached(query, configuration)
+            if (query, relevant_indexes) in prefetched:
+                costs.append(prefetched.pop((query, relevant_indexes)))
+                continue
+
+            cost = self._cached_cost(query, relevant_indexes)
+            if cost is None:
+                # The cost was evicted from the bounded cache after _is_cached()
+                if not self._schedules_index_states():
+                    self._prepare_cost_calculation(indexes)
+                cost = self._request_cache(query, indexes, configuration)
+            costs.append(cost)
+        return costs
+
+    # Requests the costs missing for any of the configurations via the connection
+    # pool. Returns the requested costs by their keys. The pool's sessions only
+    # simulate the indexes that are relevant for the respective query.
+    def _prefetch_in_parallel(self, workloads, index_configurations):
+        # Keys (query, relevant_indexes) of the missing costs in the order of their
+        # first occurrence, the dict serves as an ordered set
+        missing = {}
+        for workload, indexes in zip(workloads, index_configurations):
+            configuration = self.index_configuration(indexes)
+            for query in workload.queries:
+                relevant_indexes = self._relevant_indexes_cached(query, configuration)
+                key = (query, relevant_indexes)
+                if key in missing or key in self.cache:
+                    continue
+                if self.shared_cache is not None:
+                    if key in self.shared_cache:
+                        continue
+                    self.shared_cache_misses += 1
+                if self._uses_persistent_cache():
+                    cost = self.persistent_cache.get(query, relevant_indexes)
+                    if cost is not None:
+                        self.persistent_cache_hits += 1
+                        self.cache[key] = cost
+                        continue
+                missing[key] = None
+
+        if not missing:
+            return {}
+        requested_costs = self.connection_pool.get_costs(list(missing))
+        for (query, relevant_indexes), cost in zip(missing, requested_costs):
+            self._store_cost(query, relevant_indexes, cost)
+        return dict(zip(missing, requested_costs))
+
+    # Cached costs are taken from the caches. All other costs are requested
+    # concurrently from the connection pool with the indexes relevant for the
+    # respective query.
+    def _query_costs_in_parallel(self, workload, indexes):
+        costs = []
+        missing = []
+        configuration = self.index_configuration(indexes)
+        for query in workload.queries:
+            self.cost_requests += 1
+            relevant_indexes = self._relevant_indexes_cached(query, configuration)
+            cost = self._cached_cost(query, relevant_indexes)
+            if cost is None:
+                missing.append((len(costs), query, relevant_indexes))
+            costs.append(cost)
+
+        if missing:
+            requested_costs = self.connection_pool.get_costs(
+                [(query, relevant_indexes) for _, query, relevant_indexes in missing]
+            )
+            for (position, query, relevant_indexes), cost in zip(
+                missing, requested_costs
+            ):
+                self._store_cost(query, relevant_indexes, cost)
+                costs[position] = cost
+        return costs
+
     # Creates the current index combination by simulating/creating
     # missing indexes and unsimulating/dropping indexes
     # that exist but are not in the combination.
     def _prepare_cost_calculation(self, indexes, store_size=False):
-        for index in set(indexes) - self.current_indexes:
+        missing_indexes = set(indexes) - self.current_indexes
+        if len(missing_indexes) > 1 and self._simulates_in_bulk():
+            self._simulate_indexes(missing_indexes, store_size)
+        for index in missing_indexes - self.current_indexes:
             self._simulate_or_create_index(index, store_size=store_size)
         for index in self.current_indexes - set(indexes):
             self._unsimulate_or_drop_index(index)
+        for index in self.hidden_indexes & set(indexes):
+            self._unhide_index(index)
 
         assert self.current_indexes == set(indexes)
 
+    def _schedules_index_states(self):
+        return (
+            self.index_state_scheduling != "strict" and self.cost_estimation == "whatif"
+        )
+
+    # Used instead of _prepare_cost_calculation() if index states are scheduled per
+    # query. Only indexes whose sizes are unknown are simulated.
+    def _prepare_index_sizes(self, indexes, store_size):
+        if not store_size:
+            return
+        for index in indexes:
+            if index.estimated_size is None:
+                self.estimate_size(index)
+
+    # Ensures that the planner considers exactly the `relevant_indexes` of all
+    # simulated indexes that are relevant for `query`. All other simulated indexes
+    # are kept because they do not influence the query's cost.
+    def _prepare_query_cost_calculation(self, query, indexes, relevant_indexes):
+        for index in self.current_indexes - set(indexes):
+            if index in self.hidden_indexes:
+                continue
+            if not any(column in query.columns for column in index.columns):
+                continue
+            if self.index_state_scheduling == "hiding":
+                self._hide_index(index)
+            else:
+                self._unsimulate_or_drop_index(index)
+
+        for index in relevant_indexes:
+            if index in self.hidden_indexes:
+                self._unhide_index(index)
+            elif index not in self.current_indexes:
+                self._simulate_or_create_index(index)
+
+    def _hide_index(self, index):
+        self.what_if.hide_simulated_index(self._current_index(index))
+        self.hidden_indexes.add(index)
+
+    def _unhide_index(self, index):
+        self.what_if.unhide_simulated_index(self._current_index(index))
+        self.hidden_indexes.remove(index)
+
+    # Returns the simulated index object that is equal to `index`
+    def _current_index(self, index):
+        for current_index in self.current_indexes:
+            if current_index == index:
+                return current_index
+
     def _simulate_or_create_index(self, index, store_size=False):
         if self.cost_estimation == "whatif":
+            # Known sizes do not have to be requested from the database system again
+            if store_size and self._known_size(index) is not None:
+                store_size = False
             self.what_if.simulate_index(index, store_size=store_size)
         elif self.cost_estimation == "actual_runtimes":
             self.db_connector.create_index(index)
         self.current_indexes.add(index)
+        self._store_size(index, learned=store_size and self.cost_estimation == "whatif")
+
+    def _simulates_in_bulk(self):
+        return (
+            self.cost_estimation == "whatif" and self.what_if.supports_bulk_simulation()
+        )
+
+    # Like _simulate_or_create_index() for multiple indexes but with a single request.
+    # Sizes are requested if any size is unknown, but only the unknown ones are
+    # assigned and learned.
+    def _simulate_indexes(self, indexes, store_size):
+        indexes = list(indexes)
+        unknown_sizes = set()
+        if store_size:
+            unknown_sizes = {
+                index for index in indexes if self._known_size(index) is None
+            }
+        self.what_if.simulate_indexes(indexes, store_size=len(unknown_sizes) > 0)
+
+        for index in indexes:
+            self.current_indexes.add(index)
+            self._store_size(index, learned=index in unknown_sizes)
+
+    # Returns the size of `index` if it is known without simulating the index. Known
+    # sizes are assigned to the index object.
+    def _known_size(self, index):
+        if index.estimated_size is not None:
+            return index.estimated_size
+
+        size = self.index_size_cache.get(index)
+        if size is None and self.index_size_oracle is not None:
+            size = self.index_size_oracle.size(index)
+            if size is not None:
+                self.index_size_cache[index] = size
+        index.estimated_size = size
+        return size
+
+    # `learned` indicates that the size was just requested from the database system
+    def _store_size(self, index, learned):
+        if index.estimated_size is None:
+            return
+        if index not in self.index_size_cache:
+            self.index_size_cache[index] = index.estimated_size
+        if learned and self.index_size_oracle is not None:
+            self.index_size_oracle.learn(index, index.estimated_size)
 
     def _unsimulate_or_drop_index(self, index):
+        if index in self.hidden_indexes:
+            self._unhide_index(index)
         if self.cost_estimation == "whatif":
             self.what_if.drop_simulated_index(index)
         elif self.cost_estimation == "actual_runtimes":
@@ -111,29 +503,158 @@ class CostEvaluation:
     def complete_cost_estimation(self):
         self.completed = True
 
+        if self.persistent_cache is not None:
+            self.persistent_cache.flush()
+        if self.index_size_oracle is not None:
+            self.index_size_oracle.flush()
+        if isinstance(self.cache, BoundedCostCache):
+            self.cache.close()
+        if self.connection_pool is not None:
+            self.connection_pool.close(self.db_connector)
+            self.connection_pool = None
+
         for index in self.current_indexes.copy():
             self._unsimulate_or_drop_index(index)
 
         assert self.current_indexes == set()
 
-    def _request_cache(self, query, indexes):
-        q_i_hash = (query, frozenset(indexes))
-        if q_i_hash in self.relevant_indexes_cache:
-            relevant_indexes = self.relevant_indexes_cache[q_i_hash]
-        else:
-            relevant_indexes = self._relevant_indexes(query, indexes)
-            self.relevant_indexes_cache[q_i_hash] = relevant_indexes
+    def _request_cache(self, query, indexes, configuration):
+        relevant_indexes = self._relevant_indexes_cached(query, configuration)
+
+        cost = self._cached_cost(query, relevant_indexes)
+        if cost is not None:
+            return cost
+
+        derived_cost = None
+        if self._uses_plan_cost_derivation():
+            derived_cost = self.plan_cost_derivation.derive(query, relevant_indexes)
+            if derived_cost is not None and not self.plan_cost_derivation.should_verify():
+                self.cache_hits += 1
+                # Derived costs are not shared or persisted because they might be
+                # inaccurate
+                self.cache[(query, relevant_indexes)] = derived_cost
+                return derived_cost
 
-        # Check if query and corresponding relevant indexes in cache
-        if (query, relevant_indexes) in self.cache:
-            self.cache_hits += 1
-            return self.cache[(query, relevant_indexes)]
         # If no cache hit request cost from database system
+        if self._schedules_index_states():
+            self._prepare_query_cost_calculation(query, indexes, relevant_indexes)
+        start_time = time.time()
+        if self._uses_plan_cost_derivation():
+            cost = self._get_cost_and_record_plan(query, relevant_indexes)
+            if derived_cost is not None:
+                self.plan_cost_derivation.verify(
+                    query, relevant_indexes, derived_cost, cost
+                )
         else:
             cost = self._get_cost(query)
-            self.cache[(query, relevant_indexes)] = cost
+        for cache in [self.cache, self.shared_cache]:
+            if isinstance(cache, BoundedCostCache):
+                cache.record_recompute_time(query, time.time() - start_time)
+        self._store_cost(query, relevant_indexes, cost)
+        return cost
+
+    def _uses_plan_cost_derivation(self):
+        return self.plan_cost_derivation is not None and self.cost_estimation == "whatif"
+
+    # Similar to which_indexes_utilized_and_cost() but does not alter the simulated
+    # indexes
+    def _get_cost_and_record_plan(self, query, relevant_indexes):
+        plan = self.db_connector.get_plan(query)
+        cost = plan["Total Cost"]
+        plan_str = str(plan)
+
+        used_indexes = set()
+        for index in self.current_indexes:
+            if index not in relevant_indexes or index in self.hidden_indexes:
+                continue
+            if index.hypopg_name in plan_str:
+                used_indexes.add(index)
+
+        self.plan_cost_derivation.record(query, relevant_indexes, used_indexes, cost)
+        return cost
+
+    # The relevant indexes are the intersection of the configuration's mask and the
+    # query's relevance mask. The result is interned per mask and, thus, a cheap key.
+    # `configuration` must be an IndexConfiguration, see index_configuration().
+    def _relevant_indexes_cached(self, query, configuration):
+        registry = configuration.registry
+        return registry.interned(configuration.mask & registry.relevance_mask(query))
+
+    # The following methods let a CostEvaluationProcessPool, whose workers request the
+    # costs and sizes, share the caches and index sizes of this object.
+    # Cost cache keys of `queries` for `indexes`: [(query, relevant_indexes)]
+    def cost_cache_keys(self, queries, indexes):
+        configuration = self.index_configuration(indexes)
+        return [
+            (query, self._relevant_indexes_cached(query, configuration))
+            for query in queries
+        ]
+
+    def cached_cost(self, key):
+        query, relevant_indexes = key
+        return self._cached_cost(query, relevant_indexes)
+
+    def store_cost(self, key, cost):
+        query, relevant_indexes = key
+        self._store_cost(query, relevant_indexes, cost)
+
+    def known_size(self, index):
+        return self._known_size(index)
+
+    # `learned` indicates that the size was just requested from the database system
+    def store_size(self, index, learned):
+        self._store_size(index, learned)
+
+    # Returns None if the cost for the query and the corresponding relevant indexes is
+    # neither in the cache, nor in the shared cache, nor in the persistent cache
+    def _cached_cost(self, query, relevant_indexes):
+        # A single lookup because the cache might be a BoundedCostCache
+        cost = self.cache.get((query, relevant_indexes))
+        if cost is not None:
+            self.cache_hits += 1
             return cost
 
+        # Check if the cost was already requested by another CostEvaluation object
+        if self.shared_cache is not None:
+            cost = self.shared_cache.get((query, relevant_indexes))
+            if cost is not None:
+                self.cache_hits += 1
+                self.shared_cache_hits += 1
+                self.cache[(query, relevant_indexes)] = cost
+                return cost
+            self.shared_cache_misses += 1
+
+        cost = self._request_persistent_cache(query, relevant_indexes)
+        if cost is not None:
+            self.cache[(query, relevant_indexes)] = cost
+            if self.shared_cache is not None:
+                self.shared_cache[(query, relevant_indexes)] = cost
+        return cost
+
+    def _store_cost(self, query, relevant_indexes, cost):
+        self.cache[(query, relevant_indexes)] = cost
+        if self.shared_cache is not None:
+            self.shared_cache[(query, relevant_indexes)] = cost
+        self._store_persistently(query, relevant_indexes, cost)
+
+    # Actual runtimes are not deterministic. Hence, only what-if costs are persisted.
+    def _uses_persistent_cache(self):
+        return self.persistent_cache is not None and self.cost_estimation == "whatif"
+
+    def _request_persistent_cache(self, query, relevant_indexes):
+        if not self._uses_persistent_cache():
+            return None
+
+        cost = self.persistent_cache.get(query, relevant_indexes)
+        if cost is not None:
+            self.cache_hits += 1
+            self.persistent_cache_hits += 1
+        return cost
+
+    def _store_persistently(self, query, relevant_indexes, cost):
+        if self._uses_persistent_cache():
+            self.persistent_cache.put(query, relevant_indexes, cost)
+
     @staticmethod
     def _relevant_indexes(query, indexes):
         relevant_indexes = [
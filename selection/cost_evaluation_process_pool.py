@@ -0,0 +1,195 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from selection.cost_evaluation import CostEvaluation
+from selection.workload import Workload
+
+# State of a worker process, see _init_worker()
+_cost_evaluation = None
+_workload = None
+
+
+def _init_worker(connector_class, database_name, workload, cost_estimation):
+    global _cost_evaluation, _workload
+    _cost_evaluation = CostEvaluation(connector_class(database_name), cost_estimation)
+    _workload = workload
+
+
+# Returns the costs of the queries at `query_positions` (all queries if None), the
+# sizes of `indexes` if `store_size`, and the worker's statistics for the request
+def _calculate_query_costs(indexes, query_positions, store_size):
+    statistics_before = cost_evaluation_statistics(_cost_evaluation)
+    queries = _workload.queries
+    if query_positions is not None:
+        queries = [queries[position] for position in query_positions]
+
+    costs = _cost_evaluation.calculate_query_costs(
+        Workload(queries), indexes, store_size=store_size
+    )
+    sizes = [index.estimated_size for index in indexes] if store_size else None
+    statistics = statistics_difference(
+        statistics_before, cost_evaluation_statistics(_cost_evaluation)
+    )
+    return costs, sizes, statistics
+
+
+# The counters of a cost evaluation and its database connector that worker processes
+# report to the main process, see add_cost_evaluation_statistics()
+def cost_evaluation_statistics(cost_evaluation):
+    db_connector = cost_evaluation.db_connector
+    return (
+        cost_evaluation.cost_requests,
+        cost_evaluation.cache_hits,
+        db_connector.simulated_indexes,
+        db_connector.cost_estimations,
+        db_connector.cost_estimation_duration,
+        db_connector.index_simulation_duration,
+    )
+
+
+def statistics_difference(before, after):
+    return [
+        value_after - value_before for value_before, value_after in zip(before, after)
+    ]
+
+
+def add_cost_evaluation_statistics(cost_evaluation, statistics):
+    (
+        cost_requests,
+        cache_hits,
+        simulated_indexes,
+        cost_estimations,
+        cost_estimation_duration,
+        index_simulation_duration,
+    ) = statistics
+    cost_evaluation.cost_requests += cost_requests
+    cost_evaluation.cache_hits += cache_hits
+    db_connector = cost_evaluation.db_connector
+    db_connector.simulated_indexes += simulated_indexes
+    db_connector.cost_estimations += cost_estimations
+    db_connector.cost_estimation_duration += cost_estimation_duration
+    db_connector.index_simulation_duration += index_simulation_duration
+
+
+# Evaluates index configurations in a pool of processes. Every process has its own
+# database connection and CostEvaluation. In contrast to the WhatIfConnectionPool,
+# which only distributes the what-if calls, the index simulation and costing of the
+# cost evaluation is parallelized as well.
+#
+# Costs and index sizes are looked up in the caches of `cost_evaluation`, see
+# CostEvaluation.cost_cache_keys(), and only the missing ones are requested by the
+# workers. Their results are stored in these caches. Hence, cost requests and cache
+# hits are counted like for a serial evaluation. Index state scheduling and plan cost
+# derivation rely on the state of a single connection and are not supported. Only
+# what-if costs are requested because actual runtimes would require the workers to
+# create real indexes on the same database at the same time.
+#
+# Results are returned in the order of the requests. What-if costs do not depend on
+# the connection that requested them. Hence, the results equal the ones of a serial
+# evaluation. The database statistics of the workers are added to the database
+# connector of `cost_evaluation`.
+class CostEvaluationProcessPool:
+    def __init__(self, cost_evaluation, workload, number_of_processes):
+        logging.debug(
+            f"Init CostEvaluationProcessPool with {number_of_processes} workers"
+        )
+        assert (
+            cost_evaluation.cost_estimation == "whatif"
+        ), "CostEvaluationProcessPool only supports what-if cost estimation"
+        assert (
+            cost_evaluation.index_state_scheduling == "strict"
+        ), "CostEvaluationProcessPool does not support index state scheduling"
+        assert (
+            cost_evaluation.plan_cost_derivation is None
+        ), "CostEvaluationProcessPool does not support plan cost derivation"
+        self.cost_evaluation = cost_evaluation
+        self.workload = workload
+        db_connector = cost_evaluation.db_connector
+        # Forked workers would share the parent's database connection
+        self._executor = ProcessPoolExecutor(
+            max_workers=number_of_processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                type(db_connector),
+                db_connector.db_name,
+                workload,
+                cost_evaluation.cost_estimation,
+            ),
+        )
+
+    # `requests`: [(indexes, query positions)], see _calculate_query_costs(). Returns
+    # the query costs per request. If `store_size`, the sizes of the requests' indexes
+    # are assigned to the passed index objects.
+    def calculate_query_costs(self, requests, store_size=False):
+        cost_evaluation = self.cost_evaluation
+        query_costs = []
+        # Per request: [(position in the request's costs, cost cache key)] of the
+        # costs that are requested from the workers
+        missing_costs = []
+        # {cost cache key: cost}, None until a worker returned the cost
+        requested_costs = {}
+        futures = []
+        for indexes, query_positions in requests:
+            indexes = list(indexes)
+            if query_positions is None:
+                query_positions = range(len(self.workload.queries))
+            queries = [self.workload.queries[position] for position in query_positions]
+
+            costs = []
+            missing = []
+            missing_query_positions = []
+            missing_keys = []
+            keys = cost_evaluation.cost_cache_keys(queries, indexes)
+            for query_position, key in zip(query_positions, keys):
+                cost_evaluation.cost_requests += 1
+                if key in requested_costs:
+                    # Requested by a previous request of the same call
+                    cost_evaluation.cache_hits += 1
+                    cost = None
+                else:
+                    cost = cost_evaluation.cached_cost(key)
+                    if cost is None:
+                        requested_costs[key] = None
+                        missing_query_positions.append(query_position)
+                        missing_keys.append(key)
+                if cost is None:
+                    missing.append((len(costs), key))
+                costs.append(cost)
+            query_costs.append(costs)
+            missing_costs.append(missing)
+
+            unknown_sizes = store_size and any(
+                cost_evaluation.known_size(index) is None for index in indexes
+            )
+            future = None
+            if missing_query_positions or unknown_sizes:
+                future = self._executor.submit(
+                    _calculate_query_costs, indexes, missing_query_positions, store_size
+                )
+            futures.append((indexes, missing_keys, future))
+
+        for indexes, missing_keys, future in futures:
+            if future is None:
+                continue
+            costs, sizes, statistics = future.result()
+            # Cost requests and cache hits were already counted by this process
+            add_cost_evaluation_statistics(cost_evaluation, [0, 0] + statistics[2:])
+            for key, cost in zip(missing_keys, costs):
+                requested_costs[key] = cost
+                cost_evaluation.store_cost(key, cost)
+            if store_size:
+                for index, size in zip(indexes, sizes):
+                    learned = index.estimated_size is None
+                    if learned:
+                        index.estimated_size = size
+                    cost_evaluation.store_size(index, learned)
+
+        for costs, missing in zip(query_costs, missing_costs):
+            for position, key in missing:
+                costs[position] = requested_costs[key]
+        return query_costs
+
+    def close(self):
+        self._executor.shutdown(wait=True)
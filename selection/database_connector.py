@@ -14,6 +14,9 @@ class DatabaseConnector:
         self.cost_estimations = 0
         self.cost_estimation_duration = 0
         self.index_simulation_duration = 0
+        # Statements of queries without views do not change between cost requests:
+        # {query: statement}
+        self._query_statements = {}
 
     def exec_only(self, statement):
         self._cursor.execute(statement)
@@ -42,6 +45,15 @@ class DatabaseConnector:
         self.exec_only(statement)
 
     def _prepare_query(self, query):
+        if query in self._query_statements:
+            return self._query_statements[query]
+
+        if "create view" not in query.text:
+            for query_statement in query.text.split(";"):
+                if "select" in query_statement or "SELECT" in query_statement:
+                    self._query_statements[query] = query_statement
+                    return query_statement
+
         for query_statement in query.text.split(";"):
             if "create view" in query_statement:
                 try:
@@ -61,12 +73,40 @@ class DatabaseConnector:
 
         return result
 
+    # Returns the oid, the name, and, if `store_size`, the estimated size of every
+    # hypothetical index in the order of `indexes`
+    def simulate_indexes(self, indexes, store_size=False):
+        self.simulated_indexes += len(indexes)
+
+        start_time = time.time()
+        results = self._simulate_indexes(indexes, store_size)
+        end_time = time.time()
+        self.index_simulation_duration += end_time - start_time
+
+        return results
+
+    # Whether simulate_indexes() creates multiple indexes with a single statement
+    def supports_bulk_index_simulation(self):
+        return False
+
     def drop_simulated_index(self, identifier):
         start_time = time.time()
         self._drop_simulated_index(identifier)
         end_time = time.time()
         self.index_simulation_duration += end_time - start_time
 
+    def hide_simulated_index(self, identifier):
+        start_time = time.time()
+        self._hide_simulated_index(identifier)
+        end_time = time.time()
+        self.index_simulation_duration += end_time - start_time
+
+    def unhide_simulated_index(self, identifier):
+        start_time = time.time()
+        self._unhide_simulated_index(identifier)
+        end_time = time.time()
+        self.index_simulation_duration += end_time - start_time
+
     def get_cost(self, query):
         self.cost_estimations += 1
 
@@ -104,6 +144,17 @@ class DatabaseConnector:
     def set_random_seed(self, value):
         raise NotImplementedError
 
+    # Returns a string that changes whenever the data, the optimizer statistics, or
+    # the optimizer's cost settings change. Used to invalidate persistently cached
+    # cost estimations.
+    def statistics_fingerprint(self):
+        raise NotImplementedError
+
+    # Returns (table name, column name, number of rows, average column width) for
+    # every column. Used to estimate index sizes analytically.
+    def index_size_statistics(self):
+        raise NotImplementedError
+
     def _get_cost(self, query):
         raise NotImplementedError
 
@@ -113,5 +164,14 @@ class DatabaseConnector:
     def _simulate_index(self, index):
         raise NotImplementedError
 
+    def _simulate_indexes(self, indexes, store_size):
+        raise NotImplementedError
+
     def _drop_simulated_index(self, identifier):
         raise NotImplementedError
+
+    def _hide_simulated_index(self, identifier):
+        raise NotImplementedError
+
+    def _unhide_simulated_index(self, identifier):
+        raise NotImplementedError
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import time
+
+import psycopg2
+import psycopg2.extensions
+
+from selection.dbms.postgres_dbms import PostgresDatabaseConnector, parse_total_cost
+
+
+# A PostgreSQL session whose statements are awaited instead of blocking. It uses
+# psycopg2's asynchronous connections that are driven by the asyncio event loop.
+# Hence, many sessions can wait for the database system within a single thread.
+#
+# Asynchronous connections are always in autocommit mode and support a single cursor.
+# Queries with views are only supported if the views can be inlined, see
+# PostgresDatabaseConnector._inline_views().
+class AsyncPostgresConnection:
+    def __init__(self, db_name):
+        self.db_name = db_name
+        self._connection = None
+        self._cursor = None
+        # {query: statement}
+        self._query_statements = {}
+
+        self.simulated_indexes = 0
+        self.cost_estimations = 0
+        self.cost_estimation_duration = 0
+        self.index_simulation_duration = 0
+
+    async def connect(self):
+        self._connection = psycopg2.connect(f"dbname={self.db_name}", async_=1)
+        await self._wait()
+        self._cursor = self._connection.cursor()
+        await self.exec_only("SELECT setseed(0.17)")
+        logging.debug(f"Async Postgres connection created: {self.db_name}")
+
+    async def _wait(self):
+        loop = asyncio.get_running_loop()
+        file_descriptor = self._connection.fileno()
+        while True:
+            state = self._connection.poll()
+            if state == psycopg2.extensions.POLL_OK:
+                return
+
+            ready = loop.create_future()
+
+            def set_ready():
+                if not ready.done():
+                    ready.set_result(None)
+
+            if state == psycopg2.extensions.POLL_READ:
+                loop.add_reader(file_descriptor, set_ready)
+                remove = loop.remove_reader
+            elif state == psycopg2.extensions.POLL_WRITE:
+                loop.add_writer(file_descriptor, set_ready)
+                remove = loop.remove_writer
+            else:
+                raise psycopg2.OperationalError(f"Unexpected poll state: {state}")
+            try:
+                await ready
+            finally:
+                remove(file_descriptor)
+
+    async def exec_only(self, statement):
+        self._cursor.execute(statement)
+        await self._wait()
+
+    async def exec_fetch(self, statement, one=True):
+        await self.exec_only(statement)
+        if one:
+            return self._cursor.fetchone()
+        return self._cursor.fetchall()
+
+    async def get_cost(self, query):
+        self.cost_estimations += 1
+        start_time = time.time()
+        statement = self._statement(query)
+        root_line = (await self.exec_fetch(f"explain {statement}"))[0]
+        cost = parse_total_cost(root_line)
+        if cost is None:
+            # See PostgresDatabaseConnector._get_cost()
+            logging.debug(f"Cannot parse the cost of {query} from: {root_line}")
+            plan = await self.exec_fetch(f"explain (format json) {statement}")
+            cost = plan[0][0]["Plan"]["Total Cost"]
+        self.cost_estimation_duration += time.time() - start_time
+        return cost
+
+    async def get_plan(self, query):
+        self.cost_estimations += 1
+        start_time = time.time()
+        statement = f"explain (format json) {self._statement(query)}"
+        plan = (await self.exec_fetch(statement))[0][0]["Plan"]
+        self.cost_estimation_duration += time.time() - start_time
+        return plan
+
+    # Returns the oid and the name of the hypothetical index
+    async def simulate_index(self, index):
+        self.simulated_indexes += 1
+        start_time = time.time()
+        statement = (
+            "select * from hypopg_create_index( "
+            f"'create index on {index.table()} "
+            f"({index.joined_column_names()})')"
+        )
+        result = await self.exec_fetch(statement)
+        self.index_simulation_duration += time.time() - start_time
+        return result
+
+    async def drop_simulated_index(self, oid):
+        start_time = time.time()
+        result = await self.exec_fetch(f"select * from hypopg_drop_index({oid})")
+        self.index_simulation_duration += time.time() - start_time
+
+        assert result[0] is True, f"Could not drop simulated index with oid = {oid}."
+
+    def close(self):
+        self._connection.close()
+        logging.debug(f"Async Postgres connection closed: {self.db_name}")
+
+    def _statement(self, query):
+        if query not in self._query_statements:
+            if "create view" in query.text:
+                statement = PostgresDatabaseConnector._inline_views(query.text)
+                assert statement is not None, f"Cannot inline the views of {query}"
+                assert (
+                    self._connection.server_version >= 120000
+                ), "Inlining views requires PostgreSQL >= 12"
+            else:
+                statement = next(
+                    query_statement
+                    for query_statement in query.text.split(";")
+                    if "select" in query_statement or "SELECT" in query_statement
+                )
+            self._query_statements[query] = statement
+        return self._query_statements[query]
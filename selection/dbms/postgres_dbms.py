@@ -5,6 +5,27 @@ import psycopg2
 
 from selection.database_connector import DatabaseConnector
 
+# Matches the total cost of the first line of a text-format EXPLAIN, e.g.,
+# "Seq Scan on nation  (cost=0.00..1.25 rows=25 width=109)"
+TOTAL_COST_PATTERN = re.compile(r"\(cost=[0-9.]+\.\.([0-9.]+) ")
+# Matches view definitions, e.g., TPC-H Q15's
+# "create view revenue0 (supplier_no, total_revenue) as select ..."
+VIEW_PATTERN = re.compile(
+    r"^\s*create view\s+(\w+)\s*(\([^)]*\))?\s+as\s+(.*)$", re.IGNORECASE | re.DOTALL
+)
+# Matches the WITH keyword of statements with common table expressions and, if
+# present, RECURSIVE
+WITH_PATTERN = re.compile(r"^with\s+(recursive\s+)?", re.IGNORECASE)
+
+
+# Returns the total cost of the first line of a text-format EXPLAIN or None if the
+# line does not match TOTAL_COST_PATTERN
+def parse_total_cost(root_line):
+    match = TOTAL_COST_PATTERN.search(root_line)
+    if match is None:
+        return None
+    return float(match.group(1))
+
 
 class PostgresDatabaseConnector(DatabaseConnector):
     def __init__(self, db_name, autocommit=False):
@@ -103,6 +124,48 @@ class PostgresDatabaseConnector(DatabaseConnector):
         logging.info(f"Postgres: Set random seed `SELECT setseed({value})`")
         self.exec_only(f"SELECT setseed({value})")
 
+    # Besides the data and its statistics, the planner's cost settings and the hypopg
+    # version influence what-if costs
+    def statistics_fingerprint(self):
+        statement = """select md5(
+            current_setting('server_version_num') || '|' ||
+            (select coalesce(max(extversion), '') from pg_extension
+             where extname = 'hypopg') || '|' ||
+            (select coalesce(string_agg(name || '=' || setting, ',' order by name), '')
+             from pg_settings
+             where name in ('random_page_cost', 'seq_page_cost',
+                 'effective_cache_size', 'work_mem', 'parallel_setup_cost',
+                 'parallel_tuple_cost')
+                 or name like 'cpu\\_%\\_cost' or name like 'enable\\_%') || '|' ||
+            (select coalesce(string_agg(
+                c.relname || ':' || c.reltuples || ':' || c.relpages, ','
+                order by c.relname), '')
+             from pg_class c join pg_namespace n on n.oid = c.relnamespace
+             where n.nspname = 'public' and c.relkind = 'r') || '|' ||
+            (select coalesce(string_agg(
+                s.tablename || '.' || s.attname || ':' || s.null_frac || ':' ||
+                s.avg_width || ':' || s.n_distinct || ':' ||
+                coalesce(s.correlation::text, ''), ','
+                order by s.tablename, s.attname), '')
+             from pg_stats s where s.schemaname = 'public'))"""
+        result = self.exec_fetch(statement)
+        return result[0]
+
+    # Columns without statistics are estimated by their type's length or, for types
+    # of variable length, by PostgreSQL's default width of 32 bytes
+    def index_size_statistics(self):
+        statement = """select c.relname, a.attname, greatest(c.reltuples, 0),
+            coalesce(s.avg_width, case when t.typlen > 0 then t.typlen else 32 end)
+            from pg_class c
+            join pg_namespace n on n.oid = c.relnamespace
+            join pg_attribute a on a.attrelid = c.oid
+            join pg_type t on t.oid = a.atttypid
+            left join pg_stats s on s.schemaname = n.nspname
+                and s.tablename = c.relname and s.attname = a.attname
+            where n.nspname = 'public' and c.relkind = 'r'
+                and a.attnum > 0 and not a.attisdropped"""
+        return self.exec_fetch(statement, one=False)
+
     def supports_index_simulation(self):
         if self.db_system == "postgres":
             return True
@@ -118,12 +181,45 @@ class PostgresDatabaseConnector(DatabaseConnector):
         result = self.exec_fetch(statement)
         return result
 
+    def supports_bulk_index_simulation(self):
+        return True
+
+    # Creates all hypothetical indexes with a single statement. `with ordinality`
+    # preserves the order of the indexes.
+    def _simulate_indexes(self, indexes, store_size):
+        create_statements = ", ".join(
+            f"'create index on {index.table()} ({index.joined_column_names()})'"
+            for index in indexes
+        )
+        size = ", hypopg_relation_size(h.indexrelid)" if store_size else ""
+        statement = (
+            f"select h.indexrelid, h.indexname{size} "
+            f"from unnest(array[{create_statements}]) "
+            "with ordinality as s(create_statement, position), "
+            "lateral hypopg_create_index(s.create_statement) h "
+            "order by s.position"
+        )
+        return self.exec_fetch(statement, one=False)
+
     def _drop_simulated_index(self, oid):
         statement = f"select * from hypopg_drop_index({oid})"
         result = self.exec_fetch(statement)
 
         assert result[0] is True, f"Could not drop simulated index with oid = {oid}."
 
+    # Hiding hypothetical indexes requires HypoPG >= 1.3.1
+    def _hide_simulated_index(self, oid):
+        statement = f"select * from hypopg_hide_index({oid})"
+        result = self.exec_fetch(statement)
+
+        assert result[0] is True, f"Could not hide simulated index with oid = {oid}."
+
+    def _unhide_simulated_index(self, oid):
+        statement = f"select * from hypopg_unhide_index({oid})"
+        result = self.exec_fetch(statement)
+
+        assert result[0] is True, f"Could not unhide simulated index with oid = {oid}."
+
     def create_index(self, index):
         table_name = index.table()
         statement = (
@@ -173,16 +269,74 @@ class PostgresDatabaseConnector(DatabaseConnector):
         self._cursor.execute(query)
         return self._cursor.fetchall()
 
+    # Queries with views are rewritten once such that the views become common table
+    # expressions. Hence, no views have to be created and dropped per request.
+    # NOT MATERIALIZED (PostgreSQL >= 12) lets the planner inline the expressions like
+    # views. Older versions always materialize them, i.e., plans would differ.
+    def _prepare_query(self, query):
+        if query not in self._query_statements and "create view" in query.text:
+            if self._connection.server_version >= 120000:
+                statement = self._inline_views(query.text)
+                if statement is not None:
+                    self._query_statements[query] = statement
+        return DatabaseConnector._prepare_query(self, query)
+
+    # Returns None if the query text cannot be rewritten
+    @staticmethod
+    def _inline_views(query_text):
+        common_table_expressions = []
+        select_statement = None
+        for query_statement in query_text.split(";"):
+            match = VIEW_PATTERN.match(query_statement)
+            if match:
+                name, columns, definition = match.groups()
+                columns = f" {columns}" if columns else ""
+                common_table_expressions.append(
+                    f"{name}{columns} as not materialized ({definition.strip()})"
+                )
+            elif "drop view" in query_statement or not query_statement.strip():
+                continue
+            elif select_statement is None:
+                select_statement = query_statement.strip()
+            else:
+                return None
+        if select_statement is None or len(common_table_expressions) == 0:
+            return None
+
+        with_clause = ", ".join(common_table_expressions)
+        match = WITH_PATTERN.match(select_statement)
+        if match is None:
+            return f"with {with_clause} {select_statement}"
+        # Queries with recursive common table expressions are not rewritten
+        if match.group(1):
+            return None
+        # Views are defined before the common table expressions of the query itself
+        return f"with {with_clause}, {select_statement[match.end():]}"
+
     def _cleanup_query(self, query):
+        # Rewritten queries do not create views
+        if "drop view" not in query.text or query in self._query_statements:
+            return
         for query_statement in query.text.split(";"):
             if "drop view" in query_statement:
                 self.exec_only(query_statement)
                 self.commit()
 
+    # Only the root node's cost is needed. Hence, the plan is requested in text format
+    # and only its first line is parsed instead of decoding the JSON plan. Both
+    # formats round costs to two decimals, i.e., the costs are identical. If the line
+    # cannot be parsed, e.g., because of other cost formats, the JSON plan is used.
     def _get_cost(self, query):
-        query_plan = self._get_plan(query)
-        total_cost = query_plan["Total Cost"]
-        return total_cost
+        query_text = self._prepare_query(query)
+        self._cursor.execute(f"explain {query_text}")
+        root_line = self._cursor.fetchone()[0]
+        cost = parse_total_cost(root_line)
+        if cost is None:
+            logging.debug(f"Cannot parse the cost of {query} from: {root_line}")
+            self._cursor.execute(f"explain (format json) {query_text}")
+            cost = self._cursor.fetchone()[0][0]["Plan"]["Total Cost"]
+        self._cleanup_query(query)
+        return cost
 
     def _get_plan(self, query):
         query_text = self._prepare_query(query)
@@ -1,8 +1,39 @@
+import itertools
+import weakref
 from functools import total_ordering
 
 
+# Equal objects share the same InternedId. The InternedIds are only referenced by
+# these objects. Hence, intern tables shrink again once all equal objects are gone,
+# e.g., the candidates of a finished algorithm run.
+class InternedId:
+    __slots__ = ("value", "__weakref__")
+    _next_value = itertools.count()
+
+    def __init__(self):
+        self.value = next(InternedId._next_value)
+
+
+# Returns the InternedId of `key` in `intern_table`, a WeakValueDictionary
+def interned_id(intern_table, key):
+    interned = intern_table.get(key)
+    if interned is None:
+        interned = InternedId()
+        intern_table[key] = interned
+    return interned
+
+
+# Equal indexes share the same interned id: {(column ids): InternedId}
+_INDEX_IDS = weakref.WeakValueDictionary()
+
+
 @total_ordering
 class Index:
+    # Index objects are created, hashed, and compared very frequently, e.g., for every
+    # cache lookup. Hence, no __dict__ is used and equality is based on interned ids.
+    # `hypopg_oid` is only set while the index is simulated.
+    __slots__ = ("columns", "estimated_size", "hypopg_name", "hypopg_oid", "_id")
+
     def __init__(self, columns, estimated_size=None):
         if len(columns) == 0:
             raise ValueError("Index needs at least 1 column")
@@ -10,6 +41,8 @@ class Index:
         # Store hypopg estimated size when `store_size=True` (whatif)
         self.estimated_size = estimated_size
         self.hypopg_name = None
+        # Assigned lazily because the columns' tables might not be known yet
+        self._id = None
 
     # Used to sort indexes
     def __lt__(self, other):
@@ -26,10 +59,29 @@ class Index:
         if not isinstance(other, Index):
             return False
 
-        return self.columns == other.columns
+        return self._index_id() == other._index_id()
 
     def __hash__(self):
-        return hash(self.columns)
+        return self._index_id()
+
+    def _index_id(self):
+        if self._id is None:
+            column_ids = tuple(column._column_id() for column in self.columns)
+            self._id = interned_id(_INDEX_IDS, column_ids)
+        return self._id.value
+
+    # Interned ids are only valid within a process and are, thus, not pickled
+    def __getstate__(self):
+        return {
+            slot: getattr(self, slot)
+            for slot in self.__slots__
+            if slot != "_id" and hasattr(self, slot)
+        }
+
+    def __setstate__(self, state):
+        self._id = None
+        for slot, value in state.items():
+            setattr(self, slot, value)
 
     def _column_names(self):
         return [x.name for x in self.columns]
@@ -0,0 +1,221 @@
+from collections import OrderedDict
+
+
+# Assigns a bit position to every index candidate of a workload. Index configurations
+# of the same registry are represented as integer bitmasks. Hence, set operations and
+# comparisons do not depend on the number of indexes.
+# Indexes are registered on first use, i.e., candidates can be added over time.
+class IndexCandidateRegistry:
+    # Maximum number of interned configurations, least recently used ones are evicted
+    MAX_INTERNED_CONFIGURATIONS = 100000
+
+    def __init__(self, indexes=None):
+        self.indexes = []
+        # {index: bit position}
+        self.positions = {}
+        # Estimated sizes of the candidates, None if unknown
+        self.sizes = []
+        # Query x candidate relevance matrix with one bitmask row per query:
+        # {query: (relevance mask, number of candidates considered for the mask)}
+        self._relevance_masks = {}
+        # {mask: configuration}, see interned()
+        self._configurations = OrderedDict()
+
+        if indexes is not None:
+            for index in indexes:
+                self.register(index)
+
+    def register(self, index):
+        position = self.positions.get(index)
+        if position is None:
+            position = len(self.indexes)
+            self.positions[index] = position
+            self.indexes.append(index)
+            self.sizes.append(index.estimated_size)
+        return position
+
+    def mask(self, indexes):
+        if isinstance(indexes, IndexConfiguration) and indexes.registry is self:
+            return indexes.mask
+
+        mask = 0
+        for index in indexes:
+            mask |= 1 << self.register(index)
+        return mask
+
+    # Like mask() but unknown indexes are not registered. Returns the mask of the known
+    # indexes and whether all indexes are known. Used by read-only operations that
+    # must not grow the registry.
+    def known_mask(self, indexes):
+        if isinstance(indexes, IndexConfiguration) and indexes.registry is self:
+            return indexes.mask, True
+
+        mask = 0
+        all_known = True
+        for index in indexes:
+            position = self.positions.get(index)
+            if position is None:
+                all_known = False
+            else:
+                mask |= 1 << position
+        return mask, all_known
+
+    def configuration(self, indexes=()):
+        if isinstance(indexes, IndexConfiguration) and indexes.registry is self:
+            return indexes
+        return IndexConfiguration(self, self.mask(indexes))
+
+    # Returns the same configuration object for equal masks. Interned configurations
+    # are used as cache keys: their hash is only computed once and dictionary lookups
+    # succeed on the identity check. Evicted configurations are equal to newly
+    # created ones, i.e., eviction only affects performance.
+    def interned(self, mask):
+        configuration = self._configurations.get(mask)
+        if configuration is None:
+            configuration = IndexConfiguration(self, mask)
+            self._configurations[mask] = configuration
+            if len(self._configurations) > self.MAX_INTERNED_CONFIGURATIONS:
+                self._configurations.popitem(last=False)
+        else:
+            self._configurations.move_to_end(mask)
+        return configuration
+
+    # Bitmask of all candidates that contain at least one column of `query`. Rows are
+    # computed once per query and only extended for candidates that were registered
+    # since the last call.
+    def relevance_mask(self, query):
+        mask, considered = self._relevance_masks.get(query, (0, 0))
+        if considered < len(self.indexes):
+            query_columns = set(query.columns)
+            for position in range(considered, len(self.indexes)):
+                if any(
+                    column in query_columns for column in self.indexes[position].columns
+                ):
+                    mask |= 1 << position
+            self._relevance_masks[query] = (mask, len(self.indexes))
+        return mask
+
+    def size(self, position):
+        if self.sizes[position] is None:
+            self.sizes[position] = self.indexes[position].estimated_size
+        assert self.sizes[position] is not None, "Index size is unknown"
+        return self.sizes[position]
+
+
+# An immutable set of indexes that is encoded as a bitmask over the positions of an
+# IndexCandidateRegistry. Configurations can be combined with arbitrary iterables of
+# indexes, e.g., sets. Operations with configurations of the same registry only
+# operate on the bitmasks.
+#
+# Configurations are equal to sets with the same indexes and have the same hash as
+# the corresponding frozenset. Hence, they can be used interchangeably with frozensets
+# as cost cache keys.
+class IndexConfiguration:
+    __slots__ = ("registry", "mask", "_hash")
+
+    def __init__(self, registry, mask=0):
+        self.registry = registry
+        self.mask = mask
+        self._hash = None
+
+    def __iter__(self):
+        mask = self.mask
+        while mask:
+            lowest_bit = mask & -mask
+            yield self.registry.indexes[lowest_bit.bit_length() - 1]
+            mask ^= lowest_bit
+
+    def __len__(self):
+        return bin(self.mask).count("1")
+
+    def __bool__(self):
+        return self.mask != 0
+
+    def __contains__(self, index):
+        position = self.registry.positions.get(index)
+        return position is not None and (self.mask >> position) & 1 == 1
+
+    def __repr__(self):
+        return f"IndexConfiguration({sorted(self)})"
+
+    def __eq__(self, other):
+        if isinstance(other, IndexConfiguration) and other.registry is self.registry:
+            return self.mask == other.mask
+        if not isinstance(other, (IndexConfiguration, set, frozenset)):
+            return NotImplemented
+        return len(self) == len(other) and all(index in self for index in other)
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(frozenset(self))
+        return self._hash
+
+    # Subset relation, consistent with the comparison of sets. Indexes that are not
+    # registered cannot be part of this configuration and are not registered.
+    def __le__(self, other):
+        other_mask, _ = self.registry.known_mask(other)
+        return self.mask & other_mask == self.mask
+
+    def __lt__(self, other):
+        other_mask, all_known = self.registry.known_mask(other)
+        return (self.mask != other_mask or not all_known) and (
+            self.mask & other_mask == self.mask
+        )
+
+    def __ge__(self, other):
+        other_mask, all_known = self.registry.known_mask(other)
+        return all_known and self.mask & other_mask == other_mask
+
+    def __gt__(self, other):
+        other_mask, all_known = self.registry.known_mask(other)
+        return (
+            all_known and self.mask != other_mask and self.mask & other_mask == other_mask
+        )
+
+    def __or__(self, other):
+        return IndexConfiguration(self.registry, self.mask | self.registry.mask(other))
+
+    __ror__ = __or__
+
+    def __and__(self, other):
+        other_mask, _ = self.registry.known_mask(other)
+        return IndexConfiguration(self.registry, self.mask & other_mask)
+
+    __rand__ = __and__
+
+    def __sub__(self, other):
+        other_mask, _ = self.registry.known_mask(other)
+        return IndexConfiguration(self.registry, self.mask & ~other_mask)
+
+    def __rsub__(self, other):
+        return IndexConfiguration(self.registry, self.registry.mask(other) & ~self.mask)
+
+    def with_index(self, index):
+        mask = self.mask | 1 << self.registry.register(index)
+        return IndexConfiguration(self.registry, mask)
+
+    def without_index(self, index):
+        mask, _ = self.registry.known_mask([index])
+        return IndexConfiguration(self.registry, self.mask & ~mask)
+
+    def issubset(self, other):
+        return self <= other
+
+    def issuperset(self, other):
+        return self >= other
+
+    def union(self, other):
+        return self | other
+
+    def difference(self, other):
+        return self - other
+
+    # Sum of the estimated sizes of all indexes in the configuration
+    def size(self):
+        total_size = 0
+        mask = self.mask
+        while mask:
+            lowest_bit = mask & -mask
+            total_size += self.registry.size(lowest_bit.bit_length() - 1)
+            mask ^= lowest_bit
+        return total_size
@@ -14,8 +14,12 @@ from selection.algorithms.drop_heuristic_algorithm import DropHeuristicAlgorithm
 from selection.algorithms.extend_algorithm import ExtendAlgorithm
 from selection.algorithms.relaxation_algorithm import RelaxationAlgorithm
 from selection.benchmark import Benchmark
+from selection.bounded_cost_cache import BoundedCostCache
 from selection.dbms.hana_dbms import HanaDatabaseConnector
 from selection.dbms.postgres_dbms import PostgresDatabaseConnector
+from selection.index_size_estimation import AnalyticalIndexSizeEstimator
+from selection.index_size_oracle import IndexSizeOracle
+from selection.persistent_cost_cache import PersistentCostCache
 from selection.query_generator import QueryGenerator
 from selection.selection_algorithm import AllIndexesAlgorithm, NoIndexAlgorithm
 from selection.table_generator import TableGenerator
@@ -46,6 +50,11 @@ class IndexSelection:
         self.disable_output_files = False
         self.database_name = None
         self.database_system = None
+        self.persistent_cost_cache = None
+        self.index_size_oracle = None
+        # Costs of the workload's queries without indexes, shared by all algorithms
+        # {query: cost}
+        self.no_index_costs = {}
 
     def run(self):
         """This is called when running `python3 -m selection`."""
@@ -110,6 +119,15 @@ class IndexSelection:
         self.db_connector.create_statistics()
         self.db_connector.commit()
 
+        # The fingerprint must be obtained after the statistics were created
+        if "persistent_cost_cache" in config:
+            self.persistent_cost_cache = PersistentCostCache(
+                config["persistent_cost_cache"],
+                self.database_name,
+                self.db_connector.statistics_fingerprint(),
+            )
+        self.index_size_oracle = self._create_index_size_oracle(config)
+
         for algorithm_config in config["algorithms"]:
             if algorithm_config["name"] == "cophy_input":
                 logging.info("CoPhy input is generated; but results are not calculated.")
@@ -117,14 +135,22 @@ class IndexSelection:
             # There are multiple configs if there is a parameter list
             # configured (as a list in the .json file)
             configs = self._find_parameter_list(algorithm_config)
+            # All configs of a parameter sweep operate on the same workload and
+            # database. Hence, costs and index sizes can be reused across configs.
+            sweep_caches = (self._create_sweep_cost_cache(configs), {})
             for algorithm_config_unfolded in configs:
                 start_time = time.time()
                 algorithm_config_unfolded["parameters"]["benchmark_name"] = config[
                     "benchmark_name"
                 ]
-                indexes, what_if, cost_requests, cache_hits = self._run_algorithm(
-                    algorithm_config_unfolded
-                )
+                (
+                    indexes,
+                    what_if,
+                    cost_requests,
+                    cache_hits,
+                    sweep_cache_hits,
+                    sweep_cache_misses,
+                ) = self._run_algorithm(algorithm_config_unfolded, sweep_caches)
                 calculation_time = round(time.time() - start_time, 2)
                 benchmark = Benchmark(
                     self.workload,
@@ -137,9 +163,42 @@ class IndexSelection:
                     cost_requests,
                     cache_hits,
                     what_if,
+                    sweep_cache_hits,
+                    sweep_cache_misses,
                 )
                 benchmark.benchmark()
 
+        if self.persistent_cost_cache:
+            self.persistent_cost_cache.close()
+        self.index_size_oracle.close()
+
+    # The shared cost cache of a parameter sweep is bounded if the cost caches of all
+    # its configs are bounded, see BoundedCostCache. It holds as many costs as the
+    # largest of these caches.
+    def _create_sweep_cost_cache(self, configs):
+        max_entries = [
+            config["parameters"].get("cost_cache_max_entries") for config in configs
+        ]
+        if None in max_entries:
+            return {}
+        eviction_policy = configs[0]["parameters"].get("cost_cache_eviction_policy")
+        return BoundedCostCache(max(max_entries), eviction_policy or "lru")
+
+    # Index sizes are shared by all algorithms. Optionally, they are persisted and
+    # estimated analytically, see README.md.
+    def _create_index_size_oracle(self, config):
+        estimator = None
+        if config.get("index_size_estimation", "hypopg") == "analytical":
+            estimator = AnalyticalIndexSizeEstimator.from_database(self.db_connector)
+        path = config.get("persistent_index_size_cache")
+        return IndexSizeOracle(
+            path,
+            self.database_name,
+            self.db_connector.statistics_fingerprint() if path else "",
+            estimator,
+            config.get("index_size_verification_rate", 0),
+        )
+
     # Parameter list example: {"max_indexes": [5, 10, 20]}
     # Creates config for each value
     def _find_parameter_list(self, algorithm_config):
@@ -166,12 +225,19 @@ class IndexSelection:
         if counter > 1:
             raise Exception("Too many parameter lists in config")
 
-    def _run_algorithm(self, config):
+    def _run_algorithm(self, config, sweep_caches=None):
         self.db_connector.drop_indexes()
         self.db_connector.commit()
         self.setup_db_connector(self.database_name, self.database_system)
 
         algorithm = self.create_algorithm_object(config["name"], config["parameters"])
+        algorithm.cost_evaluation.persistent_cache = self.persistent_cost_cache
+        # Actual runtimes differ between runs and are, thus, not shared
+        if sweep_caches and algorithm.cost_evaluation.cost_estimation == "whatif":
+            algorithm.cost_evaluation.use_shared_caches(*sweep_caches)
+        if algorithm.cost_evaluation.cost_estimation == "whatif":
+            algorithm.cost_evaluation.index_size_oracle = self.index_size_oracle
+            algorithm.cost_evaluation.no_index_costs = self.no_index_costs
         logging.info(f"Running algorithm {config}")
         indexes = algorithm.calculate_best_indexes(self.workload)
         logging.info(f"Indexes found: {indexes}")
@@ -185,7 +251,16 @@ class IndexSelection:
         cache_hits = (
             0 if config["name"] == "db2advis" else algorithm.cost_evaluation.cache_hits
         )
-        return indexes, what_if, cost_requests, cache_hits
+        sweep_cache_hits = algorithm.cost_evaluation.shared_cache_hits
+        sweep_cache_misses = algorithm.cost_evaluation.shared_cache_misses
+        return (
+            indexes,
+            what_if,
+            cost_requests,
+            cache_hits,
+            sweep_cache_hits,
+            sweep_cache_misses,
+        )
 
     def create_algorithm_object(self, algorithm_name, parameters):
         algorithm = ALGORITHMS[algorithm_name](self.db_connector, parameters)
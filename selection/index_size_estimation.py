@@ -0,0 +1,107 @@
+import logging
+import math
+
+
+# Estimates the sizes of B-tree indexes from the row counts of their tables and the
+# average widths of their columns, i.e., without creating hypothetical indexes.
+#
+# The estimation follows HypoPG's estimation of hypothetical B-tree indexes: every
+# index tuple consists of the column values, an IndexTupleData header per column, and
+# a (MAXALIGNed) ItemIdData line pointer per column. Pages are filled with the default
+# fill factor and HypoPG's fixed additional bloat.
+class AnalyticalIndexSizeEstimator:
+    PAGE_SIZE = 8192
+    PAGE_HEADER_SIZE = 24
+    # sizeof(BTPageOpaqueData)
+    SPECIAL_SPACE_SIZE = 16
+    # sizeof(IndexTupleData)
+    INDEX_TUPLE_HEADER_SIZE = 8
+    # sizeof(ItemIdData)
+    LINE_POINTER_SIZE = 4
+    MAXIMUM_ALIGNMENT = 8
+    FILL_FACTOR = 90
+    # In percent
+    ADDITIONAL_BLOAT = 20
+
+    # row_counts: {table name: number of rows}
+    # column_widths: {(table name, column name): average width in bytes}
+    #
+    # The statistics are only read once, see from_database(). Afterward, estimations
+    # do not require the database system, e.g., to prune index candidates by their
+    # size before any of them is simulated.
+    def __init__(self, row_counts, column_widths):
+        self.row_counts = row_counts
+        self.column_widths = column_widths
+        self.estimations = 0
+
+        usable_page_size = (
+            self.PAGE_SIZE - self.PAGE_HEADER_SIZE - self.SPECIAL_SPACE_SIZE
+        )
+        bloat_factor = (200 - self.FILL_FACTOR + self.ADDITIONAL_BLOAT) / 100
+        # Pages per byte of the index tuples: {table name: factor}
+        self._page_factors = {
+            table_name: row_count * bloat_factor / usable_page_size
+            for table_name, row_count in row_counts.items()
+        }
+        # Size of the tuple headers and line pointers: {number of columns: size}
+        self._tuple_overheads = {}
+
+    @classmethod
+    def from_database(cls, db_connector):
+        row_counts = {}
+        column_widths = {}
+        for (
+            table_name,
+            column_name,
+            row_count,
+            width,
+        ) in db_connector.index_size_statistics():
+            row_counts[table_name] = row_count
+            column_widths[(table_name, column_name)] = width
+        logging.debug(
+            f"Init analytical index size estimation for {len(row_counts)} tables"
+        )
+        return cls(row_counts, column_widths)
+
+    # Returns None if statistics of the index's table or columns are missing
+    def estimate(self, index):
+        return self.estimate_sizes([index])[0]
+
+    # Estimates the sizes of all `indexes` at once. The statistics of every table and
+    # column are only looked up once per call.
+    def estimate_sizes(self, indexes):
+        table_names = {}
+        sizes = []
+        for index in indexes:
+            table = index.table()
+            table_name = table_names.get(table)
+            if table_name is None:
+                table_name = str(table)
+                table_names[table] = table_name
+            page_factor = self._page_factors.get(table_name)
+
+            width = 0
+            for column in index.columns:
+                column_width = self.column_widths.get((table_name, column.name))
+                if column_width is None:
+                    width = None
+                    break
+                width += column_width
+            if page_factor is None or width is None:
+                sizes.append(None)
+                continue
+
+            tuple_size = width + self._tuple_overhead(len(index.columns))
+            sizes.append(int(page_factor * tuple_size) * self.PAGE_SIZE)
+            self.estimations += 1
+        return sizes
+
+    def _tuple_overhead(self, number_of_columns):
+        if number_of_columns not in self._tuple_overheads:
+            line_pointers_size = self.LINE_POINTER_SIZE * number_of_columns
+            self._tuple_overheads[number_of_columns] = (
+                self.INDEX_TUPLE_HEADER_SIZE * number_of_columns
+                + math.ceil(line_pointers_size / self.MAXIMUM_ALIGNMENT)
+                * self.MAXIMUM_ALIGNMENT
+            )
+        return self._tuple_overheads[number_of_columns]
@@ -0,0 +1,151 @@
+import logging
+import random
+import sqlite3
+
+
+# Provides index sizes by the indexes' tables and columns. In contrast to
+# Index.estimated_size, learned sizes are neither bound to Index objects nor to the
+# lifetime of hypothetical indexes. Hence, indexes that are newly created by, e.g.,
+# index_merge() or prefixes() do not have to be simulated to obtain their sizes.
+#
+# Sizes are learned from HypoPG, see learn(). Optionally,
+# - learned sizes are stored in a SQLite file such that they survive across runs and
+#   processes (`path`). Entries are keyed like PersistentCostCache entries, i.e., they
+#   are invalidated if the data or the statistics change.
+# - unknown sizes are estimated by an `estimator`, e.g., an
+#   AnalyticalIndexSizeEstimator. Then, HypoPG is only asked for a sample of the
+#   sizes to verify the estimations, see `verification_rate`. Whether a size is
+#   verified is decided once per index, such that repeated calls of size() agree.
+class IndexSizeOracle:
+    def __init__(
+        self,
+        path=None,
+        database_name="",
+        statistics_fingerprint="",
+        estimator=None,
+        verification_rate=0,
+    ):
+        logging.debug(f"Init index size oracle: {path}")
+        self.database_name = database_name
+        self.statistics_fingerprint = statistics_fingerprint
+        self.estimator = estimator
+        # Share of estimated sizes that are requested from HypoPG instead
+        self.verification_rate = verification_rate
+        # Fixed seed for reproducible verification samples
+        self._random = random.Random(0)
+        # {(table name, column names): size}
+        self.sizes = {}
+        # Estimated sizes that are returned by size():
+        # {(table name, column names): estimated size}
+        self._estimated_sizes = {}
+        # Estimated sizes that are verified once they are learned:
+        # {(table name, column names): estimated size}
+        self._pending_verifications = {}
+        self.learned_sizes = 0
+        self.stored_size_hits = 0
+        self.estimated_sizes = 0
+        self.verified_sizes = 0
+        # Sum of the relative deviations of verified estimations
+        self.estimation_error = 0
+
+        self._connection = None
+        if path is not None:
+            # See PersistentCostCache
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute("pragma journal_mode=wal")
+            self._connection.execute(
+                "create table if not exists index_sizes ("
+                "database_name text, statistics text, table_name text, "
+                "columns text, size integer, "
+                "primary key (database_name, statistics, table_name, columns))"
+            )
+            self._connection.commit()
+
+    @staticmethod
+    def key(index):
+        return (str(index.table()), tuple(column.name for column in index.columns))
+
+    # Returns None if the size is neither learned nor estimated
+    def size(self, index):
+        key = self.key(index)
+        size = self.sizes.get(key)
+        if size is not None:
+            return size
+
+        size = self._stored_size(key)
+        if size is not None:
+            self.stored_size_hits += 1
+            self.sizes[key] = size
+            return size
+
+        if self.estimator is None or key in self._pending_verifications:
+            return None
+        size = self._estimated_sizes.get(key)
+        if size is not None:
+            return size
+
+        size = self.estimator.estimate(index)
+        if size is None:
+            return None
+        if self._random.random() < self.verification_rate:
+            self._pending_verifications[key] = size
+            return None
+        self._estimated_sizes[key] = size
+        self.estimated_sizes += 1
+        return size
+
+    def learn(self, index, size):
+        key = self.key(index)
+        if key in self.sizes:
+            return
+        self.sizes[key] = size
+        self.learned_sizes += 1
+
+        if key in self._pending_verifications:
+            self._verify(key, self._pending_verifications.pop(key), size)
+        if self._connection is not None:
+            self._connection.execute(
+                "insert or replace into index_sizes values (?, ?, ?, ?, ?)",
+                self._stored_key(key) + (size,),
+            )
+
+    def flush(self):
+        if self._connection is not None:
+            self._connection.commit()
+
+    def close(self):
+        if self._connection is not None:
+            self.flush()
+            self._connection.close()
+            self._connection = None
+        logging.debug(
+            f"Index size oracle closed: {self.learned_sizes} learned, "
+            f"{self.stored_size_hits} stored, {self.estimated_sizes} estimated sizes"
+        )
+
+    def _stored_size(self, key):
+        if self._connection is None:
+            return None
+        result = self._connection.execute(
+            "select size from index_sizes where database_name = ? "
+            "and statistics = ? and table_name = ? and columns = ?",
+            self._stored_key(key),
+        ).fetchone()
+        return None if result is None else result[0]
+
+    def _stored_key(self, key):
+        table_name, column_names = key
+        return (
+            self.database_name,
+            self.statistics_fingerprint,
+            table_name,
+            ",".join(column_names),
+        )
+
+    def _verify(self, key, estimated_size, size):
+        self.verified_sizes += 1
+        if size == 0:
+            return
+        deviation = abs(estimated_size - size) / size
+        self.estimation_error += deviation
+        logging.debug(f"Estimated size of {key} deviates by {deviation:.1%}")
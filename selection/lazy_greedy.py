@@ -0,0 +1,76 @@
+import heapq
+import logging
+import math
+
+
+# Lazy evaluation of greedy selection steps. Greedy algorithms usually evaluate every
+# remaining candidate in every step. If benefits are submodular, i.e., the benefit of a
+# candidate does not increase when other candidates were selected, the benefit that a
+# candidate had in an earlier step is an upper bound of its current benefit. Hence,
+# only the candidate with the highest (stale) bound has to be re-evaluated until a
+# candidate with a current benefit is the highest one.
+#
+# Benefits are not strictly submodular for indexes. Therefore, lazy steps can select
+# other candidates than exhaustive steps. With `verify`, every step is additionally
+# evaluated exhaustively and the divergences are counted.
+class LazyGreedySelection:
+    def __init__(self, verify=False):
+        self.verify = verify
+        # {candidate: benefit of the candidate's last evaluation}
+        self._bounds = {}
+        self.steps = 0
+        self.evaluations = 0
+        self.divergences = 0
+
+    # Forgets all bounds, e.g., when the candidates or the workload change
+    def reset(self):
+        self._bounds = {}
+
+    # `evaluate` returns (benefit, eligible) for each of the passed candidates. Only
+    # eligible candidates with positive benefits are selected. Ties are broken by the
+    # order of `candidates` like in exhaustive steps that keep the first best
+    # candidate. Returns None if no candidate can be selected.
+    def select(self, candidates, evaluate):
+        self.steps += 1
+        heap = [
+            (-self._bounds.get(candidate, math.inf), position, candidate)
+            for position, candidate in enumerate(candidates)
+        ]
+        heapq.heapify(heap)
+        evaluated = set()
+
+        selected = None
+        while heap and -heap[0][0] > 0:
+            negative_bound, position, candidate = heapq.heappop(heap)
+            if candidate in evaluated:
+                selected = candidate
+                break
+
+            # Unevaluated candidates have infinite bounds and are evaluated at once
+            batch = [(position, candidate)]
+            while negative_bound == -math.inf and heap and heap[0][0] == -math.inf:
+                _, position, candidate = heapq.heappop(heap)
+                batch.append((position, candidate))
+
+            results = evaluate([candidate for _, candidate in batch])
+            self.evaluations += len(batch)
+            for (position, candidate), (benefit, eligible) in zip(batch, results):
+                self._bounds[candidate] = benefit
+                evaluated.add(candidate)
+                if eligible:
+                    heapq.heappush(heap, (-benefit, position, candidate))
+
+        if self.verify:
+            self._verify(candidates, evaluate, selected)
+        return selected
+
+    def _verify(self, candidates, evaluate, selected):
+        best_candidate = None
+        best_benefit = 0
+        for candidate, (benefit, eligible) in zip(candidates, evaluate(candidates)):
+            if eligible and benefit > best_benefit:
+                best_candidate = candidate
+                best_benefit = benefit
+        if best_candidate != selected:
+            self.divergences += 1
+            logging.debug(f"Lazy greedy selected {selected} instead of {best_candidate}")
@@ -0,0 +1,90 @@
+import hashlib
+import logging
+import sqlite3
+
+
+# Stores what-if cost estimations on disk so that they survive across runs of the
+# evaluation platform. Entries are keyed by the database name, a fingerprint of the
+# database's statistics, a hash of the query text, and a canonical signature of the
+# (relevant) index configuration. Hence, entries are automatically invalidated if the
+# data, the statistics, or the query change.
+class PersistentCostCache:
+    # Number of insertions after which the pending writes are committed
+    COMMIT_INTERVAL = 1000
+
+    def __init__(self, path, database_name, statistics_fingerprint):
+        logging.debug(f"Init persistent cost cache: {path}")
+        self.path = path
+        self.database_name = database_name
+        self.statistics_fingerprint = statistics_fingerprint
+        self.hits = 0
+        self.misses = 0
+        self._pending_writes = 0
+        self._query_hashes = {}
+
+        # `check_same_thread` is disabled because costs might be requested from
+        # worker threads. All accesses are serialized by the CostEvaluation.
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        # WAL allows concurrent evaluation runs to share the same cache file
+        self._connection.execute("pragma journal_mode=wal")
+        self._connection.execute(
+            "create table if not exists costs ("
+            "database_name text, statistics text, query text, indexes text, "
+            "cost real, primary key (database_name, statistics, query, indexes))"
+        )
+        self._connection.commit()
+
+    def get(self, query, indexes):
+        result = self._connection.execute(
+            "select cost from costs where database_name = ? and statistics = ? "
+            "and query = ? and indexes = ?",
+            self._key(query, indexes),
+        ).fetchone()
+        if result is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return result[0]
+
+    def put(self, query, indexes, cost):
+        self._connection.execute(
+            "insert or replace into costs values (?, ?, ?, ?, ?)",
+            self._key(query, indexes) + (cost,),
+        )
+        self._pending_writes += 1
+        if self._pending_writes >= self.COMMIT_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        self._connection.commit()
+        self._pending_writes = 0
+
+    def close(self):
+        self.flush()
+        self._connection.close()
+        logging.debug(
+            f"Persistent cost cache closed: {self.hits} hits, {self.misses} misses"
+        )
+
+    def _key(self, query, indexes):
+        return (
+            self.database_name,
+            self.statistics_fingerprint,
+            self._query_hash(query),
+            self.index_signature(indexes),
+        )
+
+    def _query_hash(self, query):
+        if query not in self._query_hashes:
+            digest = hashlib.sha256(query.text.encode("utf-8")).hexdigest()
+            self._query_hashes[query] = digest
+        return self._query_hashes[query]
+
+    # The signature does not depend on the order of the indexes and, in contrast to
+    # Index.index_idx(), cannot be ambiguous for table or column names with underscores
+    @staticmethod
+    def index_signature(indexes):
+        return ";".join(
+            sorted(f"{index.table()}({index.joined_column_names()})" for index in indexes)
+        )
@@ -0,0 +1,88 @@
+import logging
+import random
+
+
+# Derives query costs for index configurations from previously requested plans.
+# For every plan, the relevant indexes of the request, the indexes used by the plan,
+# and the plan's cost are recorded.
+#
+# A cost is derived for the relevant indexes R of a query if there is a recorded plan
+# with the relevant indexes R_0, the used indexes U_0, and the cost c_0 such that
+# (1) U_0 is a subset of R and (2) every index in R but not in R_0 is dominated.
+# An index is dominated if the planner did not use it for another plan of the query
+# although all indexes that this plan used instead are part of R.
+#
+# If R is a subset of R_0, the derived cost is exact: the plan of R_0 is still
+# possible and there are fewer alternatives. For dominated indexes, the derivation is
+# a heuristic. Hence, derived costs can be verified by sampling, see
+# `verification_rate`.
+#
+# At most `max_plans` plans are recorded (unbounded if None). Later plans are not
+# recorded, i.e., fewer costs can be derived but the memory consumption is bounded.
+class PlanCostDerivation:
+    def __init__(self, verification_rate=0, max_plans=None):
+        logging.debug("Init plan-based cost derivation")
+        # Share of derived costs that are verified by requesting the actual cost
+        self.verification_rate = verification_rate
+        self.max_plans = max_plans
+        self.recorded_plans = 0
+        self.skipped_plans = 0
+        # Fixed seed for reproducible verification samples
+        self._random = random.Random(0)
+        self.derived_costs = 0
+        self.verified_costs = 0
+        self.mismatches = 0
+
+        # {query: {used_indexes: [(relevant_indexes, cost)]}}
+        self.plans = {}
+        # {query: {index: {used indexes of plans that did not use index}}}
+        self.rejected_indexes = {}
+
+    def record(self, query, relevant_indexes, used_indexes, cost):
+        if self.max_plans is not None and self.recorded_plans >= self.max_plans:
+            self.skipped_plans += 1
+            return
+        self.recorded_plans += 1
+
+        used_indexes = frozenset(used_indexes)
+        plans = self.plans.setdefault(query, {})
+        plans.setdefault(used_indexes, []).append((relevant_indexes, cost))
+
+        rejected_indexes = self.rejected_indexes.setdefault(query, {})
+        for index in relevant_indexes - used_indexes:
+            rejected_indexes.setdefault(index, set()).add(used_indexes)
+
+    # Returns None if no cost can be derived
+    def derive(self, query, relevant_indexes):
+        if query not in self.plans:
+            return None
+
+        rejected_indexes = self.rejected_indexes[query]
+        not_dominated = set()
+        for index in relevant_indexes:
+            if index not in rejected_indexes or not any(
+                used_indexes <= relevant_indexes
+                for used_indexes in rejected_indexes[index]
+            ):
+                not_dominated.add(index)
+
+        for used_indexes, plans in self.plans[query].items():
+            if not used_indexes <= relevant_indexes:
+                continue
+            for plan_relevant_indexes, cost in plans:
+                if not_dominated <= plan_relevant_indexes:
+                    self.derived_costs += 1
+                    return cost
+        return None
+
+    def should_verify(self):
+        return self._random.random() < self.verification_rate
+
+    def verify(self, query, relevant_indexes, derived_cost, actual_cost):
+        self.verified_costs += 1
+        if derived_cost != actual_cost:
+            self.mismatches += 1
+            logging.warning(
+                f"Derived cost {derived_cost} differs from actual cost {actual_cost} "
+                f"for {query} and {sorted(relevant_indexes)}"
+            )
@@ -17,7 +17,7 @@ def parse_file(file_name):
                 memory = float(row[13]) / 10**6
             algorithm_runtime = float(row[7])
             query_costs = []
-            for query_cost_str in row[16:-1]:
+            for query_cost_str in row[18:-1]:
                 query_cost = json.loads(query_cost_str)["Cost"]
                 query_costs.append(query_cost)
             indexes = parse_index_string_list(row[-1])
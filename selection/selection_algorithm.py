@@ -1,6 +1,10 @@
 import logging
 
+from selection.bounded_cost_cache import BoundedCostCache
 from selection.cost_evaluation import CostEvaluation
+from selection.index_size_estimation import AnalyticalIndexSizeEstimator
+from selection.lazy_greedy import LazyGreedySelection
+from selection.plan_cost_derivation import PlanCostDerivation
 
 # If not specified by the user, algorithms should use these default parameter values to
 # avoid diverging values for different algorithms.
@@ -12,7 +16,11 @@ DEFAULT_PARAMETER_VALUES = {
 
 
 class SelectionAlgorithm:
-    def __init__(self, database_connector, parameters, default_parameters=None):
+    # Algorithm objects that only assist another one, e.g., in worker processes, do
+    # not drop the indexes of the database (`drop_indexes`)
+    def __init__(
+        self, database_connector, parameters, default_parameters=None, drop_indexes=True
+    ):
         if default_parameters is None:
             default_parameters = {}
         logging.debug("Init selection algorithm")
@@ -24,11 +32,49 @@ class SelectionAlgorithm:
                 self.parameters[key] = value
 
         self.database_connector = database_connector
-        self.database_connector.drop_indexes()
+        if drop_indexes:
+            self.database_connector.drop_indexes()
         self.cost_evaluation = CostEvaluation(database_connector)
         if "cost_estimation" in self.parameters:
             estimation = self.parameters["cost_estimation"]
             self.cost_evaluation.cost_estimation = estimation
+        # See CostEvaluation for the available strategies
+        if "index_state_scheduling" in self.parameters:
+            scheduling = self.parameters["index_state_scheduling"]
+            assert scheduling in ["strict", "relevance", "hiding"]
+            self.cost_evaluation.index_state_scheduling = scheduling
+        # Costs can be derived from the indexes used by previously requested plans,
+        # optionally, a share of the derived costs is verified, see PlanCostDerivation.
+        # A bounded cost cache also bounds the number of recorded plans.
+        if self.parameters.get("plan_cost_derivation", False):
+            verification_rate = self.parameters.get("plan_cost_verification_rate", 0)
+            self.cost_evaluation.plan_cost_derivation = PlanCostDerivation(
+                verification_rate, self.parameters.get("cost_cache_max_entries")
+            )
+        # Limits the number of cached costs, see BoundedCostCache
+        if self.parameters.get("cost_cache_max_entries") is not None:
+            self.cost_evaluation.limit_cache(
+                self.parameters["cost_cache_max_entries"],
+                self.parameters.get("cost_cache_eviction_policy", "lru"),
+                self.parameters.get("cost_cache_spill_to_disk", False),
+            )
+        # What-if costs can be requested concurrently via multiple connections
+        if self.parameters.get("cost_estimation_workers", 1) > 1:
+            workers = self.parameters["cost_estimation_workers"]
+            asynchronous = self.parameters.get("asynchronous_cost_estimation", False)
+            self.cost_evaluation.use_connection_pool(workers, asynchronous)
+        # Candidates whose analytically estimated sizes exceed the budget are pruned
+        # before they are simulated, see _prune_candidates_by_budget()
+        self.budget_pruning = self.parameters.get("budget_pruning", False)
+        self.pruned_candidates = 0
+        self._index_size_estimator = None
+        # Greedy steps only re-evaluate the most promising candidates, see
+        # LazyGreedySelection. Used by AutoAdmin, Anytime, and Extend.
+        self.lazy_greedy = None
+        if self.parameters.get("lazy_greedy", False):
+            self.lazy_greedy = LazyGreedySelection(
+                self.parameters.get("lazy_greedy_verification", False)
+            )
 
     def calculate_best_indexes(self, workload):
         assert self.did_run is False, "Selection algorithm can only run once."
@@ -42,7 +88,44 @@ class SelectionAlgorithm:
     def _calculate_best_indexes(self, workload):
         raise NotImplementedError("_calculate_best_indexes(self, workload) missing")
 
+    # Returns the candidates whose estimated sizes do not exceed `budget` in the order
+    # of `candidates`. Candidates whose sizes cannot be estimated are kept.
+    def _prune_candidates_by_budget(self, candidates, budget):
+        if not self.budget_pruning:
+            return list(candidates)
+
+        candidates = list(candidates)
+        sizes = self._size_estimator().estimate_sizes(candidates)
+        within_budget = [
+            candidate
+            for candidate, size in zip(candidates, sizes)
+            if size is None or size <= budget
+        ]
+        self.pruned_candidates += len(candidates) - len(within_budget)
+        return within_budget
+
+    # The estimator of the IndexSizeOracle is reused if there is one
+    def _size_estimator(self):
+        if self._index_size_estimator is None:
+            oracle = self.cost_evaluation.index_size_oracle
+            if oracle is not None and oracle.estimator is not None:
+                self._index_size_estimator = oracle.estimator
+            else:
+                self._index_size_estimator = AnalyticalIndexSizeEstimator.from_database(
+                    self.database_connector
+                )
+        return self._index_size_estimator
+
     def _log_cache_hits(self):
+        if self.budget_pruning:
+            logging.debug(f"Pruned candidates:\t\t{self.pruned_candidates}")
+        if self.lazy_greedy is not None:
+            logging.debug(
+                f"Lazy greedy evaluations:\t{self.lazy_greedy.evaluations} "
+                f"in {self.lazy_greedy.steps} steps"
+            )
+            if self.lazy_greedy.verify:
+                logging.debug(f"Lazy greedy divergences:\t{self.lazy_greedy.divergences}")
         hits = self.cost_evaluation.cache_hits
         requests = self.cost_evaluation.cost_requests
         logging.debug(f"Total cost cache hits:\t{hits}")
@@ -51,6 +134,32 @@ class SelectionAlgorithm:
             return
         ratio = round(hits * 100 / requests, 2)
         logging.debug(f"Cost cache hit ratio:\t{ratio}%")
+        if self.cost_evaluation.shared_cache is not None:
+            shared_hits = self.cost_evaluation.shared_cache_hits
+            shared_misses = self.cost_evaluation.shared_cache_misses
+            logging.debug(f"Shared cache hits:\t\t{shared_hits}")
+            logging.debug(f"Shared cache misses:\t\t{shared_misses}")
+        if self.cost_evaluation.plan_cost_derivation is not None:
+            derivation = self.cost_evaluation.plan_cost_derivation
+            logging.debug(f"Derived costs:\t\t{derivation.derived_costs}")
+            logging.debug(
+                f"Verified derived costs:\t{derivation.verified_costs} "
+                f"({derivation.mismatches} mismatches)"
+            )
+            logging.debug(f"Skipped plans:\t\t{derivation.skipped_plans}")
+        if isinstance(self.cost_evaluation.cache, BoundedCostCache):
+            cache = self.cost_evaluation.cache
+            logging.debug(f"Cost cache evictions:\t{cache.evictions}")
+            logging.debug(f"Spilled cost hits:\t\t{cache.spill_hits}")
+        if self.cost_evaluation.persistent_cache is not None:
+            persistent_hits = self.cost_evaluation.persistent_cache_hits
+            logging.debug(f"Persistent cache hits:\t\t{persistent_hits}")
+        if self.cost_evaluation.index_size_oracle is not None:
+            oracle = self.cost_evaluation.index_size_oracle
+            logging.debug(
+                f"Index sizes:\t\t\t{oracle.learned_sizes} learned, "
+                f"{oracle.stored_size_hits} stored, {oracle.estimated_sizes} estimated"
+            )
 
 
 class NoIndexAlgorithm(SelectionAlgorithm):
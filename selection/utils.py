@@ -1,6 +1,3 @@
-from selection.workload import Workload
-
-
 # --- Unit conversions ---
 # Storage
 def b_to_mb(b):
@@ -36,17 +33,22 @@ def get_utilized_indexes(
 ):
     utilized_indexes_workload = set()
     query_details = {}
-    for query, indexes in zip(workload.queries, indexes_per_query):
-        (
-            utilized_indexes_query,
-            cost_with_indexes,
-        ) = cost_evaluation.which_indexes_utilized_and_cost(query, indexes)
+    queries = workload.queries
+    # The candidates of every query are independent of other queries. Hence, all
+    # queries can be planned at once, e.g., concurrently by a connection pool.
+    utilized_indexes_and_costs = cost_evaluation.which_indexes_utilized_and_cost_batch(
+        queries, indexes_per_query
+    )
+    if detailed_query_information:
+        costs_without_indexes = cost_evaluation.costs_without_indexes(queries)
+
+    for position, (query, (utilized_indexes_query, cost_with_indexes)) in enumerate(
+        zip(queries, utilized_indexes_and_costs)
+    ):
         utilized_indexes_workload |= utilized_indexes_query
 
         if detailed_query_information:
-            cost_without_indexes = cost_evaluation.calculate_cost(
-                Workload([query]), indexes=[]
-            )
+            cost_without_indexes = costs_without_indexes[position]
 
             query_details[query] = {
                 "cost_without_indexes": cost_without_indexes,
@@ -0,0 +1,95 @@
+import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Costs (query, index configuration) requests concurrently over a pool of database
+# connections. Hypothetical indexes only exist in the session that created them.
+# Hence, every connection mirrors the index configuration of the request it is
+# currently serving. Results are returned in the order of the requests.
+#
+# Threads suffice because the workers spend nearly all of their time waiting for the
+# database system; psycopg2 releases the GIL during these waits.
+class WhatIfConnectionPool:
+    def __init__(self, connector_class, database_name, number_of_connections):
+        logging.debug(f"Init WhatIfConnectionPool with {number_of_connections} workers")
+        self._workers = [
+            _WhatIfWorker(connector_class(database_name))
+            for _ in range(number_of_connections)
+        ]
+        self._idle_workers = queue.Queue()
+        for worker in self._workers:
+            self._idle_workers.put(worker)
+        self._executor = ThreadPoolExecutor(max_workers=number_of_connections)
+
+    def get_costs(self, requests):
+        return self._serve(requests, _WhatIfWorker.get_cost)
+
+    # Like get_costs() but returns the indexes of every request's configuration that
+    # are used by the query's plan and the plan's cost
+    def get_utilized_indexes(self, requests):
+        return self._serve(requests, _WhatIfWorker.get_utilized_indexes)
+
+    def _serve(self, requests, worker_method):
+        def serve(query, indexes):
+            worker = self._idle_workers.get()
+            try:
+                return worker_method(worker, query, indexes)
+            finally:
+                self._idle_workers.put(worker)
+
+        futures = [
+            self._executor.submit(serve, query, indexes) for query, indexes in requests
+        ]
+        return [future.result() for future in futures]
+
+    # The statistics of the pool's connections are added to `db_connector` such that
+    # the reported numbers include the costing done by the pool.
+    def close(self, db_connector=None):
+        self._executor.shutdown(wait=True)
+        for worker in self._workers:
+            connector = worker.db_connector
+            if db_connector is not None:
+                db_connector.simulated_indexes += connector.simulated_indexes
+                db_connector.cost_estimations += connector.cost_estimations
+                db_connector.cost_estimation_duration += (
+                    connector.cost_estimation_duration
+                )
+                db_connector.index_simulation_duration += (
+                    connector.index_simulation_duration
+                )
+            connector.close()
+        self._workers = []
+
+
+class _WhatIfWorker:
+    def __init__(self, db_connector):
+        self.db_connector = db_connector
+        # The hypopg oids are stored here and not in the index objects because the
+        # same index object might be simulated by multiple connections.
+        # {index: hypopg_oid}
+        self.simulated_indexes = {}
+        # {index: hypopg_name}, the names differ between connections
+        self.hypopg_names = {}
+
+    def get_cost(self, query, indexes):
+        self._prepare_indexes(set(indexes))
+        return self.db_connector.get_cost(query)
+
+    def get_utilized_indexes(self, query, indexes):
+        self._prepare_indexes(set(indexes))
+        plan = self.db_connector.get_plan(query)
+        plan_str = str(plan)
+        utilized_indexes = {
+            index for index in indexes if self.hypopg_names[index] in plan_str
+        }
+        return utilized_indexes, plan["Total Cost"]
+
+    def _prepare_indexes(self, indexes):
+        for index in set(self.simulated_indexes) - indexes:
+            self.db_connector.drop_simulated_index(self.simulated_indexes.pop(index))
+            del self.hypopg_names[index]
+        for index in indexes - set(self.simulated_indexes):
+            result = self.db_connector.simulate_index(index)
+            self.simulated_indexes[index] = result[0]
+            self.hypopg_names[index] = result[1]
@@ -23,11 +23,38 @@ class WhatIfIndexCreation:
         if store_size:
             potential_index.estimated_size = self.estimate_index_size(index_oid)
 
+    # Simulates all `indexes` with a single request if the database system supports
+    # it, see DatabaseConnector.simulate_indexes(). With `store_size`, only indexes
+    # without an estimated size are assigned the requested sizes.
+    def simulate_indexes(self, indexes, store_size=False):
+        results = self.db_connector.simulate_indexes(indexes, store_size=store_size)
+        for potential_index, result in zip(indexes, results):
+            index_oid = result[0]
+            index_name = result[1]
+            self.simulated_indexes[index_oid] = index_name
+            potential_index.hypopg_name = index_name
+            potential_index.hypopg_oid = index_oid
+
+            if store_size and potential_index.estimated_size is None:
+                assert result[2] > 0, "Hypothetical index does not exist."
+                potential_index.estimated_size = result[2]
+
+    # Connectors that do not implement simulate_indexes() simulate indexes one by one
+    def supports_bulk_simulation(self):
+        return self.db_connector.supports_bulk_index_simulation()
+
     def drop_simulated_index(self, index):
         oid = index.hypopg_oid
         self.db_connector.drop_simulated_index(oid)
         del self.simulated_indexes[oid]
 
+    # Hidden indexes are not considered by the planner but keep their hypopg_oid
+    def hide_simulated_index(self, index):
+        self.db_connector.hide_simulated_index(index.hypopg_oid)
+
+    def unhide_simulated_index(self, index):
+        self.db_connector.unhide_simulated_index(index.hypopg_oid)
+
     def all_simulated_indexes(self):
         statement = "select * from hypopg_list_indexes()"
         indexes = self.db_connector.exec_fetch(statement, one=False)
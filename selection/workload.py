@@ -1,6 +1,10 @@
+import weakref
 from typing import List
 
-from selection.index import Index
+from selection.index import Index, interned_id
+
+# Equal columns share the same interned id: {(table name, column name): InternedId}
+_COLUMN_IDS = weakref.WeakValueDictionary()
 
 
 class Query:
@@ -35,9 +39,13 @@ class Workload:
 
 
 class Column:
+    __slots__ = ("name", "table", "_id")
+
     def __init__(self, name):
         self.name = name.lower()
         self.table = None
+        # Assigned lazily once the column belongs to a table, see _column_id()
+        self._id = None
 
     def __lt__(self, other):
         return self.name < other.name
@@ -51,24 +59,42 @@ class Column:
         if not isinstance(other, Column):
             return False
 
-        assert (
-            self.table is not None and other.table is not None
-        ), "Table objects should not be None for Column.__eq__()"
-
-        return self.table.name == other.table.name and self.name == other.name
+        return self._column_id() == other._column_id()
 
     def __hash__(self):
-        return hash((self.name, self.table.name))
+        return self._column_id()
+
+    def _column_id(self):
+        if self._id is None:
+            assert (
+                self.table is not None
+            ), "Table objects should not be None for Column.__eq__()"
+            key = (self.table.name, self.name)
+            self._id = interned_id(_COLUMN_IDS, key)
+        return self._id.value
+
+    # Interned ids are only valid within a process and are, thus, not pickled
+    def __getstate__(self):
+        return (self.name, self.table)
+
+    def __setstate__(self, state):
+        self.name, self.table = state
+        self._id = None
 
 
 class Table:
+    __slots__ = ("name", "columns", "_hash")
+
     def __init__(self, name):
         self.name = name.lower()
         self.columns = []
+        self._hash = None
 
     def add_column(self, column):
         column.table = self
+        column._id = None
         self.columns.append(column)
+        self._hash = None
 
     def add_columns(self, columns):
         for column in columns:
@@ -78,10 +104,21 @@ class Table:
         return self.name
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, Table):
             return False
 
-        return self.name == other.name and tuple(self.columns) == tuple(other.columns)
+        return self.name == other.name and self.columns == other.columns
 
     def __hash__(self):
-        return hash((self.name, tuple(self.columns)))
+        if self._hash is None:
+            self._hash = hash((self.name, tuple(self.columns)))
+        return self._hash
+
+    def __getstate__(self):
+        return (self.name, self.columns)
+
+    def __setstate__(self, state):
+        self.name, self.columns = state
+        self._hash = None
@@ -19,6 +19,20 @@ query_1 = Query(
 
 mock_cache = {}
 
+
+# Names of the hypothetical indexes ({hypopg_oid: index}) that the plan of `query`
+# uses: the ones on the query's first column if the query's number is even and the
+# ones on its second column otherwise. Used by the mocked connections of the
+# connection pool tests.
+def mock_plan_index_names(query, hypothetical_indexes):
+    column = query.columns[query.nr % 2]
+    return [
+        f"<{oid}>btree"
+        for oid, index in hypothetical_indexes.items()
+        if index.columns[0] == column
+    ]
+
+
 table_A_potential_indexes = []
 # Calculate potential indexes for TableA
 for number_of_columns in range(1, len(table_A.columns) + 1):
@@ -111,6 +125,9 @@ class MockConnector:
     def simulate_index(self, potential_index):
         pass
 
+    def supports_bulk_index_simulation(self):
+        return False
+
 
 class MockCostEvaluation:
     def __init__(self):
@@ -0,0 +1,261 @@
+import math
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from selection.algorithms import anytime_algorithm
+from selection.algorithms.anytime_algorithm import AnytimeAlgorithm
+from selection.index import Index
+from selection.workload import Column, Query, Table, Workload
+from tests.mock_connector import (
+    MockConnector,
+    column_A_0,
+    column_A_1,
+    column_A_2,
+    query_0,
+)
+from tests.test_cost_evaluation_process_pool import SimulatingConnector
+
+
+class TestAnytimeAlgorithm(unittest.TestCase):
+    def setUp(self):
+        self.connector = MockConnector()
+        self.indexes = [
+            Index([column]) for column in [column_A_0, column_A_1, column_A_2]
+        ]
+        for index in self.indexes:
+            index.estimated_size = 1
+        self.evaluated_configurations = []
+
+    def _algorithm(self, parameters):
+        algorithm = AnytimeAlgorithm(self.connector, parameters)
+
+        # Every index lowers the cost by its position + 1
+        def simulate_and_evaluate_cost(workload, configuration):
+            return 100 - sum(self.indexes.index(index) + 1 for index in configuration)
+
+        def simulate_and_evaluate_cost_batch(workload, configurations):
+            self.evaluated_configurations.append(configurations)
+            return [
+                simulate_and_evaluate_cost(workload, configuration)
+                for configuration in configurations
+            ]
+
+        algorithm._simulate_and_evaluate_cost = simulate_and_evaluate_cost
+        algorithm._simulate_and_evaluate_cost_batch = simulate_and_evaluate_cost_batch
+        return algorithm
+
+    def test_enumerate_greedy(self):
+        algorithm = self._algorithm({})
+        indexes, cost = algorithm.enumerate_greedy(
+            Workload([query_0]), set(), 100, set(self.indexes), float("inf")
+        )
+        self.assertEqual(indexes, set(self.indexes))
+        self.assertEqual(cost, 94)
+        # Without a deadline, the candidates of a step are costed in one batch
+        self.assertEqual(
+            [len(configurations) for configurations in self.evaluated_configurations],
+            [3, 2, 1],
+        )
+
+    def test_enumerate_greedy_deadline_default_interval(self):
+        algorithm = self._algorithm({"cost_estimation_workers": 1})
+        indexes, cost = algorithm.enumerate_greedy(
+            Workload([query_0]), set(), 100, set(self.indexes), float("inf"), deadline=0
+        )
+        # By default, up to 32 candidates are costed before the deadline is checked
+        self.assertEqual(len(self.evaluated_configurations), 1)
+        self.assertEqual(len(self.evaluated_configurations[0]), 3)
+        self.assertEqual(indexes, {self.indexes[2]})
+        self.assertEqual(cost, 97)
+
+    def test_enumerate_greedy_deadline(self):
+        algorithm = self._algorithm({"deadline_check_interval": 2})
+        candidates = sorted(self.indexes)
+        indexes, cost = algorithm.enumerate_greedy(
+            Workload([query_0]), set(), 100, set(candidates), float("inf"), deadline=0
+        )
+        # The enumeration stops after the first chunk of candidates but keeps the best
+        # index of the chunk
+        self.assertEqual(len(self.evaluated_configurations), 1)
+        self.assertEqual(len(self.evaluated_configurations[0]), 2)
+        self.assertEqual(len(indexes), 1)
+        self.assertLess(cost, 100)
+
+    def test_enumerate_greedy_min_cost_improvement(self):
+        algorithm = self._algorithm({"min_cost_improvement": 1.02})
+        indexes, cost = algorithm.enumerate_greedy(
+            Workload([query_0]), set(), 100, set(self.indexes), float("inf")
+        )
+        # Adding the third index improves the cost by less than 2 %
+        self.assertEqual(indexes, set(self.indexes[1:]))
+        self.assertEqual(cost, 95)
+
+    def test_seed_abortion(self):
+        algorithm = self._algorithm({"seed_abortion": True})
+        algorithm.incumbent.value = 96
+        indexes, cost, aborted = algorithm._explore_seed(
+            Workload([query_0]), set(), set(self.indexes), time.time() + 60
+        )
+        # After the first step (benefit 3), two steps can lower the cost to 91 at most
+        self.assertFalse(aborted)
+        self.assertEqual(cost, 94)
+        self.assertEqual(algorithm.incumbent.value, 94)
+
+        algorithm.incumbent.value = 90
+        indexes, cost, aborted = algorithm._explore_seed(
+            Workload([query_0]), set(), set(self.indexes), time.time() + 60
+        )
+        self.assertTrue(aborted)
+        self.assertEqual(indexes, {self.indexes[2]})
+        self.assertEqual(algorithm.incumbent.value, 90)
+
+    def _simulated_seeds(self):
+        table = Table("TableA")
+        columns = [Column("Col0"), Column("Col1"), Column("Col2")]
+        table.add_columns(columns)
+        workload = Workload(
+            [
+                Query(0, "SELECT * FROM TableA WHERE Col0 = 4", columns[:2]),
+                Query(1, "SELECT * FROM TableA WHERE Col1 = 3", columns[1:]),
+            ]
+        )
+        candidates = {
+            Index(columns[:1]),
+            Index(columns[1:2]),
+            Index(columns[2:]),
+            Index(columns[:2]),
+        }
+        for candidate in candidates:
+            candidate.estimated_size = 100 * len(candidate.columns)
+        seeds = [{candidate} for candidate in sorted(candidates)] + [set()]
+        return workload, candidates, seeds
+
+    def test_seed_lower_bounds(self):
+        workload, candidates, seeds = self._simulated_seeds()
+        algorithm = AnytimeAlgorithm(SimulatingConnector("test_db"), {})
+        algorithm.disk_constraint = 250
+
+        lower_bounds = algorithm._seed_lower_bounds(
+            workload, seeds, candidates, time.time() + 60
+        )
+        expected_lower_bounds = {
+            # Next to the two-column seed, no other index fits
+            ("col0", "col1"): 6.7 + 20.2,
+            # Every single-column index fits next to single-column seeds
+            ("col0",): 6.7 + 16.8,
+            ("col1",): 6.7 + 16.8,
+            ("col2",): 6.7 + 16.8,
+            # Every index fits next to the empty seed
+            (): 3.3 + 16.8,
+        }
+        for seed, lower_bound in zip(seeds, lower_bounds):
+            columns = tuple(column.name for index in seed for column in index.columns)
+            self.assertAlmostEqual(lower_bound, expected_lower_bounds[columns])
+
+        # Every seed's enumeration ends with a cost of at least its lower bound
+        results = algorithm._explore_seeds(workload, seeds, candidates, time.time() + 60)
+        for (_, cost, _), lower_bound in zip(results, lower_bounds):
+            self.assertGreaterEqual(cost, lower_bound)
+
+    def test_seed_lower_bounds_deadline(self):
+        workload, candidates, seeds = self._simulated_seeds()
+        connector = SimulatingConnector("test_db")
+        algorithm = AnytimeAlgorithm(connector, {"deadline_check_interval": 2})
+        algorithm.disk_constraint = 250
+
+        chunked_lower_bounds = algorithm._seed_lower_bounds(
+            workload, seeds, candidates, time.time() + 60
+        )
+        algorithm.deadline_check_interval = None
+        self.assertEqual(
+            chunked_lower_bounds,
+            algorithm._seed_lower_bounds(workload, seeds, candidates, time.time() + 60),
+        )
+
+        # No bounds are requested after the deadline
+        cost_estimations = connector.cost_estimations
+        algorithm.cost_evaluation.cache.clear()
+        self.assertEqual(
+            algorithm._seed_lower_bounds(workload, seeds, candidates, time.time() - 1),
+            [None] * len(seeds),
+        )
+        self.assertEqual(connector.cost_estimations, cost_estimations)
+
+    def test_seed_pruning(self):
+        algorithm = self._algorithm({"seed_pruning": True})
+        algorithm.incumbent.value = 90
+        self.assertIsNone(
+            algorithm._explore_seed(
+                Workload([query_0]), set(), set(self.indexes), time.time() + 60, 90.01
+            )
+        )
+        self.assertEqual(algorithm.pruned_seeds, 1)
+
+        # Seeds whose lower bounds equal the incumbent are explored
+        _, cost, _ = algorithm._explore_seed(
+            Workload([query_0]), set(), set(self.indexes), time.time() + 60, 90
+        )
+        self.assertEqual(cost, 94)
+        self.assertEqual(algorithm.pruned_seeds, 1)
+
+    def test_parallel_seeds(self):
+        workload, candidates, seeds = self._simulated_seeds()
+        deadline = time.time() + 600
+
+        algorithm = AnytimeAlgorithm(SimulatingConnector("test_db"), {})
+        results = algorithm._explore_seeds(workload, seeds, candidates, deadline)
+
+        parallel_algorithm = AnytimeAlgorithm(
+            SimulatingConnector("test_db"), {"parallel_seeds": 2}
+        )
+        parallel_results = parallel_algorithm._explore_seeds_in_parallel(
+            workload, seeds, candidates, deadline
+        )
+        self.assertEqual(parallel_results, results)
+        self.assertEqual(parallel_algorithm.incumbent.value, algorithm.incumbent.value)
+        self.assertEqual(
+            parallel_algorithm.cost_evaluation.cost_requests,
+            algorithm.cost_evaluation.cost_requests,
+        )
+
+    def test_parallel_seeds_require_whatif(self):
+        with self.assertRaises(AssertionError):
+            AnytimeAlgorithm(
+                SimulatingConnector("test_db"),
+                {"parallel_seeds": 2, "cost_estimation": "actual_runtimes"},
+            )
+
+    def test_seed_worker(self):
+        workload, candidates, seeds = self._simulated_seeds()
+        deadline = time.time() + 600
+        algorithm = AnytimeAlgorithm(SimulatingConnector("test_db"), {})
+        results = algorithm._explore_seeds(workload, seeds, candidates, deadline)
+        # Serial runs do not create a multiprocessing.Value
+        self.assertNotIn("get_lock", dir(algorithm.incumbent))
+
+        connector = SimulatingConnector("test_db")
+        connector.drop_indexes = MagicMock()
+        incumbent = MagicMock(value=math.inf)
+        anytime_algorithm._init_seed_worker(
+            MagicMock(return_value=connector),
+            "test_db",
+            dict(algorithm.parameters),
+            workload,
+            candidates,
+            deadline,
+            incumbent,
+            *algorithm._worker_caches(workload),
+        )
+        connector.drop_indexes.assert_not_called()
+        self.assertEqual(anytime_algorithm._algorithm.incumbent, incumbent)
+
+        # The worker reuses the costs of the main process
+        result, _, _ = anytime_algorithm._explore_seed(seeds[0], None)
+        self.assertEqual(result, results[0])
+        self.assertEqual(connector.cost_estimations, 0)
+        self.assertEqual(incumbent.value, algorithm.incumbent.value)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import asyncio
+import unittest
+
+from selection.async_what_if_connection_pool import AsyncWhatIfConnectionPool
+from selection.index import Index
+from selection.workload import Column, Query, Table
+from tests.mock_connector import mock_plan_index_names
+
+
+class MockAsyncConnection:
+    instances = []
+
+    def __init__(self, db_name):
+        self.db_name = db_name
+        self.simulated_indexes = 0
+        self.cost_estimations = 0
+        self.cost_estimation_duration = 1
+        self.index_simulation_duration = 1
+        self.connected = False
+        self.closed = False
+        self.busy = False
+        self.oid = 0
+        # {hypopg_oid: index}
+        self.hypothetical_indexes = {}
+        MockAsyncConnection.instances.append(self)
+
+    async def connect(self):
+        self.connected = True
+
+    async def simulate_index(self, index):
+        self.simulated_indexes += 1
+        self.oid += 1
+        self.hypothetical_indexes[self.oid] = index
+        return [self.oid, f"<{self.oid}>btree"]
+
+    async def drop_simulated_index(self, oid):
+        del self.hypothetical_indexes[oid]
+
+    # The cost depends on the number of hypothetical indexes of the session to verify
+    # that every connection mirrors the requested configuration
+    async def get_cost(self, query):
+        # A connection must never serve multiple requests at the same time
+        assert not self.busy
+        self.busy = True
+        number_of_indexes = len(self.hypothetical_indexes)
+        # Other requests are pipelined while this one waits
+        await asyncio.sleep(0)
+        self.cost_estimations += 1
+        self.busy = False
+        return query.nr * 100 + number_of_indexes
+
+    async def get_plan(self, query):
+        index_names = mock_plan_index_names(query, self.hypothetical_indexes)
+        return {"Total Cost": await self.get_cost(query), "Index Names": index_names}
+
+    def close(self):
+        self.closed = True
+
+
+class MockConnector:
+    def __init__(self):
+        self.simulated_indexes = 0
+        self.cost_estimations = 0
+        self.cost_estimation_duration = 0
+        self.index_simulation_duration = 0
+
+    def supports_bulk_index_simulation(self):
+        return False
+
+
+class TestAsyncWhatIfConnectionPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.columns = [Column("Col0"), Column("Col1")]
+        cls.table = Table("TableA")
+        cls.table.add_columns(cls.columns)
+
+        cls.queries = [Query(i, f"SELECT {i}", cls.columns) for i in range(20)]
+        cls.index_0 = Index([cls.columns[0]])
+        cls.index_1 = Index([cls.columns[1]])
+
+    def setUp(self):
+        MockAsyncConnection.instances = []
+
+    def test_get_costs(self):
+        pool = AsyncWhatIfConnectionPool(MockAsyncConnection, "test_db", 4)
+        self.assertEqual(len(MockAsyncConnection.instances), 4)
+        self.assertTrue(all(c.connected for c in MockAsyncConnection.instances))
+
+        configurations = [set(), {self.index_0}, {self.index_0, self.index_1}]
+        requests = []
+        for i, query in enumerate(self.queries):
+            requests.append((query, configurations[i % len(configurations)]))
+
+        costs = pool.get_costs(requests)
+        expected_costs = [query.nr * 100 + len(indexes) for query, indexes in requests]
+        self.assertEqual(costs, expected_costs)
+        # Requests are distributed across the connections
+        self.assertTrue(
+            all(c.cost_estimations > 0 for c in MockAsyncConnection.instances)
+        )
+
+        main_connector = MockConnector()
+        pool.close(main_connector)
+        self.assertEqual(main_connector.cost_estimations, len(self.queries))
+        self.assertEqual(main_connector.cost_estimation_duration, 4)
+        self.assertTrue(all(c.closed for c in MockAsyncConnection.instances))
+
+    def test_get_utilized_indexes(self):
+        pool = AsyncWhatIfConnectionPool(MockAsyncConnection, "test_db", 4)
+        indexes = {self.index_0, self.index_1}
+        requests = [(query, indexes) for query in self.queries]
+
+        results = pool.get_utilized_indexes(requests)
+        expected_results = [
+            ({self.index_0} if query.nr % 2 == 0 else {self.index_1}, query.nr * 100 + 2)
+            for query in self.queries
+        ]
+        self.assertEqual(results, expected_results)
+        pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
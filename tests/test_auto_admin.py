@@ -47,6 +47,25 @@ class TestAutoAdminAlgorithm(unittest.TestCase):
         index_selection = algorithm.calculate_best_indexes(Workload([query_0, query_1]))
         self.assertEqual(set(index_selection), set([Index([column_A_0, column_A_1])]))
 
+    def test_enumerate_greedy_min_cost_improvement(self):
+        algorithm = AutoAdminAlgorithm(
+            database_connector=self.connector,
+            parameters={"max_indexes": 3, "min_cost_improvement": 1.1},
+        )
+        index_0 = Index([column_A_0])
+        index_1 = Index([column_A_1])
+        # index_0 improves the cost by 20 %, adding index_1 afterward only by 5 %
+        algorithm._simulate_and_evaluate_cost_batch = lambda workload, configurations: [
+            100 - 20 * (index_0 in configuration) - 4 * (index_1 in configuration)
+            for configuration in configurations
+        ]
+
+        indexes, cost = algorithm.enumerate_greedy(
+            Workload([query_0]), set(), 100, {index_0, index_1}, 3
+        )
+        self.assertEqual(indexes, {index_0})
+        self.assertEqual(cost, 80)
+
 
 if __name__ == "__main__":
     unittest.main()
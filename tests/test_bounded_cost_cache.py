@@ -0,0 +1,68 @@
+import unittest
+
+from selection.bounded_cost_cache import BoundedCostCache
+from selection.index import Index
+from selection.workload import Column, Query, Table
+
+
+class TestBoundedCostCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.columns = [Column("Col0"), Column("Col1")]
+        cls.table = Table("TableA")
+        cls.table.add_columns(cls.columns)
+
+        cls.query_0 = Query(0, "SELECT * FROM TableA WHERE Col0 = 4", [cls.columns[0]])
+        cls.query_1 = Query(1, "SELECT * FROM TableA WHERE Col1 = 2", [cls.columns[1]])
+        cls.index_0 = Index([cls.columns[0]])
+
+    def test_lru_eviction(self):
+        cache = BoundedCostCache(2)
+        cache[(self.query_0, frozenset())] = 10
+        cache[(self.query_0, frozenset([self.index_0]))] = 5
+        # Accessing the first entry makes the second one the least recently used
+        self.assertEqual(cache[(self.query_0, frozenset())], 10)
+        cache[(self.query_1, frozenset())] = 7
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        self.assertIn((self.query_0, frozenset()), cache)
+        self.assertNotIn((self.query_0, frozenset([self.index_0])), cache)
+        self.assertIsNone(cache.get((self.query_0, frozenset([self.index_0]))))
+        with self.assertRaises(KeyError):
+            cache[(self.query_0, frozenset([self.index_0]))]
+
+    def test_recompute_cost_eviction(self):
+        cache = BoundedCostCache(2, eviction_policy="recompute_cost")
+        cache.record_recompute_time(self.query_0, 2.0)
+        cache.record_recompute_time(self.query_1, 0.1)
+        cache[(self.query_0, frozenset())] = 10
+        cache[(self.query_1, frozenset())] = 7
+        cache[(self.query_0, frozenset([self.index_0]))] = 5
+
+        # query_1 is cheaper to recompute although its entry is more recent
+        self.assertNotIn((self.query_1, frozenset()), cache)
+        self.assertIn((self.query_0, frozenset()), cache)
+
+    def test_spill_to_disk(self):
+        cache = BoundedCostCache(1, spill_to_disk=True)
+        cache[(self.query_0, frozenset())] = 10
+        cache[(self.query_1, frozenset())] = 7
+        self.assertEqual(len(cache), 1)
+
+        # The evicted cost is restored from disk
+        self.assertEqual(cache[(self.query_0, frozenset())], 10)
+        self.assertEqual(cache.spill_hits, 1)
+        self.assertEqual(cache[(self.query_1, frozenset())], 7)
+        self.assertEqual(cache.spill_hits, 2)
+        cache.close()
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(AssertionError):
+            BoundedCostCache(0)
+        with self.assertRaises(AssertionError):
+            BoundedCostCache(10, eviction_policy="fifo")
+
+
+if __name__ == "__main__":
+    unittest.main()
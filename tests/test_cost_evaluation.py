@@ -1,9 +1,12 @@
 import unittest
 from unittest.mock import MagicMock
 
+from selection.bounded_cost_cache import BoundedCostCache
 from selection.candidate_generation import syntactically_relevant_indexes
 from selection.cost_evaluation import CostEvaluation
 from selection.index import Index
+from selection.index_size_oracle import IndexSizeOracle
+from selection.plan_cost_derivation import PlanCostDerivation
 from selection.workload import Column, Query, Table, Workload
 
 
@@ -11,11 +14,17 @@ class MockConnector:
     def __init__(self):
         pass
 
+    def supports_bulk_index_simulation(self):
+        return False
+
 
 class MockWhatIf:
     def __init__(self):
         pass
 
+    def supports_bulk_simulation(self):
+        return False
+
 
 class TestCostEvaluation(unittest.TestCase):
     @classmethod
@@ -166,6 +175,289 @@ class TestCostEvaluation(unittest.TestCase):
         self.assertEqual(self.connector.get_cost.call_count, 1)
         self.connector.simulate_index.assert_called_with(index_1)
 
+    def test_persistent_cache_hit(self):
+        persistent_cache = MagicMock()
+        persistent_cache.get = MagicMock(side_effect=[None, 5])
+        self.cost_evaluation.persistent_cache = persistent_cache
+
+        workload = Workload([self.queries[0]])
+        index_0 = Index([self.columns[0]])
+
+        # Not persisted yet: The cost is requested and persisted afterwards
+        self.assertEqual(self.cost_evaluation.calculate_cost(workload, set()), 3)
+        self.assertEqual(self.connector.get_cost.call_count, 1)
+        persistent_cache.put.assert_called_once_with(self.queries[0], frozenset(), 3)
+
+        # Persisted: The database system is not asked
+        self.assertEqual(self.cost_evaluation.calculate_cost(workload, {index_0}), 5)
+        self.assertEqual(self.connector.get_cost.call_count, 1)
+        self.assertEqual(self.cost_evaluation.cache_hits, 1)
+        self.assertEqual(self.cost_evaluation.persistent_cache_hits, 1)
+
+        # Actual runtimes are never persisted
+        self.cost_evaluation.cost_estimation = "actual_runtimes"
+        self.assertFalse(self.cost_evaluation._uses_persistent_cache())
+
+    def test_shared_caches(self):
+        shared_cache = {}
+        shared_index_size_cache = {}
+        self.cost_evaluation.use_shared_caches(shared_cache, shared_index_size_cache)
+        self.cost_evaluation.what_if.estimate_index_size = MagicMock(return_value=7)
+
+        workload = Workload([self.queries[0]])
+        index_0 = Index([self.columns[0]])
+        self.cost_evaluation.calculate_cost(workload, {index_0}, store_size=True)
+        self.assertEqual(self.connector.get_cost.call_count, 1)
+        self.assertEqual(self.cost_evaluation.shared_cache_misses, 1)
+        self.assertEqual(shared_index_size_cache, {index_0: 7})
+
+        # A second CostEvaluation, e.g., for the next run of a parameter sweep
+        cost_evaluation = CostEvaluation(self.connector)
+        cost_evaluation.use_shared_caches(shared_cache, shared_index_size_cache)
+        cost_evaluation.what_if.estimate_index_size = MagicMock()
+
+        index_0_copy = Index([self.columns[0]])
+        cost_evaluation.calculate_cost(workload, {index_0_copy}, store_size=True)
+        self.assertEqual(self.connector.get_cost.call_count, 1)
+        self.assertEqual(cost_evaluation.cache_hits, 1)
+        self.assertEqual(cost_evaluation.shared_cache_hits, 1)
+        self.assertEqual(cost_evaluation.shared_cache_misses, 0)
+        self.assertEqual(index_0_copy.estimated_size, 7)
+        cost_evaluation.what_if.estimate_index_size.assert_not_called()
+
+    def test_costs_without_indexes(self):
+        no_index_costs = {}
+        self.cost_evaluation.no_index_costs = no_index_costs
+        costs = self.cost_evaluation.costs_without_indexes(self.queries[:2])
+        self.assertEqual(costs, [3, 3])
+        self.assertEqual(no_index_costs, {self.queries[0]: 3, self.queries[1]: 3})
+
+        # A second CostEvaluation, e.g., for the next algorithm of a run
+        cost_evaluation = CostEvaluation(self.connector)
+        cost_evaluation.no_index_costs = no_index_costs
+        costs = cost_evaluation.costs_without_indexes(self.queries)
+        self.assertEqual(costs, [3, 3, 3])
+        self.assertEqual(self.connector.get_cost.call_count, 3)
+        self.assertEqual(cost_evaluation.cost_requests, 3)
+        self.assertEqual(cost_evaluation.cache_hits, 2)
+
+    def test_index_configuration_cache_key(self):
+        index_0 = Index([self.columns[0]])
+        index_1 = Index([self.columns[1]])
+        workload = Workload([self.queries[0]])
+
+        configuration = self.cost_evaluation.index_configuration([index_0, index_1])
+        self.cost_evaluation.calculate_cost(workload, configuration)
+        self.assertEqual(self.connector.get_cost.call_count, 1)
+        # Only the relevant index is part of the cache key
+        relevant_indexes = self.cost_evaluation.index_configuration([index_0])
+        self.assertIn((self.queries[0], relevant_indexes), self.cost_evaluation.cache)
+
+        self.assertIn((self.queries[0], frozenset([index_0])), self.cost_evaluation.cache)
+
+        # Costs cached for frozensets are found for configurations and vice versa
+        self.connector.drop_simulated_index = MagicMock()
+        self.cost_evaluation.calculate_cost(workload, set([index_0]))
+        self.assertEqual(self.connector.get_cost.call_count, 1)
+        self.assertEqual(self.cost_evaluation.cache_hits, 1)
+
+    def test_index_size_oracle(self):
+        self.connector.simulate_index = MagicMock(
+            side_effect=lambda index: [0, f"<0>btree_{index.columns[0].name}"]
+        )
+        self.cost_evaluation.what_if.estimate_index_size = MagicMock(return_value=7)
+        self.cost_evaluation.index_size_oracle = IndexSizeOracle()
+
+        index_0 = Index([self.columns[0]])
+        self.cost_evaluation.estimate_size(index_0)
+        self.assertEqual(index_0.estimated_size, 7)
+        self.assertEqual(self.cost_evaluation.index_size_oracle.learned_sizes, 1)
+
+        # Sizes of new index objects and of other CostEvaluation objects are known
+        cost_evaluation = CostEvaluation(self.connector)
+        cost_evaluation.index_size_oracle = self.cost_evaluation.index_size_oracle
+        index_0 = Index([self.columns[0]])
+        cost_evaluation.estimate_size(index_0)
+        self.assertEqual(index_0.estimated_size, 7)
+        self.connector.simulate_index.assert_called_once()
+
+    def test_limit_cache(self):
+        self.cost_evaluation.limit_cache(1)
+        workload = Workload([self.queries[0]])
+        index_0 = Index([self.columns[0]])
+        self.connector.drop_simulated_index = MagicMock()
+
+        self.cost_evaluation.calculate_cost(workload, set())
+        self.cost_evaluation.calculate_cost(workload, set([index_0]))
+        self.assertEqual(len(self.cost_evaluation.cache), 1)
+        self.assertEqual(self.cost_evaluation.cache.evictions, 1)
+
+        # The evicted cost is requested again
+        self.cost_evaluation.calculate_cost(workload, set())
+        self.assertEqual(self.connector.get_cost.call_count, 3)
+        self.assertEqual(self.cost_evaluation.cache_hits, 0)
+
+    def test_bounded_shared_cache(self):
+        shared_cache = BoundedCostCache(1)
+        self.cost_evaluation.use_shared_caches(shared_cache, {})
+        workload = Workload([self.queries[0]])
+        index_0 = Index([self.columns[0]])
+        self.connector.drop_simulated_index = MagicMock()
+
+        self.cost_evaluation.calculate_cost(workload, set())
+        self.cost_evaluation.calculate_cost(workload, set([index_0]))
+        self.assertEqual(len(shared_cache), 1)
+        self.assertEqual(shared_cache.evictions, 1)
+        self.assertIn(self.queries[0], shared_cache.recompute_times)
+
+    def test_bulk_index_simulation(self):
+        self.connector.supports_bulk_index_simulation = MagicMock(return_value=True)
+        self.connector.simulate_indexes = MagicMock(
+            side_effect=lambda indexes, store_size: [
+                [oid, f"<{oid}>btree", 7] for oid, _ in enumerate(indexes)
+            ]
+        )
+        index_0 = Index([self.columns[0]])
+        index_1 = Index([self.columns[1]])
+        index_3 = Index([self.columns[1], self.columns[0]])
+        self.cost_evaluation.index_size_cache[index_3] = 10
+        self.cost_evaluation.index_size_oracle = MagicMock()
+        self.cost_evaluation.index_size_oracle.size.return_value = None
+
+        self.cost_evaluation.calculate_cost(
+            self.workload, set([index_0, index_1, index_3]), store_size=True
+        )
+        self.connector.simulate_indexes.assert_called_once()
+        self.connector.simulate_index.assert_not_called()
+        self.assertEqual(
+            self.cost_evaluation.current_indexes, set([index_0, index_1, index_3])
+        )
+        self.assertEqual(index_0.estimated_size, 7)
+        self.assertEqual(self.cost_evaluation.index_size_cache[index_1], 7)
+        # Known sizes are kept and not learned again
+        self.assertEqual(index_3.estimated_size, 10)
+        self.assertEqual(
+            {
+                call.args[0]
+                for call in self.cost_evaluation.index_size_oracle.learn.mock_calls
+            },
+            set([index_0, index_1]),
+        )
+        self.cost_evaluation.index_size_oracle = None
+
+        # A single missing index is simulated as before
+        index_2 = Index([self.columns[0], self.columns[1]])
+        self.connector.drop_simulated_index = MagicMock()
+        self.cost_evaluation.calculate_cost(self.workload, set([index_0, index_2]))
+        self.connector.simulate_index.assert_called_once_with(index_2)
+        self.assertEqual(self.connector.simulate_indexes.call_count, 1)
+
+    def test_connection_pool(self):
+        # The cost of query 0 without indexes is cached
+        self.cost_evaluation.calculate_cost(Workload([self.queries[0]]), set())
+        self.assertEqual(self.connector.get_cost.call_count, 1)
+
+        connection_pool = MockConnector()
+        connection_pool.get_costs = MagicMock(side_effect=lambda requests: [5, 7])
+        self.cost_evaluation.connection_pool = connection_pool
+
+        cost = self.cost_evaluation.calculate_cost(self.workload, set())
+        self.assertEqual(cost, 3 + 5 + 7)
+        connection_pool.get_costs.assert_called_once_with(
+            [(self.queries[1], set()), (self.queries[2], set())]
+        )
+        self.assertEqual(self.connector.get_cost.call_count, 1)
+        self.assertEqual(self.cost_evaluation.cost_requests, 4)
+        self.assertEqual(self.cost_evaluation.cache_hits, 1)
+
+        # Costs requested via the pool are cached
+        self.cost_evaluation.calculate_cost(self.workload, set())
+        self.assertEqual(connection_pool.get_costs.call_count, 1)
+        self.assertEqual(self.cost_evaluation.cache_hits, 4)
+
+    def test_connection_pool_relevant_indexes(self):
+        index_0 = Index([self.columns[0]])
+        index_0.estimated_size = 1
+        index_1 = Index([self.columns[1]])
+        index_1.estimated_size = 1
+        connection_pool = MockConnector()
+        connection_pool.get_costs = MagicMock(
+            side_effect=lambda requests: [5] * len(requests)
+        )
+        self.cost_evaluation.connection_pool = connection_pool
+
+        self.cost_evaluation.calculate_cost(
+            self.workload, set([index_0]), store_size=True
+        )
+        self.cost_evaluation.calculate_cost_batch(self.workload, [set([index_1])])
+        # The main session does not mirror the configurations and the pool's sessions
+        # only get the indexes that are relevant for the respective query
+        self.connector.simulate_index.assert_not_called()
+        self.assertEqual(self.cost_evaluation.current_indexes, set())
+        self.assertEqual(
+            [
+                [(query, set(indexes)) for query, indexes in call.args[0]]
+                for call in connection_pool.get_costs.call_args_list
+            ],
+            [
+                [
+                    (self.queries[0], {index_0}),
+                    (self.queries[1], set()),
+                    (self.queries[2], {index_0}),
+                ],
+                [
+                    (self.queries[0], set()),
+                    (self.queries[1], {index_1}),
+                    (self.queries[2], {index_1}),
+                ],
+            ],
+        )
+
+    def test_which_indexes_utilized_and_cost_batch(self):
+        index_0 = Index([self.columns[0]])
+        index_1 = Index([self.columns[1]])
+        self.cost_evaluation.what_if.estimate_index_size = MagicMock(return_value=7)
+        connection_pool = MockConnector()
+        connection_pool.get_utilized_indexes = MagicMock(
+            side_effect=lambda requests: [({index_0}, 5), (set(), 8)]
+        )
+        self.cost_evaluation.connection_pool = connection_pool
+
+        requests = [(self.queries[0], [index_0]), (self.queries[1], [index_1])]
+        results = self.cost_evaluation.which_indexes_utilized_and_cost_batch(
+            [query for query, _ in requests], [indexes for _, indexes in requests]
+        )
+        self.assertEqual(results, [({index_0}, 5), (set(), 8)])
+        connection_pool.get_utilized_indexes.assert_called_once_with(requests)
+        # The sizes of all candidates are known afterward
+        self.assertEqual(index_0.estimated_size, 7)
+        self.assertEqual(index_1.estimated_size, 7)
+
+    def test_calculate_cost_batch(self):
+        index_0 = Index([self.columns[0]])
+        index_1 = Index([self.columns[1]])
+        self.cost_evaluation._prepare_cost_calculation = MagicMock()
+        self.connector.get_cost = MagicMock(side_effect=[10, 20, 30, 40, 50, 60, 70])
+
+        # The costs for all queries without indexes are cached afterward
+        self.cost_evaluation.calculate_cost(self.workload, set())
+        self.cost_evaluation._prepare_cost_calculation.reset_mock()
+
+        configurations = [{index_0}, set(), {index_0, index_1}]
+        costs = self.cost_evaluation.calculate_cost_batch(self.workload, configurations)
+        # Query 0 is not affected by index_1 and, thus, its cost is cached for the
+        # last configuration
+        self.assertEqual(costs, [40 + 20 + 50, 10 + 20 + 30, 40 + 60 + 70])
+        self.assertEqual(self.connector.get_cost.call_count, 7)
+        self.assertEqual(self.cost_evaluation.cost_requests, 12)
+        self.assertEqual(self.cost_evaluation.cache_hits, 5)
+
+        # The cached configuration does not alter the simulated indexes
+        self.assertEqual(self.cost_evaluation._prepare_cost_calculation.call_count, 2)
+        self.cost_evaluation._prepare_cost_calculation.assert_any_call(
+            {index_0}, store_size=False
+        )
+
     def test_which_indexes_utilized_and_cost(self):
         def _simulate_index_mock(index, store_size):
             index.hypopg_name = f"<1337>btree_{index.columns}"
@@ -285,6 +577,79 @@ class TestPrepareCostEvaluation(unittest.TestCase):
             self.cost_evaluation.current_indexes, set([self.index_0, self.index_2])
         )
 
+    def test_relevance_scheduling_keeps_irrelevant_indexes(self):
+        query_0 = Query(0, "SELECT * FROM TestTableA WHERE Col0 = 4", [self.columns[0]])
+        query_1 = Query(1, "SELECT * FROM TestTableA WHERE Col1 = 3", [self.columns[1]])
+        self.cost_evaluation.db_connector.get_cost = MagicMock(return_value=3)
+        self.cost_evaluation.index_state_scheduling = "relevance"
+        self.cost_evaluation.current_indexes = set([self.index_0, self.index_1])
+
+        # index_1 is not relevant for query_0 and, thus, not dropped
+        self.cost_evaluation.calculate_cost(Workload([query_0]), [self.index_0])
+        self.mock_what_if.simulate_index.assert_not_called()
+        self.mock_what_if.drop_simulated_index.assert_not_called()
+
+        # index_0 is not relevant for query_1, but index_1 is and must be dropped
+        self.cost_evaluation.calculate_cost(Workload([query_1]), [self.index_0])
+        self.mock_what_if.drop_simulated_index.assert_called_once_with(self.index_1)
+        self.assertEqual(self.cost_evaluation.current_indexes, set([self.index_0]))
+
+        # Cached costs do not alter the simulated indexes
+        self.cost_evaluation.calculate_cost(Workload([query_0]), [self.index_0])
+        self.mock_what_if.simulate_index.assert_not_called()
+
+        self.cost_evaluation.calculate_cost(Workload([query_1]), [self.index_2])
+        self.mock_what_if.simulate_index.assert_not_called()
+        self.cost_evaluation.calculate_cost(Workload([query_1]), [self.index_1])
+        self.mock_what_if.simulate_index.assert_called_once_with(
+            self.index_1, store_size=False
+        )
+        self.assertEqual(
+            self.cost_evaluation.current_indexes, set([self.index_0, self.index_1])
+        )
+
+    def test_hiding_scheduling(self):
+        query_1 = Query(1, "SELECT * FROM TestTableA WHERE Col1 = 3", [self.columns[1]])
+        self.cost_evaluation.db_connector.get_cost = MagicMock(return_value=3)
+        self.mock_what_if.hide_simulated_index = MagicMock()
+        self.mock_what_if.unhide_simulated_index = MagicMock()
+        self.cost_evaluation.index_state_scheduling = "hiding"
+        self.cost_evaluation.current_indexes = set([self.index_0, self.index_1])
+
+        self.cost_evaluation.calculate_cost(Workload([query_1]), [self.index_0])
+        self.mock_what_if.hide_simulated_index.assert_called_once_with(self.index_1)
+        self.mock_what_if.drop_simulated_index.assert_not_called()
+        self.assertEqual(self.cost_evaluation.hidden_indexes, set([self.index_1]))
+
+        self.cost_evaluation.calculate_cost(Workload([query_1]), [self.index_1])
+        self.mock_what_if.unhide_simulated_index.assert_called_once_with(self.index_1)
+        self.mock_what_if.simulate_index.assert_not_called()
+        self.assertEqual(self.cost_evaluation.hidden_indexes, set())
+
+        # Strict preparation unhides requested indexes
+        self.cost_evaluation._hide_index(self.index_1)
+        self.cost_evaluation._prepare_cost_calculation([self.index_1])
+        self.assertEqual(self.cost_evaluation.hidden_indexes, set())
+        self.assertEqual(self.cost_evaluation.current_indexes, set([self.index_1]))
+
+    def test_plan_cost_derivation(self):
+        query_1 = Query(1, "SELECT * FROM TestTableA WHERE Col1 = 3", [self.columns[1]])
+        self.index_1.hypopg_name = "<1>btree_testtablea_col1"
+        plan = {"Total Cost": 5, "Index Name": self.index_1.hypopg_name}
+        self.cost_evaluation.db_connector.get_plan = MagicMock(return_value=plan)
+        self.cost_evaluation.db_connector.get_cost = MagicMock()
+        self.cost_evaluation.plan_cost_derivation = PlanCostDerivation()
+        self.cost_evaluation.current_indexes = set([self.index_1])
+
+        cost = self.cost_evaluation.calculate_cost(Workload([query_1]), [self.index_1])
+        self.assertEqual(cost, 5)
+        self.cost_evaluation.db_connector.get_cost.assert_not_called()
+        self.assertEqual(
+            self.cost_evaluation.plan_cost_derivation.plans[query_1],
+            {frozenset([self.index_1]): [(frozenset([self.index_1]), 5)]},
+        )
+        self.index_1.hypopg_name = None
+
     def test_complete_cost_estimation(self):
         self.cost_evaluation.current_indexes = set([self.index_0, self.index_1])
         self.assertFalse(self.cost_evaluation.completed)
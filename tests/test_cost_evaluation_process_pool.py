@@ -0,0 +1,151 @@
+import unittest
+
+from selection.algorithms.extend_algorithm import ExtendAlgorithm
+from selection.cost_evaluation import CostEvaluation
+from selection.cost_evaluation_process_pool import CostEvaluationProcessPool
+from selection.index import Index
+from selection.workload import Column, Query, Table, Workload
+
+
+# Must be importable by the worker processes. Costs only depend on the simulated
+# indexes, like what-if costs.
+class SimulatingConnector:
+    def __init__(self, db_name):
+        self.db_name = db_name
+        self.simulated_indexes = 0
+        self.cost_estimations = 0
+        self.cost_estimation_duration = 0
+        self.index_simulation_duration = 0
+        # {oid: index}
+        self._indexes = {}
+        self._next_oid = 0
+
+    def simulate_index(self, index):
+        self.simulated_indexes += 1
+        self._next_oid += 1
+        self._indexes[self._next_oid] = index
+        return [self._next_oid, index.index_idx()]
+
+    def drop_simulated_index(self, oid):
+        del self._indexes[oid]
+
+    def supports_bulk_index_simulation(self):
+        return False
+
+    def exec_fetch(self, statement, one=True):
+        oid = int(statement.split("(")[1].split(")")[0])
+        return [100 * len(self._indexes[oid].columns)]
+
+    def get_cost(self, query):
+        self.cost_estimations += 1
+        cost = 10.1 * (query.nr + 1)
+        for index in self._indexes.values():
+            if index.columns[0] in query.columns:
+                cost -= 1.7 * len(index.columns)
+        return cost
+
+    def drop_indexes(self):
+        pass
+
+
+class TestCostEvaluationProcessPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.table = Table("TableA")
+        cls.columns = [Column("Col0"), Column("Col1"), Column("Col2")]
+        cls.table.add_columns(cls.columns)
+        cls.workload = Workload(
+            [
+                Query(0, "SELECT * FROM TableA WHERE Col0 = 4", [cls.columns[0]]),
+                Query(1, "SELECT * FROM TableA WHERE Col1 = 3", [cls.columns[1]]),
+                Query(2, "SELECT * FROM TableA WHERE Col1 = 3", cls.columns[1:]),
+            ]
+        )
+
+    def test_equals_serial_evaluation(self):
+        configurations = [
+            [Index([self.columns[0]])],
+            [Index([self.columns[1], self.columns[0]])],
+            [Index([self.columns[0]]), Index([self.columns[2]])],
+            [],
+        ]
+        serial_cost_evaluation = CostEvaluation(SimulatingConnector("test_db"))
+        serial_costs = [
+            serial_cost_evaluation.calculate_query_costs(
+                self.workload, indexes, store_size=True
+            )
+            for indexes in configurations
+        ]
+
+        # Sizes are assigned to the index objects, equal objects are used in parallel
+        configurations = [
+            [Index(index.columns) for index in indexes] for indexes in configurations
+        ]
+        cost_evaluation = CostEvaluation(SimulatingConnector("test_db"))
+        db_connector = cost_evaluation.db_connector
+        pool = CostEvaluationProcessPool(cost_evaluation, self.workload, 2)
+        try:
+            costs = pool.calculate_query_costs(
+                [(indexes, None) for indexes in configurations], store_size=True
+            )
+            self.assertEqual(
+                cost_evaluation.cache_hits, serial_cost_evaluation.cache_hits
+            )
+            self.assertEqual(
+                db_connector.cost_estimations,
+                serial_cost_evaluation.db_connector.cost_estimations,
+            )
+
+            # Cached costs are not requested from the workers
+            cost_estimations = db_connector.cost_estimations
+            query_costs = pool.calculate_query_costs(
+                [(configurations[2], [1, 2])], store_size=False
+            )
+            self.assertEqual(db_connector.cost_estimations, cost_estimations)
+        finally:
+            pool.close()
+
+        self.assertEqual(costs, serial_costs)
+        self.assertEqual(query_costs, [serial_costs[2][1:]])
+        self.assertEqual(configurations[1][0].estimated_size, 200)
+        self.assertEqual(cost_evaluation.index_size_cache[configurations[1][0]], 200)
+        self.assertEqual(cost_evaluation.cost_requests, 14)
+        self.assertEqual(
+            cost_evaluation.cache_hits, serial_cost_evaluation.cache_hits + 2
+        )
+
+    def test_unsupported_configurations(self):
+        cost_evaluation = CostEvaluation(SimulatingConnector("test_db"))
+        cost_evaluation.index_state_scheduling = "relevance"
+        with self.assertRaises(AssertionError):
+            CostEvaluationProcessPool(cost_evaluation, self.workload, 2)
+
+        cost_evaluation = CostEvaluation(SimulatingConnector("test_db"))
+        cost_evaluation.cost_estimation = "actual_runtimes"
+        with self.assertRaises(AssertionError):
+            CostEvaluationProcessPool(cost_evaluation, self.workload, 2)
+
+    def test_extend_parallel_processes(self):
+        results = []
+        for parallel_processes, incremental_costing in [
+            (1, False),
+            (2, False),
+            (2, True),
+        ]:
+            algorithm = ExtendAlgorithm(
+                SimulatingConnector("test_db"),
+                {
+                    "parallel_processes": parallel_processes,
+                    "incremental_costing": incremental_costing,
+                },
+            )
+            algorithm.budget = 400
+            results.append(algorithm._calculate_best_indexes(self.workload))
+
+        self.assertGreater(len(results[0]), 1)
+        self.assertEqual(results[1], results[0])
+        self.assertEqual(results[2], results[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,12 @@
 import unittest
+from unittest.mock import MagicMock
 
-from selection.dbms.postgres_dbms import PostgresDatabaseConnector
+from selection.database_connector import DatabaseConnector
+from selection.dbms.postgres_dbms import (
+    TOTAL_COST_PATTERN,
+    PostgresDatabaseConnector,
+    parse_total_cost,
+)
 from selection.index import Index
 from selection.table_generator import TableGenerator
 from selection.workload import Column, Query, Table
@@ -54,6 +60,115 @@ class TestDatabase(unittest.TestCase):
         db.drop_simulated_index(index_oid)
         self.assertGreater(db.index_simulation_duration, previou_simulation_duration)
 
+    def test_bulk_index_simulation(self):
+        db = PostgresDatabaseConnector(self.db_name, "postgres")
+        nation_table = Table("nation")
+        columns = [Column("n_name"), Column("n_regionkey")]
+        nation_table.add_columns(columns)
+        indexes = [Index([columns[0]]), Index([columns[1]]), Index(columns)]
+
+        results = db.simulate_indexes(indexes, store_size=True)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(db.simulated_indexes, 3)
+        for index, (oid, name, size) in zip(indexes, results):
+            self.assertIn(index.joined_column_names().replace(",", "_"), name)
+            self.assertGreater(size, 0)
+            db.drop_simulated_index(oid)
+
+        db.close()
+
+    def test_cost_equals_plan_cost(self):
+        db = PostgresDatabaseConnector(self.db_name, "postgres")
+
+        query = Query(17, "SELECT count(*) FROM nation WHERE n_regionkey = 1;")
+        self.assertEqual(db.get_cost(query), db.get_plan(query)["Total Cost"])
+
+        db.close()
+
+
+class TestQueryStatements(unittest.TestCase):
+    def test_total_cost_pattern(self):
+        line = "Seq Scan on nation  (cost=0.00..1.25 rows=25 width=109)"
+        self.assertEqual(TOTAL_COST_PATTERN.search(line).group(1), "1.25")
+
+        line = "Aggregate  (cost=39601.82..39601.83 rows=1 width=32)"
+        self.assertEqual(TOTAL_COST_PATTERN.search(line).group(1), "39601.83")
+
+    def test_parse_total_cost(self):
+        line = "Seq Scan on nation  (cost=0.00..1.25 rows=25 width=109)"
+        self.assertEqual(parse_total_cost(line), 1.25)
+        self.assertIsNone(parse_total_cost("Seq Scan on nation"))
+
+    def test_get_cost_falls_back_to_json_plan(self):
+        db = PostgresDatabaseConnector.__new__(PostgresDatabaseConnector)
+        db._prepare_query = MagicMock(return_value="select 1")
+        db._cleanup_query = MagicMock()
+        db._cursor = MagicMock()
+        db._cursor.fetchone.side_effect = [
+            ["Result"],
+            [[{"Plan": {"Total Cost": 0.01}}]],
+        ]
+
+        self.assertEqual(db._get_cost(Query(0, "select 1")), 0.01)
+        db._cursor.execute.assert_called_with("explain (format json) select 1")
+
+    def test_inline_views(self):
+        query_text = (
+            "create view revenue0 (supplier_no, total_revenue) as\n"
+            "select l_suppkey, sum(l_extendedprice) from lineitem group by l_suppkey;\n"
+            "select s_suppkey from supplier, revenue0 where s_suppkey = supplier_no;\n"
+            "drop view revenue0;\n"
+        )
+        self.assertEqual(
+            PostgresDatabaseConnector._inline_views(query_text),
+            "with revenue0 (supplier_no, total_revenue) as not materialized "
+            "(select l_suppkey, sum(l_extendedprice) from lineitem group by l_suppkey) "
+            "select s_suppkey from supplier, revenue0 where s_suppkey = supplier_no",
+        )
+
+        query_text = (
+            "create view v as select 1 as a; with x as (select 2) select * from v, x"
+        )
+        self.assertEqual(
+            PostgresDatabaseConnector._inline_views(query_text),
+            "with v as not materialized (select 1 as a), x as (select 2) "
+            "select * from v, x",
+        )
+
+        query_text = "create view v as select 1 as a;\nWITH\n  x as (select 2) select 3"
+        self.assertEqual(
+            PostgresDatabaseConnector._inline_views(query_text),
+            "with v as not materialized (select 1 as a), x as (select 2) select 3",
+        )
+
+        query_text = (
+            "create view v as select 1 as a; "
+            "with recursive x(n) as (select 1 union select n + 1 from x) select * from x"
+        )
+        self.assertIsNone(PostgresDatabaseConnector._inline_views(query_text))
+
+        # Multiple non-view statements cannot be rewritten into one statement
+        query_text = "create view v as select 1 as a; select * from v; select 2"
+        self.assertIsNone(PostgresDatabaseConnector._inline_views(query_text))
+
+    def test_prepare_query_statement_cache(self):
+        connector = DatabaseConnector("test_db")
+        connector.exec_only = MagicMock()
+
+        query = Query(0, "SELECT count(*) FROM nation;")
+        self.assertEqual(connector._prepare_query(query), "SELECT count(*) FROM nation")
+        self.assertIn(query, connector._query_statements)
+
+        # Views are created for every request. Hence, statements are not cached.
+        view_query = Query(
+            15,
+            "create view revenue0 as select 1 as r; select * from revenue0; "
+            "drop view revenue0",
+        )
+        self.assertEqual(connector._prepare_query(view_query), " select * from revenue0")
+        self.assertNotIn(view_query, connector._query_statements)
+        connector.exec_only.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,7 @@
+import itertools
 import time
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from selection.algorithms.db2advis_algorithm import DB2AdvisAlgorithm, IndexBenefit
 from selection.dbms.postgres_dbms import PostgresDatabaseConnector
@@ -14,6 +15,9 @@ class MockConnector:
     def __init__(self):
         pass
 
+    def supports_bulk_index_simulation(self):
+        return False
+
     def drop_indexes(self):
         pass
 
@@ -312,3 +316,93 @@ class TestDB2AdvisAlgorithm(unittest.TestCase):
             workload=[],
         )
         self.assertEqual(new, set([IndexBenefit(index_0, 1)]))
+
+    def test_try_variations_memo(self):
+        index_0 = Index([self.column_0])
+        index_0.estimated_size = 1
+        index_1 = Index([self.column_1])
+        index_1.estimated_size = 1
+        self.algo.cost_evaluation.calculate_cost = MagicMock(return_value=17)
+        self.algo.try_variations_seconds = 20
+
+        with patch("selection.algorithms.db2advis_algorithm.time") as mock_time:
+            # Every loop iteration advances the clock by one second
+            mock_time.time.side_effect = itertools.count()
+            self.algo._try_variations(
+                selected_index_benefits=frozenset([IndexBenefit(index_0, 1)]),
+                index_benefits=frozenset([IndexBenefit(index_1, 1)]),
+                workload=[],
+            )
+        # The only variation is costed once
+        self.assertEqual(self.algo.cost_evaluation.calculate_cost.call_count, 2)
+        self.assertEqual(self.algo.distinct_variations, 1)
+        self.assertEqual(self.algo.tried_variations, 19)
+
+    def _try_variations_on_single_column_queries(self, parameters):
+        algorithm = DB2AdvisAlgorithm(self.connector, parameters)
+        algorithm.disk_constraint = 1
+        # The clock below advances by one second per variation
+        algorithm.try_variations_seconds = 200
+
+        # Every query accesses one column. An index on that column lowers the query's
+        # cost by the index's benefit.
+        benefits = [1, 2, 5, 0.5]
+        index_benefits = []
+        queries = []
+        benefit_per_column = {}
+        for position, benefit in enumerate(benefits):
+            column = self.all_columns[position]
+            index = Index([column])
+            index.estimated_size = 1
+            index_benefits.append(IndexBenefit(index, benefit))
+            queries.append(
+                Query(position, f"SELECT * FROM Table0 WHERE {column}", [column])
+            )
+            benefit_per_column[column] = benefit
+
+        def calculate_query_costs(workload, indexes):
+            indexed_columns = {index.columns[0] for index in indexes}
+            return [
+                (
+                    10 - benefit_per_column[query.columns[0]]
+                    if query.columns[0] in indexed_columns
+                    else 10
+                )
+                for query in workload.queries
+            ]
+
+        cost_evaluation = algorithm.cost_evaluation
+        cost_evaluation.calculate_query_costs = MagicMock(
+            side_effect=calculate_query_costs
+        )
+        cost_evaluation.calculate_cost = MagicMock(
+            side_effect=lambda workload, indexes: sum(
+                calculate_query_costs(workload, indexes)
+            )
+        )
+        with patch("selection.algorithms.db2advis_algorithm.time") as mock_time:
+            mock_time.time.side_effect = itertools.count()
+            selection = algorithm._try_variations(
+                selected_index_benefits=index_benefits[:1],
+                index_benefits=index_benefits,
+                workload=Workload(queries),
+            )
+        return selection, cost_evaluation
+
+    def test_try_variations_incremental_costing(self):
+        selection, _ = self._try_variations_on_single_column_queries({})
+        incremental_selection, cost_evaluation = (
+            self._try_variations_on_single_column_queries({"incremental_costing": True})
+        )
+        self.assertEqual(incremental_selection, selection)
+        self.assertEqual({index_benefit.benefit for index_benefit in selection}, {5})
+
+        # Only the initial selection is costed for the entire workload. Variations
+        # exchange one index and, thus, affect two queries.
+        costed_queries = [
+            len(call.args[0].queries)
+            for call in cost_evaluation.calculate_query_costs.call_args_list
+        ]
+        self.assertEqual(costed_queries[0], 4)
+        self.assertTrue(all(queries == 2 for queries in costed_queries[1:]))
+        cost_evaluation.calculate_cost.assert_not_called()
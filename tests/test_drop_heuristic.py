@@ -15,6 +15,9 @@ class MockConnector:
     def drop_indexes(self):
         pass
 
+    def supports_bulk_index_simulation(self):
+        return False
+
 
 class TestDropHeuristicAlgorithm(unittest.TestCase):
     def setUp(self):
@@ -115,6 +118,62 @@ class TestDropHeuristicAlgorithm(unittest.TestCase):
         )
         self.assertEqual(self.algo.cost_evaluation.calculate_cost.call_count, 5)
 
+    # Query 0 uses index_0. Query 1 prefers index_1 over index_2.
+    def _plan_mock(self, query, remaining_indexes, store_size=True):
+        if query.nr == 0:
+            if self.index_0 in remaining_indexes:
+                return {self.index_0}, 10
+            return set(), 50
+        for index, cost in [(self.index_1, 20), (self.index_2, 30)]:
+            if index in remaining_indexes:
+                return {index}, cost
+        return set(), 65
+
+    def test_incremental_costing(self):
+        def calculate_cost(workload, remaining_indexes):
+            return sum(
+                self._plan_mock(query, remaining_indexes)[1] for query in workload.queries
+            )
+
+        def calculate_query_costs(workload, remaining_indexes):
+            return [
+                self._plan_mock(query, remaining_indexes)[1] for query in workload.queries
+            ]
+
+        self.algo.parameters["max_indexes"] = 1
+        self.algo.cost_evaluation.calculate_cost = MagicMock(side_effect=calculate_cost)
+        indexes = self.algo._calculate_best_indexes(self.workload)
+        self.assertEqual(indexes, {self.index_1})
+
+        algorithm = DropHeuristicAlgorithm(
+            self.connector, {"max_indexes": 1, "incremental_costing": True}
+        )
+        cost_evaluation = algorithm.cost_evaluation
+        cost_evaluation.which_indexes_utilized_and_cost = MagicMock(
+            side_effect=self._plan_mock
+        )
+        cost_evaluation.calculate_query_costs = MagicMock(
+            side_effect=calculate_query_costs
+        )
+        incremental_indexes = algorithm._calculate_best_indexes(self.workload)
+        self.assertEqual(incremental_indexes, indexes)
+        # Plans are requested without size estimations and count as cost requests
+        plan_calls = cost_evaluation.which_indexes_utilized_and_cost.call_args_list
+        self.assertTrue(all(call.kwargs["store_size"] is False for call in plan_calls))
+        self.assertEqual(cost_evaluation.cost_requests, len(plan_calls))
+        # index_2 is not used by any plan and, thus, dropped without costing
+        self.assertLess(
+            cost_evaluation.calculate_query_costs.call_count,
+            self.algo.cost_evaluation.calculate_cost.call_count,
+        )
+        self.assertEqual(
+            [
+                len(call.args[0].queries)
+                for call in cost_evaluation.calculate_query_costs.call_args_list
+            ],
+            [1, 1, 1, 1],
+        )
+
     def test_calculate_best_indexes_none_fits(self):
         self.algo.parameters["max_indexes"] = 0
         with self.assertRaises(AssertionError):
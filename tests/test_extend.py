@@ -4,6 +4,7 @@ from unittest.mock import MagicMock
 
 from selection.algorithms.extend_algorithm import ExtendAlgorithm
 from selection.index import Index
+from selection.index_size_estimation import AnalyticalIndexSizeEstimator
 from selection.selection_algorithm import DEFAULT_PARAMETER_VALUES
 from selection.utils import mb_to_b
 from selection.workload import Column, Query, Table, Workload
@@ -16,6 +17,9 @@ class MockConnector:
     def drop_indexes(self):
         pass
 
+    def supports_bulk_index_simulation(self):
+        return False
+
 
 class MockCostEvaluation:
     def __init__(self):
@@ -62,34 +66,52 @@ class TestExtendAlgorithm(unittest.TestCase):
     def test_attach_to_indexes(self):
         index_combination = [self.index_1, self.index_2]
         candidate = self.index_3
-        self.algo.initial_cost = 10
-        best = {"combination": [], "benefit_to_size_ratio": 0}
-        self.algo._evaluate_combination = MagicMock()
-        self.algo._attach_to_indexes(
-            index_combination, candidate, best, self.algo.initial_cost
+        new_combinations = list(
+            self.algo._attach_to_indexes(index_combination, candidate)
         )
 
         first_new_combination = [
             index_combination[1],
             Index(index_combination[0].columns + candidate.columns),
         ]
-        self.algo._evaluate_combination.assert_any_call(
-            first_new_combination, best, self.algo.initial_cost, 5
-        )
+        self.assertIn((first_new_combination, 5), new_combinations)
 
         second_new_combination = [
             index_combination[0],
             Index(index_combination[1].columns + candidate.columns),
         ]
-        self.algo._evaluate_combination.assert_any_call(
-            second_new_combination, best, self.algo.initial_cost, 1
-        )
+        self.assertIn((second_new_combination, 1), new_combinations)
+        self.assertEqual(len(new_combinations), 2)
 
         multi_column_candidate = Index([self.column_2, self.column_3])
         with self.assertRaises(AssertionError):
-            self.algo._attach_to_indexes(
-                index_combination, multi_column_candidate, best, self.algo.initial_cost
-            )
+            list(self.algo._attach_to_indexes(index_combination, multi_column_candidate))
+
+    def test_attach_to_indexes_budget_pruning(self):
+        self.algo.budget_pruning = True
+        self.algo.budget = 10
+        # The estimated size of the index on ColA and ColB is one page, i.e., 8192 B
+        self.algo._index_size_estimator = AnalyticalIndexSizeEstimator(
+            {"tablea": 1}, {("tablea", "cola"): 6000, ("tablea", "colb"): 6000}
+        )
+        index_combination = [self.index_1, self.index_2]
+        new_combinations = list(
+            self.algo._attach_to_indexes(index_combination, self.index_3)
+        )
+        # Extensions by ColC cannot be estimated and are, thus, not pruned
+        self.assertEqual(len(new_combinations), 2)
+
+        self.algo.budget = 8192
+        new_combinations = list(
+            self.algo._attach_to_indexes([self.index_1], self.index_2)
+        )
+        self.assertEqual(len(new_combinations), 1)
+        self.algo.budget = 8191
+        new_combinations = list(
+            self.algo._attach_to_indexes([self.index_1], self.index_2)
+        )
+        self.assertEqual(len(new_combinations), 0)
+        self.assertEqual(self.algo.pruned_candidates, 1)
 
     def test_remove_impossible_canidates(self):
         # All Fit
@@ -221,6 +243,58 @@ class TestExtendAlgorithm(unittest.TestCase):
         }
         self.assertEqual(expected_best, best_input)
 
+    def _simulated_run(self, parameters):
+        algorithm = ExtendAlgorithm(self.connector, parameters)
+        algorithm.budget = 5
+        cost_evaluation = algorithm.cost_evaluation
+
+        def simulate_index(index, store_size=False):
+            index.hypopg_name = index.index_idx()
+            if store_size:
+                index.estimated_size = len(index.columns)
+
+        # Every index whose first column is part of a query reduces the query's cost.
+        # Columns are weighted differently to avoid ties between combinations.
+        column_weights = {self.column_1: 3.3, self.column_2: 2.9, self.column_3: 2.2}
+
+        def get_cost(query):
+            cost = 100.1
+            for index in cost_evaluation.current_indexes:
+                if index.columns[0] in query.columns:
+                    weights = [column_weights[column] for column in index.columns]
+                    cost -= sum(weights) + query.nr
+            return cost
+
+        cost_evaluation.what_if.simulate_index = MagicMock(side_effect=simulate_index)
+        cost_evaluation.what_if.drop_simulated_index = MagicMock()
+        self.connector.get_cost = get_cost
+
+        query_3 = Query(2, "SELECT * FROM TableA WHERE ColC = 3;", [self.column_3])
+        workload = Workload(self.workload.queries + [query_3])
+        indexes = algorithm._calculate_best_indexes(workload)
+        return indexes, cost_evaluation.cost_requests, algorithm
+
+    def test_incremental_costing(self):
+        indexes, cost_requests, _ = self._simulated_run({})
+        incremental_indexes, incremental_cost_requests, _ = self._simulated_run(
+            {"incremental_costing": True}
+        )
+        self.assertEqual(incremental_indexes, indexes)
+        self.assertGreater(len(indexes), 1)
+        self.assertLess(incremental_cost_requests, cost_requests)
+
+    def test_lazy_greedy(self):
+        indexes, cost_requests, _ = self._simulated_run({})
+        lazy_indexes, lazy_cost_requests, algorithm = self._simulated_run(
+            {"lazy_greedy": True, "lazy_greedy_verification": True}
+        )
+        self.assertEqual(lazy_indexes, indexes)
+        self.assertEqual(algorithm.lazy_greedy.divergences, 0)
+        self.assertGreater(algorithm.lazy_greedy.steps, 1)
+
+        _, lazy_cost_requests, algorithm = self._simulated_run({"lazy_greedy": True})
+        self.assertLess(lazy_cost_requests, cost_requests)
+
     def test_extend_algoritm(self):
         # Should use default parameters if none are specified
         self.assertEqual(self.algo.budget, mb_to_b(DEFAULT_PARAMETER_VALUES["budget_MB"]))
@@ -1,5 +1,8 @@
+import gc
+import pickle
 import unittest
 
+from selection import index as index_module
 from selection.index import Index, index_merge, index_split
 from selection.workload import Column, Table
 
@@ -59,6 +62,43 @@ class TestIndex(unittest.TestCase):
         # Check comparing object of different class
         self.assertFalse(index_0_1 == int(3))
 
+    def test_index_hash(self):
+        index_0_1 = Index([self.column_0, self.column_1])
+        self.assertEqual(hash(index_0_1), hash(Index([self.column_0, self.column_1])))
+        self.assertEqual(len(set([index_0_1, Index([self.column_0, self.column_1])])), 1)
+
+        with self.assertRaises(AttributeError):
+            index_0_1.benefit = 3
+
+    def test_index_ids_are_released(self):
+        column = Column("Col0")
+        Table("TableReleased").add_column(column)
+        key = (column._column_id(),)
+        index = Index([column])
+        index_copy = Index([column])
+        self.assertEqual(hash(index), hash(index_copy))
+        self.assertIn(key, index_module._INDEX_IDS)
+
+        del index
+        gc.collect()
+        # The id is kept as long as an equal index exists
+        self.assertIn(key, index_module._INDEX_IDS)
+        del index_copy
+        gc.collect()
+        self.assertNotIn(key, index_module._INDEX_IDS)
+
+    def test_index_pickle(self):
+        index_0_1 = Index([self.column_0, self.column_1], estimated_size=17)
+        index_0_1.hypopg_oid = 1337
+        unpickled_index = pickle.loads(pickle.dumps(index_0_1))
+
+        self.assertEqual(unpickled_index, index_0_1)
+        self.assertEqual(hash(unpickled_index), hash(index_0_1))
+        self.assertEqual(unpickled_index.estimated_size, 17)
+        self.assertEqual(unpickled_index.hypopg_oid, 1337)
+        self.assertEqual(unpickled_index.table(), self.table)
+        self.assertIs(unpickled_index.columns[0].table, unpickled_index.table())
+
     def test_index_column_names(self):
         index_0_1 = Index([self.column_0, self.column_1])
         column_names = index_0_1._column_names()
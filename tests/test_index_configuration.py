@@ -0,0 +1,121 @@
+import unittest
+
+from selection.index import Index
+from selection.index_configuration import IndexCandidateRegistry, IndexConfiguration
+from selection.workload import Column, Query, Table
+
+
+class TestIndexConfiguration(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.columns = [Column("Col0"), Column("Col1"), Column("Col2")]
+        cls.table = Table("TableA")
+        cls.table.add_columns(cls.columns)
+
+        cls.index_0 = Index([cls.columns[0]], estimated_size=10)
+        cls.index_1 = Index([cls.columns[1]], estimated_size=20)
+        cls.index_2 = Index([cls.columns[2]], estimated_size=40)
+
+    def setUp(self):
+        self.registry = IndexCandidateRegistry([self.index_0, self.index_1])
+
+    def test_registry(self):
+        self.assertEqual(self.registry.register(self.index_1), 1)
+        self.assertEqual(self.registry.register(Index([self.columns[0]])), 0)
+        self.assertEqual(self.registry.register(self.index_2), 2)
+        self.assertEqual(self.registry.mask([self.index_0, self.index_2]), 0b101)
+
+    def test_set_operations(self):
+        configuration_0 = self.registry.configuration([self.index_0])
+        configuration_0_1 = self.registry.configuration([self.index_0, self.index_1])
+
+        self.assertEqual(configuration_0 | {self.index_1}, configuration_0_1)
+        self.assertEqual(configuration_0_1 - {self.index_0}, {self.index_1})
+        self.assertEqual(
+            configuration_0_1 - configuration_0,
+            self.registry.configuration([self.index_1]),
+        )
+        self.assertEqual(configuration_0_1 & {self.index_1, self.index_2}, {self.index_1})
+        self.assertTrue(configuration_0 <= configuration_0_1)
+        self.assertTrue(configuration_0 < configuration_0_1)
+        self.assertFalse(configuration_0_1 <= configuration_0)
+        self.assertTrue(frozenset([self.index_0]) <= configuration_0_1)
+        self.assertEqual(
+            configuration_0.with_index(self.index_2).without_index(self.index_0),
+            self.registry.configuration([self.index_2]),
+        )
+
+        self.assertIn(self.index_0, configuration_0)
+        self.assertNotIn(self.index_2, configuration_0)
+        self.assertEqual(list(configuration_0_1), [self.index_0, self.index_1])
+        self.assertEqual(len(configuration_0_1), 2)
+        self.assertFalse(self.registry.configuration())
+
+    def test_comparisons_do_not_register(self):
+        configuration_0 = self.registry.configuration([self.index_0])
+        unknown = {self.index_0, self.index_2}
+
+        self.assertTrue(configuration_0 <= unknown)
+        self.assertTrue(configuration_0 < unknown)
+        self.assertFalse(configuration_0 >= unknown)
+        self.assertFalse(configuration_0 > {self.index_2})
+        self.assertTrue(configuration_0 > set())
+        self.assertEqual(configuration_0 - unknown, set())
+        self.assertEqual(configuration_0 & unknown, {self.index_0})
+        self.assertEqual(configuration_0.without_index(self.index_2), configuration_0)
+        self.assertNotIn(self.index_2, self.registry.positions)
+
+    def test_eq_hash(self):
+        configuration = self.registry.configuration([self.index_1, self.index_0])
+        self.assertEqual(configuration, self.registry.configuration(configuration))
+        self.assertEqual(
+            hash(configuration),
+            hash(self.registry.configuration([self.index_0, self.index_1])),
+        )
+        self.assertIs(self.registry.interned(0b11), self.registry.interned(0b11))
+
+        # Configurations can be used interchangeably with frozensets, e.g., as keys
+        frozen_configuration = frozenset([self.index_0, self.index_1])
+        self.assertEqual(configuration, frozen_configuration)
+        self.assertEqual(frozen_configuration, configuration)
+        self.assertEqual(hash(configuration), hash(frozen_configuration))
+        self.assertEqual({frozen_configuration: 3}[configuration], 3)
+        self.assertNotEqual(configuration, frozenset([self.index_0]))
+        self.assertNotEqual(configuration, [self.index_0, self.index_1])
+
+        other_registry = IndexCandidateRegistry([self.index_1, self.index_0])
+        self.assertEqual(configuration, other_registry.configuration(configuration))
+
+    def test_size(self):
+        configuration = self.registry.configuration([self.index_0, self.index_2])
+        self.assertEqual(configuration.size(), 50)
+
+        index_3 = Index([self.columns[0], self.columns[1]])
+        with self.assertRaises(AssertionError):
+            configuration.with_index(index_3).size()
+
+    def test_relevance_mask(self):
+        query = Query(0, "SELECT * FROM TableA WHERE Col1 = 3", [self.columns[1]])
+        self.assertEqual(self.registry.relevance_mask(query), 0b10)
+
+        # Newly registered candidates are considered
+        self.registry.register(Index([self.columns[1], self.columns[2]]))
+        self.assertEqual(self.registry.relevance_mask(query), 0b110)
+
+    def test_interned_eviction(self):
+        self.registry.MAX_INTERNED_CONFIGURATIONS = 2
+        configuration_1 = self.registry.interned(0b01)
+        self.registry.interned(0b10)
+        self.assertIs(self.registry.interned(0b01), configuration_1)
+
+        # The least recently used configuration (0b10) is evicted
+        self.registry.interned(0b11)
+        self.assertEqual(list(self.registry._configurations), [0b01, 0b11])
+        self.assertIs(self.registry.interned(0b01), configuration_1)
+
+    def test_configuration_type(self):
+        self.assertIsInstance(self.registry.configuration(), IndexConfiguration)
+
+
+if __name__ == "__main__":
+    unittest.main()
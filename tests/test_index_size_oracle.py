@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+from selection.index import Index
+from selection.index_size_estimation import AnalyticalIndexSizeEstimator
+from selection.index_size_oracle import IndexSizeOracle
+from selection.workload import Column, Table
+
+
+class TestIndexSizeOracle(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.columns = [Column("Col0"), Column("Col1")]
+        cls.table = Table("TableA")
+        cls.table.add_columns(cls.columns)
+
+        cls.index_0 = Index([cls.columns[0]])
+        cls.index_01 = Index(cls.columns)
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "sizes.sqlite")
+        self.estimator = AnalyticalIndexSizeEstimator(
+            {"tablea": 1000000}, {("tablea", "col0"): 4, ("tablea", "col1"): 8}
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_learn(self):
+        oracle = IndexSizeOracle()
+        self.assertIsNone(oracle.size(self.index_0))
+        oracle.learn(self.index_0, 17)
+        # The size does not depend on the index object
+        self.assertEqual(oracle.size(Index([self.columns[0]])), 17)
+        self.assertIsNone(oracle.size(self.index_01))
+        self.assertEqual(oracle.learned_sizes, 1)
+
+    def test_persists_across_instances(self):
+        oracle = IndexSizeOracle(self.path, "test_db", "fingerprint")
+        oracle.learn(self.index_0, 17)
+        oracle.close()
+
+        oracle = IndexSizeOracle(self.path, "test_db", "fingerprint")
+        self.assertEqual(oracle.size(self.index_0), 17)
+        self.assertEqual(oracle.stored_size_hits, 1)
+        oracle.close()
+
+        oracle = IndexSizeOracle(self.path, "test_db", "other_fingerprint")
+        self.assertIsNone(oracle.size(self.index_0))
+        oracle.close()
+
+    def test_estimation(self):
+        oracle = IndexSizeOracle(estimator=self.estimator)
+        self.assertEqual(oracle.size(self.index_0), 26124288)
+        self.assertEqual(oracle.size(self.index_01), 47022080)
+        self.assertEqual(oracle.estimated_sizes, 2)
+
+        # Learned sizes take precedence over estimations
+        oracle.learn(self.index_0, 17)
+        self.assertEqual(oracle.size(self.index_0), 17)
+
+    def test_verification(self):
+        oracle = IndexSizeOracle(estimator=self.estimator, verification_rate=1)
+        # Sizes that are verified must be requested
+        self.assertIsNone(oracle.size(self.index_0))
+        oracle.learn(self.index_0, 26124288)
+        self.assertEqual(oracle.verified_sizes, 1)
+        self.assertEqual(oracle.estimation_error, 0)
+
+    def test_verification_is_decided_once(self):
+        oracle = IndexSizeOracle(estimator=self.estimator, verification_rate=0.5)
+        for index in [self.index_0, self.index_01]:
+            sizes = {oracle.size(index) for _ in range(10)}
+            self.assertEqual(len(sizes), 1)
+        # Every index is either estimated or verified
+        self.assertEqual(oracle.estimated_sizes + len(oracle._pending_verifications), 2)
+
+    def test_estimate_sizes(self):
+        other_table = Table("TableB")
+        other_column = Column("Col0")
+        other_table.add_column(other_column)
+        indexes = [self.index_0, Index([other_column]), self.index_01]
+
+        sizes = self.estimator.estimate_sizes(indexes)
+        self.assertEqual(sizes, [26124288, None, 47022080])
+        self.assertEqual(sizes[0], self.estimator.estimate(self.index_0))
+
+    def test_estimation_without_statistics(self):
+        estimator = AnalyticalIndexSizeEstimator({"tablea": 1000}, {})
+        self.assertIsNone(estimator.estimate(self.index_0))
+        estimator = AnalyticalIndexSizeEstimator({}, {("tablea", "col0"): 4})
+        self.assertIsNone(estimator.estimate(self.index_0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from selection.lazy_greedy import LazyGreedySelection
+
+
+class TestLazyGreedySelection(unittest.TestCase):
+    def setUp(self):
+        self.evaluated = []
+        # {candidate: benefit}, eligible if positive
+        self.benefits = {"a": 5, "b": 3, "c": 1, "d": -1}
+
+    def evaluate(self, candidates):
+        self.evaluated.append(list(candidates))
+        return [
+            (self.benefits[candidate], self.benefits[candidate] > 0)
+            for candidate in candidates
+        ]
+
+    def test_first_step_evaluates_all_candidates_at_once(self):
+        lazy_greedy = LazyGreedySelection()
+        selected = lazy_greedy.select(["a", "b", "c", "d"], self.evaluate)
+        self.assertEqual(selected, "a")
+        self.assertEqual(self.evaluated, [["a", "b", "c", "d"]])
+
+    def test_only_top_candidates_are_reevaluated(self):
+        lazy_greedy = LazyGreedySelection()
+        lazy_greedy.select(["a", "b", "c", "d"], self.evaluate)
+        self.evaluated = []
+
+        # The benefit of b decreased below the bound of c
+        self.benefits = {"b": 0.5, "c": 1, "d": -1}
+        selected = lazy_greedy.select(["b", "c", "d"], self.evaluate)
+        self.assertEqual(selected, "c")
+        self.assertEqual(self.evaluated, [["b"], ["c"]])
+        self.assertEqual(lazy_greedy.evaluations, 6)
+
+    def test_no_eligible_candidate(self):
+        lazy_greedy = LazyGreedySelection()
+        self.assertIsNone(lazy_greedy.select(["d"], self.evaluate))
+        self.assertIsNone(lazy_greedy.select([], self.evaluate))
+
+    def test_ties_are_broken_by_order(self):
+        self.benefits = {"a": 2, "b": 2}
+        self.assertEqual(LazyGreedySelection().select(["b", "a"], self.evaluate), "b")
+
+    def test_verification(self):
+        lazy_greedy = LazyGreedySelection(verify=True)
+        lazy_greedy.select(["a", "b", "c"], self.evaluate)
+
+        # The benefit of c increased, i.e., benefits are not submodular
+        self.benefits = {"b": 3, "c": 4}
+        selected = lazy_greedy.select(["b", "c"], self.evaluate)
+        self.assertEqual(selected, "b")
+        self.assertEqual(lazy_greedy.steps, 2)
+        self.assertEqual(lazy_greedy.divergences, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+from selection.index import Index
+from selection.persistent_cost_cache import PersistentCostCache
+from selection.workload import Column, Query, Table
+
+
+class TestPersistentCostCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.columns = [Column("Col0"), Column("Col1")]
+        cls.table = Table("TableA")
+        cls.table.add_columns(cls.columns)
+
+        cls.query = Query(0, "SELECT * FROM TableA WHERE Col0 = 4", [cls.columns[0]])
+        cls.index_0 = Index([cls.columns[0]])
+        cls.index_1 = Index([cls.columns[1]])
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "costs.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_put(self):
+        cache = PersistentCostCache(self.path, "test_db", "fingerprint")
+        self.assertIsNone(cache.get(self.query, frozenset()))
+        cache.put(self.query, frozenset(), 17)
+        cache.put(self.query, frozenset([self.index_0]), 3)
+        self.assertEqual(cache.get(self.query, frozenset()), 17)
+        self.assertEqual(cache.get(self.query, frozenset([self.index_0])), 3)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 1)
+        cache.close()
+
+    def test_persists_across_instances(self):
+        cache = PersistentCostCache(self.path, "test_db", "fingerprint")
+        cache.put(self.query, [self.index_1, self.index_0], 5)
+        cache.close()
+
+        cache = PersistentCostCache(self.path, "test_db", "fingerprint")
+        # The order of the indexes is irrelevant
+        self.assertEqual(cache.get(self.query, [self.index_0, self.index_1]), 5)
+        cache.close()
+
+    def test_invalidation(self):
+        cache = PersistentCostCache(self.path, "test_db", "fingerprint")
+        cache.put(self.query, frozenset(), 17)
+        cache.close()
+
+        cache = PersistentCostCache(self.path, "test_db", "other_fingerprint")
+        self.assertIsNone(cache.get(self.query, frozenset()))
+        cache.close()
+
+        cache = PersistentCostCache(self.path, "other_db", "fingerprint")
+        self.assertIsNone(cache.get(self.query, frozenset()))
+        cache.close()
+
+        changed_query = Query(0, "SELECT * FROM TableA WHERE Col0 = 5", self.columns)
+        cache = PersistentCostCache(self.path, "test_db", "fingerprint")
+        self.assertIsNone(cache.get(changed_query, frozenset()))
+        cache.close()
+
+    def test_index_signature(self):
+        signature = PersistentCostCache.index_signature(
+            [self.index_1, Index(self.columns)]
+        )
+        self.assertEqual(signature, "tablea(col0,col1);tablea(col1)")
+
+
+if __name__ == "__main__":
+    unittest.main()
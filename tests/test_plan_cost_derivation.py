@@ -0,0 +1,72 @@
+import unittest
+
+from selection.index import Index
+from selection.plan_cost_derivation import PlanCostDerivation
+from selection.workload import Column, Query, Table
+
+
+class TestPlanCostDerivation(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.columns = [Column("Col0"), Column("Col1"), Column("Col2")]
+        cls.table = Table("TableA")
+        cls.table.add_columns(cls.columns)
+
+        cls.query = Query(0, "SELECT * FROM TableA WHERE Col0 = 4", cls.columns)
+        cls.index_0 = Index([cls.columns[0]])
+        cls.index_1 = Index([cls.columns[1]])
+        cls.index_2 = Index([cls.columns[2]])
+
+    def test_no_plan_recorded(self):
+        derivation = PlanCostDerivation()
+        self.assertIsNone(derivation.derive(self.query, frozenset([self.index_0])))
+
+    def test_derive_for_subset_of_recorded_configuration(self):
+        derivation = PlanCostDerivation()
+        relevant_indexes = frozenset([self.index_0, self.index_1])
+        derivation.record(self.query, relevant_indexes, set([self.index_0]), 10)
+
+        self.assertEqual(derivation.derive(self.query, frozenset([self.index_0])), 10)
+        # The used index is missing, no cost can be derived
+        self.assertIsNone(derivation.derive(self.query, frozenset([self.index_1])))
+        self.assertEqual(derivation.derived_costs, 1)
+
+    def test_derive_with_dominated_index(self):
+        derivation = PlanCostDerivation()
+        derivation.record(
+            self.query, frozenset([self.index_0, self.index_1]), set([self.index_0]), 10
+        )
+
+        # index_2 was never rejected, it might improve the plan
+        relevant_indexes = frozenset([self.index_0, self.index_2])
+        self.assertIsNone(derivation.derive(self.query, relevant_indexes))
+
+        # index_2 was not used although index_0 was available
+        derivation.record(
+            self.query, frozenset([self.index_0, self.index_2]), set([self.index_0]), 10
+        )
+        relevant_indexes = frozenset([self.index_0, self.index_1, self.index_2])
+        self.assertEqual(derivation.derive(self.query, relevant_indexes), 10)
+
+    def test_verify(self):
+        derivation = PlanCostDerivation(verification_rate=1)
+        self.assertTrue(derivation.should_verify())
+        derivation.verify(self.query, frozenset(), 10, 10)
+        with self.assertLogs(level="WARNING"):
+            derivation.verify(self.query, frozenset(), 10, 12)
+        self.assertEqual(derivation.verified_costs, 2)
+        self.assertEqual(derivation.mismatches, 1)
+
+    def test_max_plans(self):
+        derivation = PlanCostDerivation(max_plans=1)
+        derivation.record(self.query, frozenset([self.index_0]), set([self.index_0]), 10)
+        derivation.record(self.query, frozenset([self.index_1]), set(), 20)
+
+        self.assertEqual(derivation.recorded_plans, 1)
+        self.assertEqual(derivation.skipped_plans, 1)
+        self.assertIsNone(derivation.derive(self.query, frozenset([self.index_1])))
+        self.assertEqual(derivation.derive(self.query, frozenset([self.index_0])), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
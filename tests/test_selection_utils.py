@@ -69,22 +69,14 @@ class TestSelectionUtilsGenerator(unittest.TestCase):
                 if query.nr == 1:
                     return [{self.index_0, self.index_2}, 14]
 
-            def calculate_cost(_, workload, indexes):
-                assert len(workload.queries) == 1, (
-                    "get_utilized_indexes' calculate_cost_mock should not be "
-                    "called with workloads that contain more than one query"
-                )
-                assert indexes == [], (
-                    "get_utilized_indexes' calculate_cost_mock should not be "
-                    "called with indexes"
-                )
-
-                query = workload.queries[0]
-
-                if query.nr == 0:
-                    return 170
-                if query.nr == 1:
-                    return 140
+            def which_indexes_utilized_and_cost_batch(mock, queries, indexes_per_query):
+                return [
+                    mock.which_indexes_utilized_and_cost(query, indexes)
+                    for query, indexes in zip(queries, indexes_per_query)
+                ]
+
+            def costs_without_indexes(_, queries):
+                return [{0: 170, 1: 140}[query.nr] for query in queries]
 
         query_0 = Query(0, "SELECT * FROM tablea WHERE col0 = 4;", [self.column_a_0])
         query_1 = Query(